@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from typing import Literal, Optional
+import secrets
+
+from app.middleware import TimedRoute
+from app.query_stats import query_stats
+from config import ADMIN_TOKEN
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TimedRoute)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Check X-Admin-Token; without ADMIN_TOKEN configured the admin endpoints are disabled"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)"
+        )
+    if not secrets.compare_digest((x_admin_token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+@router.get("/queries", dependencies=[Depends(require_admin)])
+async def get_query_stats(
+    sort: Literal["total_ms", "avg_ms", "max_ms", "calls", "rows", "errors", "slow_calls"] = "total_ms",
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Per-statement call count, latency and rows, heaviest first (bind values are never recorded)"""
+    return {**query_stats.summary(), "queries": query_stats.snapshot(sort, limit)}
+
+@router.delete("/queries", dependencies=[Depends(require_admin)])
+async def reset_query_stats():
+    """Reset the per-statement statistics"""
+    query_stats.reset()
+    return {"message": "Query statistics reset"}
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException, status, Query
+from typing import List, Optional
+from datetime import date, timedelta
+import logging
+
+from app.models.analytics import LoginRollupResponse
+from app.services.rollup_service import rollup_service
+from app.middleware import TimedRoute
+from config import LOGIN_ROLLUPS_ENABLED
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], route_class=TimedRoute)
+
+# Janela máxima de /logins/daily (uma linha de rollup por dia)
+MAX_DAILY_RANGE_DAYS = 366
+
+def _require_rollups():
+    if not LOGIN_ROLLUPS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login analytics are not enabled"
+        )
+
+@router.get("/logins/daily", response_model=List[LoginRollupResponse])
+async def get_daily_logins(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None
+):
+    """Logins per day (defaults to the last 30 days)"""
+    _require_rollups()
+    data_fim = data_fim or date.today()
+    data_inicio = data_inicio or data_fim - timedelta(days=29)
+    if data_inicio > data_fim or (data_fim - data_inicio).days >= MAX_DAILY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be between 1 and {MAX_DAILY_RANGE_DAYS} days"
+        )
+
+    try:
+        return await rollup_service.get_daily_async(data_inicio, data_fim)
+        
+    except Exception as e:
+        logger.error(f"Get daily logins error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/logins/users", response_model=List[LoginRollupResponse])
+async def get_top_users(limit: int = Query(10, ge=1, le=100)):
+    """Users with the most logins"""
+    _require_rollups()
+    try:
+        return await rollup_service.get_top_async("USUARIO", limit)
+        
+    except Exception as e:
+        logger.error(f"Get top users error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/logins/users/{user_id}", response_model=LoginRollupResponse)
+async def get_user_logins(user_id: int):
+    """Login count, first and last login of a user"""
+    _require_rollups()
+    try:
+        rollup = await rollup_service.get_user_async(user_id)
+        if not rollup:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No logins recorded for this user"
+            )
+        
+        return rollup
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get user logins error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/logins/ips", response_model=List[LoginRollupResponse])
+async def get_top_ips(limit: int = Query(10, ge=1, le=100)):
+    """IP addresses with the most logins"""
+    _require_rollups()
+    try:
+        return await rollup_service.get_top_async("IP", limit)
+        
+    except Exception as e:
+        logger.error(f"Get top IPs error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.get("/logins/ips/{ip_login}", response_model=LoginRollupResponse)
+async def get_ip_logins(ip_login: str):
+    """Login count, first and last login from an IP address"""
+    _require_rollups()
+    try:
+        rollup = await rollup_service.get_ip_async(ip_login)
+        if not rollup:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No logins recorded for this IP"
+            )
+        
+        return rollup
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get IP logins error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
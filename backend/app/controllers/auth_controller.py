@@ -1,24 +1,41 @@
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import Optional
 import logging
+import math
 
-from app.models.auth import LoginRequest, LoginResponse
+from app.dependencies import get_current_user
+from app.models.auth import LoginRequest, LoginResponse, SessionUser
 from app.models.usuario import UsuarioResponse
 from app.services.auth_service import auth_service
+from app.services.password_hasher import PasswordHasherBusy
 from app.services.usuario_service import usuario_service
 from app.services.login_service import login_service
+from app.services.login_rate_limiter import login_rate_limiter
+from app.services.token_service import token_service
 from app.models.login import LoginCreate
+from app.middleware import TimedRoute
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=TimedRoute)
+
+def _enforce_rate_limit(request: Request, email: str):
+    """Reject the attempt with 429 when the IP or the account is over its limit"""
+    retry_after = login_rate_limiter.check(request.client.host if request.client else None, email)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas, tente novamente em instantes",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
 
 @router.post("/login", response_model=LoginResponse)
 async def login(request: Request, login_data: LoginRequest):
     """Authenticate user with email and password"""
+    _enforce_rate_limit(request, login_data.email)
     try:
         # Authenticate user
-        user = auth_service.authenticate_user(login_data.email, login_data.password)
+        user = await auth_service.authenticate_user_async(login_data.email, login_data.password)
         if not user:
             return LoginResponse(
                 success=False,
@@ -34,18 +51,24 @@ async def login(request: Request, login_data: LoginRequest):
             user_agent=user_agent,
             id_usuario=user.id_usuario
         )
-        login_service.create_login_record(login_record)
-        
-        # Update last login timestamp
-        auth_service.update_last_login(user.id_usuario)
+        # Audit record + last login timestamp in a single transaction
+        await login_service.record_login_async(login_record)
         
         return LoginResponse(
             success=True,
             message="Login realizado com sucesso",
             user_id=user.id_usuario,
-            user_name=user.nome_usuario
+            user_name=user.nome_usuario,
+            access_token=token_service.issue(user.id_usuario, user.nome_usuario),
+            token_type="bearer",
+            expires_in=token_service.expires_in
         )
         
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
     except Exception as e:
         logger.error(f"Login error: {e}")
         return LoginResponse(
@@ -56,8 +79,9 @@ async def login(request: Request, login_data: LoginRequest):
 @router.post("/verify", response_model=LoginResponse)
 async def verify_user(request: Request, login_data: LoginRequest):
     """Verify user credentials without logging in"""
+    _enforce_rate_limit(request, login_data.email)
     try:
-        user = auth_service.authenticate_user(login_data.email, login_data.password)
+        user = await auth_service.authenticate_user_async(login_data.email, login_data.password)
         if not user:
             return LoginResponse(
                 success=False,
@@ -71,9 +95,19 @@ async def verify_user(request: Request, login_data: LoginRequest):
             user_name=user.nome_usuario
         )
         
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
     except Exception as e:
         logger.error(f"Verify user error: {e}")
         return LoginResponse(
             success=False,
             message="Erro interno do servidor"
         )
+
+@router.get("/me", response_model=SessionUser)
+async def get_me(current_user: SessionUser = Depends(get_current_user)):
+    """Identity of the session token sent in the Authorization header"""
+    return current_user
@@ -1,20 +1,60 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import datetime
 import logging
 
+from app.dependencies import get_current_user
+from app.models.auth import SessionUser
+from app.etag import make_etag, etag_matches, set_etag, not_modified
 from app.models.login import LoginResponse
+from app.responses import ModelJSONResponse, dumps_models
+from app.pagination import decode_cursor
 from app.services.login_service import login_service
+from app.services.export_service import export_service, EXPORT_MEDIA_TYPES
+from app.middleware import TimedRoute
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, STREAM_FETCH_SIZE
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/logins", tags=["Login Audit"])
+router = APIRouter(prefix="/logins", tags=["Login Audit"], route_class=TimedRoute)
 
-@router.get("/", response_model=List[LoginResponse])
-async def get_all_logins():
-    """Get all login records"""
+@router.get("/", response_model=List[LoginResponse], response_class=ModelJSONResponse)
+async def get_all_logins(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor returned in X-Next-Cursor"),
+    id_usuario: Optional[int] = None,
+    ip_login: Optional[str] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    stream: bool = Query(False, description="Stream every matching row as NDJSON (ignores limit)")
+):
+    """Get login records, newest first, paginated by cursor"""
     try:
-        logins = login_service.get_all_logins()
-        return logins
+        if after is not None:
+            decode_cursor(after, 2)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    if stream:
+        def ndjson_lines():
+            for batch in login_service.iter_logins(
+                after, id_usuario, ip_login, data_inicio, data_fim, batch_size=STREAM_FETCH_SIZE
+            ):
+                yield b"".join(dumps_models(login) + b"\n" for login in batch)
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    try:
+        logins, next_cursor = await login_service.get_logins_page_async(
+            limit, after, id_usuario, ip_login, data_inicio, data_fim
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        # Modelos vindos do banco já são confiáveis: serializa direto, sem revalidar
+        return ModelJSONResponse(logins, headers=headers)
         
     except Exception as e:
         logger.error(f"Get all logins error: {e}")
@@ -23,11 +63,44 @@ async def get_all_logins():
             detail="Internal server error"
         )
 
+@router.get("/export")
+async def export_logins(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    id_usuario: Optional[int] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None
+):
+    """Stream the full login audit trail as NDJSON, CSV or Parquet"""
+    if not export_service.supports(format):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Export format '{format}' is not available on this server"
+        )
+
+    return StreamingResponse(
+        export_service.export(format, id_usuario, data_inicio, data_fim),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="logins.{format}"'}
+    )
+
+@router.get("/me", response_model=List[LoginResponse], response_class=ModelJSONResponse)
+async def get_my_logins(current_user: SessionUser = Depends(get_current_user)):
+    """Login records of the user identified by the session token"""
+    try:
+        return ModelJSONResponse(await login_service.get_logins_by_user_async(current_user.id_usuario))
+
+    except Exception as e:
+        logger.error(f"Get my logins error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 @router.get("/{login_id}", response_model=LoginResponse)
 async def get_login(login_id: int):
     """Get login record by ID"""
     try:
-        login = login_service.get_login_by_id(login_id)
+        login = await login_service.get_login_by_id_async(login_id)
         if not login:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -45,12 +118,25 @@ async def get_login(login_id: int):
             detail="Internal server error"
         )
 
-@router.get("/user/{user_id}", response_model=List[LoginResponse])
-async def get_user_logins(user_id: int):
-    """Get all login records for a specific user"""
+@router.get("/user/{user_id}", response_model=List[LoginResponse], response_class=ModelJSONResponse)
+async def get_user_logins(user_id: int, if_none_match: Optional[str] = Header(None)):
+    """Get all login records for a specific user (304 when If-None-Match matches)"""
     try:
-        logins = login_service.get_logins_by_user(user_id)
-        return logins
+        # A auditoria só cresce: quantidade + maior ID_LOGIN identificam a versão da lista.
+        # A consulta de versão serve só para o 304; no 200 o ETag sai das linhas devolvidas,
+        # porque o corpo pode vir de uma leitura compartilhada iniciada antes de um login novo
+        if if_none_match:
+            version = await login_service.get_logins_version_by_user_async(user_id)
+            if version is not None:
+                etag = make_etag("logins_user", user_id, version)
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag)
+
+        # Falha na consulta vira 500 (sem ETag), nunca uma lista vazia cacheável
+        logins = await login_service.get_logins_by_user_async(user_id, raise_errors=True)
+        response = ModelJSONResponse(logins)
+        set_etag(response, make_etag("logins_user", user_id, login_service.logins_version(logins)))
+        return response
         
     except Exception as e:
         logger.error(f"Get user logins error: {e}")
@@ -0,0 +1,72 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import db
+from app.metrics import registry
+from app.middleware import TimedRoute
+from app.services.auth_service import auth_service
+from app.services.login_rate_limiter import login_rate_limiter
+from app.services.login_service import login_service
+from app.services.password_hasher import password_hasher
+from app.services.user_cache import user_cache
+from app.services.usuario_service import usuario_service
+
+router = APIRouter(tags=["Monitoring"], route_class=TimedRoute)
+
+DB_POOL_OPEN = registry.gauge("db_pool_connections_open", "Open database connections")
+DB_POOL_BUSY = registry.gauge("db_pool_connections_busy", "Database connections in use")
+DB_POOL_MAX = registry.gauge("db_pool_connections_max", "Maximum database connections in the pool")
+DB_POOL_ACQUIRES = registry.counter("db_pool_acquires_total", "Connections acquired from the pool")
+DB_POOL_WAIT = registry.counter("db_pool_acquire_wait_seconds_total", "Time spent waiting for a pooled connection")
+HASH_QUEUED = registry.gauge("password_hash_queued", "Password hashing jobs waiting for a worker")
+HASH_RUNNING = registry.gauge("password_hash_running", "Password hashing jobs running")
+HASH_WORKERS = registry.gauge("password_hash_workers", "Password hashing worker processes")
+HASH_REJECTED = registry.counter("password_hash_rejected_total", "Password hashing jobs rejected (queue full or timeout)")
+PASSWORD_REHASHED = registry.counter("password_rehashed_total", "Stored password hashes upgraded to BCRYPT_ROUNDS on login")
+LOGIN_RATE_LIMITED = registry.counter("login_rate_limited_total", "Login attempts rejected before bcrypt", ("key",))
+LOGIN_RATE_LIMIT_KEYS = registry.gauge("login_rate_limit_keys", "IPs / accounts tracked by the login limiter", ("key",))
+SINGLEFLIGHT_CALLS = registry.counter("singleflight_calls_total", "Lookups through a coalescing group", ("group",))
+SINGLEFLIGHT_COALESCED = registry.counter("singleflight_coalesced_total", "Lookups served by an identical call already in flight", ("group",))
+SINGLEFLIGHT_IN_FLIGHT = registry.gauge("singleflight_in_flight", "Distinct lookups currently in flight", ("group",))
+USER_CACHE_REQUESTS = registry.counter("user_cache_requests_total", "User cache lookups", ("index", "result"))
+USER_CACHE_STALE_PUTS = registry.counter("user_cache_stale_puts_total", "Database reads not cached because the user was invalidated meanwhile")
+
+def _collect():
+    pool = db.pool_stats()
+    DB_POOL_OPEN.set(pool.get("open", 0))
+    DB_POOL_BUSY.set(pool.get("busy", 0))
+    if "max" in pool:
+        DB_POOL_MAX.set(pool["max"])
+    if "acquires" in pool:
+        DB_POOL_ACQUIRES.set_total(pool["acquires"])
+        DB_POOL_WAIT.set_total(pool["wait_time_total_ms"] / 1000)
+
+    hasher = password_hasher.stats()
+    HASH_QUEUED.set(hasher["queued"])
+    HASH_RUNNING.set(hasher["running"])
+    HASH_WORKERS.set(hasher["workers"])
+    HASH_REJECTED.set_total(hasher["rejected"])
+    PASSWORD_REHASHED.set_total(auth_service.rehashed)
+
+    for key, limiter in (("ip", login_rate_limiter.by_ip), ("email", login_rate_limiter.by_email)):
+        stats = limiter.stats()
+        LOGIN_RATE_LIMITED.set_total(stats["rejected"], key)
+        LOGIN_RATE_LIMIT_KEYS.set(stats["keys"], key)
+
+    for group in (usuario_service.lookups, login_service.user_lookups):
+        stats = group.stats()
+        SINGLEFLIGHT_CALLS.set_total(stats["calls"], group.name)
+        SINGLEFLIGHT_COALESCED.set_total(stats["coalesced"], group.name)
+        SINGLEFLIGHT_IN_FLIGHT.set(stats["in_flight"], group.name)
+
+    for index, stats in user_cache.stats().items():
+        USER_CACHE_REQUESTS.set_total(stats["hits"], index, "hit")
+        USER_CACHE_REQUESTS.set_total(stats["misses"], index, "miss")
+    USER_CACHE_STALE_PUTS.set_total(user_cache.stale_puts)
+
+registry.add_collector(_collect)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,27 +1,36 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, status, Query, Request, Response
+from pydantic import ValidationError
+from typing import List, Literal, Optional
+from datetime import datetime
+import csv
+import io
+import json
 import logging
 
-from app.models.usuario import Usuario, UsuarioCreate, UsuarioUpdate, UsuarioResponse
+from app.models.usuario import (
+    Usuario,
+    UsuarioCreate,
+    UsuarioUpdate,
+    UsuarioResponse,
+    BulkImportRowResult,
+    BulkImportResponse,
+)
+from app.etag import make_etag, model_version, etag_matches, set_etag, not_modified
+from app.responses import ModelJSONResponse
 from app.services.usuario_service import usuario_service
+from app.services.password_hasher import PasswordHasherBusy
+from app.middleware import TimedRoute
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, BULK_IMPORT_MAX_ROWS
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/usuarios", tags=["Users"])
+router = APIRouter(prefix="/usuarios", tags=["Users"], route_class=TimedRoute)
 
 @router.post("/", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
 async def create_usuario(usuario: UsuarioCreate):
-    """Create a new user"""
+    """Create a new user (duplicate emails are rejected by the unique constraint)"""
     try:
-        # Check if user already exists
-        existing_user = usuario_service.get_usuario_by_email(usuario.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        new_usuario = usuario_service.create_usuario(usuario)
+        new_usuario = await usuario_service.create_usuario_async(usuario)
         if not new_usuario:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -32,6 +41,11 @@ async def create_usuario(usuario: UsuarioCreate):
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
     except Exception as e:
         logger.error(f"Create user error: {e}")
         raise HTTPException(
@@ -39,13 +53,126 @@ async def create_usuario(usuario: UsuarioCreate):
             detail="Internal server error"
         )
 
-@router.get("/", response_model=List[UsuarioResponse])
-async def get_all_usuarios():
-    """Get all users"""
+def _parse_bulk_body(body: str, content_type: str):
+    """Yield (row number, dict or parse error) from a CSV or JSON lines body"""
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(body))
+        for row_number, row in enumerate(reader, start=1):
+            # Campos além do cabeçalho ficam sob a chave None no DictReader
+            if None in row:
+                yield row_number, "More fields than the header"
+                continue
+            yield row_number, row
+        return
+
+    row_number = 0
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield row_number, "Invalid JSON"
+            continue
+        yield row_number, data if isinstance(data, dict) else "Expected a JSON object"
+
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_create_usuarios(request: Request):
+    """Import many users from JSON lines (application/x-ndjson) or CSV (text/csv) with a header row
+
+    Each row is validated, hashed and inserted independently; failures are reported per row.
+    """
+    content_type = request.headers.get("content-type", "")
+    body = (await request.body()).decode("utf-8-sig", errors="replace")
+
+    results = []
+    usuarios = []
+    for row_number, data in _parse_bulk_body(body, content_type):
+        if len(results) >= BULK_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Maximum of {BULK_IMPORT_MAX_ROWS} rows per import"
+            )
+        if isinstance(data, str):
+            results.append(BulkImportRowResult(row=row_number, status="error", error=data))
+            continue
+        try:
+            usuario = UsuarioCreate(**data)
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results.append(BulkImportRowResult(row=row_number, email=data.get("email"), status="error", error=error))
+            continue
+        result = BulkImportRowResult(row=row_number, email=usuario.email, status="created")
+        results.append(result)
+        usuarios.append((result, usuario))
+
+    try:
+        errors = await usuario_service.bulk_create_usuarios_async([usuario for _, usuario in usuarios])
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
+    except Exception as e:
+        logger.error(f"Bulk create users error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+    for (result, _), error in zip(usuarios, errors):
+        if error is not None:
+            result.status = "error"
+            result.error = error
+
+    failed = sum(1 for result in results if result.status == "error")
+    return BulkImportResponse(
+        total=len(results),
+        created=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+@router.get("/", response_model=List[UsuarioResponse], response_class=ModelJSONResponse)
+async def get_all_usuarios(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor returned in X-Next-Cursor"),
+    sort: Literal["data_criacao", "id_usuario", "nome_usuario", "email"] = "data_criacao",
+    order: Literal["asc", "desc"] = "desc",
+    id_perfil: Optional[int] = None,
+    data_inicio: Optional[datetime] = Query(None, description="Created at or after"),
+    data_fim: Optional[datetime] = Query(None, description="Created at or before"),
+    include_total: bool = Query(False, description="Return the filtered total in X-Total-Count"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get users, paginated by cursor (304 when If-None-Match matches the page's ETag)"""
     try:
-        usuarios = usuario_service.get_all_usuarios()
-        return usuarios
+        usuarios, next_cursor, total = await usuario_service.get_usuarios_page_async(
+            limit, after, sort, order, id_perfil, data_inicio, data_fim, include_total
+        )
+        headers = {}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        if total is not None:
+            headers["X-Total-Count"] = str(total)
+
+        # Versão da página = valores das linhas + cabeçalhos: o 304 pula validação e serialização
+        etag = make_etag("usuarios", next_cursor, total, model_version(usuarios))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, headers)
+        # Modelos vindos do banco já são confiáveis: serializa direto, sem revalidar
+        response = ModelJSONResponse(usuarios, headers=headers)
+        set_etag(response, etag)
+        return response
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Get all users error: {e}")
         raise HTTPException(
@@ -54,16 +181,20 @@ async def get_all_usuarios():
         )
 
 @router.get("/{user_id}", response_model=UsuarioResponse)
-async def get_usuario(user_id: int):
-    """Get user by ID"""
+async def get_usuario(user_id: int, response: Response, if_none_match: Optional[str] = Header(None)):
+    """Get user by ID (304 when If-None-Match matches the user's ETag)"""
     try:
-        usuario = usuario_service.get_usuario_by_id(user_id)
+        usuario = await usuario_service.get_usuario_by_id_async(user_id)
         if not usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
+        etag = make_etag("usuario", model_version([usuario]))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         return usuario
         
     except HTTPException:
@@ -80,7 +211,7 @@ async def update_usuario(user_id: int, usuario_update: UsuarioUpdate):
     """Update user"""
     try:
         # Check if user exists
-        existing_usuario = usuario_service.get_usuario_by_id(user_id)
+        existing_usuario = await usuario_service.get_usuario_by_id_async(user_id)
         if not existing_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -89,14 +220,14 @@ async def update_usuario(user_id: int, usuario_update: UsuarioUpdate):
         
         # Check if email is being changed and if it already exists
         if usuario_update.email and usuario_update.email != existing_usuario.email:
-            email_exists = usuario_service.get_usuario_by_email(usuario_update.email)
+            email_exists = await usuario_service.get_usuario_by_email_async(usuario_update.email)
             if email_exists:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already registered"
                 )
         
-        updated_usuario = usuario_service.update_usuario(user_id, usuario_update)
+        updated_usuario = await usuario_service.update_usuario_async(user_id, usuario_update)
         if not updated_usuario:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -107,6 +238,11 @@ async def update_usuario(user_id: int, usuario_update: UsuarioUpdate):
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
     except Exception as e:
         logger.error(f"Update user error: {e}")
         raise HTTPException(
@@ -119,14 +255,14 @@ async def delete_usuario(user_id: int):
     """Delete user"""
     try:
         # Check if user exists
-        existing_usuario = usuario_service.get_usuario_by_id(user_id)
+        existing_usuario = await usuario_service.get_usuario_by_id_async(user_id)
         if not existing_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        success = usuario_service.delete_usuario(user_id)
+        success = await usuario_service.delete_usuario_async(user_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
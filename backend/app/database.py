@@ -1,15 +1,204 @@
 import oracledb
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL,
+    DB_POOL_ENABLED,
+    DB_POOL_MIN,
+    DB_POOL_MAX,
+    DB_POOL_INCREMENT,
+    DB_POOL_WAIT_TIMEOUT_MS,
+    DB_EXECUTOR_WORKERS,
+    DB_BACKEND,
+    SQLITE_PATH,
+)
+from app.mapping import model_rowfactory
+from app.metrics import record_phase
+from app.query_stats import (
+    instrumented,
+    instrumented_stream,
+    rows_returned,
+    rows_affected,
+    rows_returning,
+    rows_batched,
+)
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
+import contextvars
+import functools
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-class Database:
+# Falha de uma linha em execute_batch (offset = posição da linha no lote)
+BatchError = namedtuple("BatchError", ["offset", "message", "unique_violation"])
+
+class DatabaseBackend(ABC):
+    """Interface behind `db`: services only use these methods, never the driver directly
+
+    Subclasses must implement every abstract method (a missing one fails at
+    instantiation, not on first use); running them off the event loop (run and
+    the *_async wrappers) is shared.
+    """
+
+    name = "base"
+
     def __init__(self):
+        self.executor = None
+        self._executor_lock = threading.Lock()
+
+    def get_executor(self):
+        """Get (creating on first use) the bounded thread pool used by the async API"""
+        if self.executor is None:
+            with self._executor_lock:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(
+                        max_workers=DB_EXECUTOR_WORKERS,
+                        thread_name_prefix="db"
+                    )
+        return self.executor
+
+    def shutdown_executor(self):
+        """Stop the executor threads"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking database call on the executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.get_executor(), call)
+        finally:
+            # Inclui a espera por uma thread livre: sob carga, ela também é tempo de banco
+            record_phase("db", time.perf_counter() - started)
+
+    @abstractmethod
+    def pool_stats(self):
+        """Connection statistics shown in /health"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def warm_up(self) -> int:
+        """Open the connections up front and check each with a round trip; returns how many"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def close_connection(self):
+        """Close every connection held by the backend"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_query(self, query, params=None, model=None):
+        """Execute a SELECT query (rows are built as `model` instances, unvalidated, when given)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream_query(self, query, params=None, arraysize=1000, model=None):
+        """Execute a SELECT query and yield the rows in batches of arraysize"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_insert(self, query, params=None):
+        """Execute an INSERT query"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_update(self, query, params=None):
+        """Execute an UPDATE query"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_delete(self, query, params=None):
+        """Execute a DELETE query"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_returning(self, query, params=None, returning=None):
+        """Execute a DML statement or PL/SQL block with OUT binds, commit and return their values"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_unique_violation(self, error):
+        """True if the error is a unique constraint violation"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_many(self, query, params_list):
+        """Execute a DML statement for many rows in one round trip"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def execute_batch(self, query, params_list):
+        """Execute a DML statement for many rows, committing the rows that succeed"""
+        raise NotImplementedError
+
+    async def execute_query_async(self, query, params=None, model=None):
+        """Async counterpart of execute_query"""
+        return await self.run(self.execute_query, query, params, model)
+
+    async def execute_insert_async(self, query, params=None):
+        """Async counterpart of execute_insert"""
+        return await self.run(self.execute_insert, query, params)
+
+    async def execute_update_async(self, query, params=None):
+        """Async counterpart of execute_update"""
+        return await self.run(self.execute_update, query, params)
+
+    async def execute_delete_async(self, query, params=None):
+        """Async counterpart of execute_delete"""
+        return await self.run(self.execute_delete, query, params)
+
+class OracleDatabase(DatabaseBackend):
+    """Oracle backend (oracledb), pooled or on a single shared connection"""
+
+    name = "oracle"
+
+    def __init__(self, use_pool=DB_POOL_ENABLED):
+        super().__init__()
+        self.use_pool = use_pool
         self.connection = None
-    
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        # Sem pool há uma única sessão: cada operação a usa com exclusividade (Lock e não RLock:
+        # o stream_query pode ser liberado por outra thread do StreamingResponse)
+        self._connection_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._acquires = 0
+        self._acquire_wait_total = 0.0
+        self._acquire_wait_max = 0.0
+
+    def get_pool(self):
+        """Get (creating on first use) the connection pool"""
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    try:
+                        self.pool = oracledb.create_pool(
+                            dsn=DATABASE_URL,
+                            min=DB_POOL_MIN,
+                            max=DB_POOL_MAX,
+                            increment=DB_POOL_INCREMENT,
+                            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                            wait_timeout=DB_POOL_WAIT_TIMEOUT_MS
+                        )
+                        logger.info(
+                            f"Database pool created (min={DB_POOL_MIN}, max={DB_POOL_MAX}, "
+                            f"increment={DB_POOL_INCREMENT})"
+                        )
+                    except Exception as e:
+                        logger.error(f"Database pool creation error: {e}")
+                        raise e
+        return self.pool
+
     def get_connection(self):
-        """Get database connection"""
+        """Get the shared database connection (non-pooled mode)"""
         try:
             if self.connection is None:
                 self.connection = oracledb.connect(DATABASE_URL)
@@ -18,74 +207,304 @@ class Database:
         except Exception as e:
             logger.error(f"Database connection error: {e}")
             raise e
-    
+
+    @contextmanager
+    def connection_scope(self):
+        """Acquire a connection for a single operation and release it afterwards
+
+        Without the pool, operations take turns on the shared connection: commits and
+        rollbacks of one request never touch another request's work.
+        """
+        if not self.use_pool:
+            with self._connection_lock:
+                yield self.get_connection()
+            return
+
+        pool = self.get_pool()
+        started = time.perf_counter()
+        conn = pool.acquire()
+        self._record_acquire(time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+
+    def _record_acquire(self, waited):
+        with self._stats_lock:
+            self._acquires += 1
+            self._acquire_wait_total += waited
+            if waited > self._acquire_wait_max:
+                self._acquire_wait_max = waited
+
+    def pool_stats(self):
+        """Live connection pool statistics"""
+        if not self.use_pool:
+            return {"mode": "single", "open": 1 if self.connection else 0}
+
+        with self._stats_lock:
+            acquires = self._acquires
+            wait_total = self._acquire_wait_total
+            wait_max = self._acquire_wait_max
+
+        stats = {
+            "mode": "pool",
+            "min": DB_POOL_MIN,
+            "max": DB_POOL_MAX,
+            "increment": DB_POOL_INCREMENT,
+            "busy": 0,
+            "open": 0,
+            "acquires": acquires,
+            "wait_time_total_ms": round(wait_total * 1000, 3),
+            "wait_time_avg_ms": round(wait_total * 1000 / acquires, 3) if acquires else 0.0,
+            "wait_time_max_ms": round(wait_max * 1000, 3),
+        }
+        if self.pool is not None:
+            stats["busy"] = self.pool.busy
+            stats["open"] = self.pool.opened
+        return stats
+
+    def warm_up(self) -> int:
+        """Open the pool's minimum connections (or the single connection) and ping each one"""
+        if not self.use_pool:
+            with self.connection_scope() as conn:
+                conn.ping()
+            return 1
+
+        pool = self.get_pool()
+        # Segura DB_POOL_MIN conexões ao mesmo tempo para que todas sejam abertas e testadas
+        connections = []
+        try:
+            for _ in range(max(DB_POOL_MIN, 1)):
+                connections.append(pool.acquire())
+            for conn in connections:
+                conn.ping()
+        finally:
+            for conn in connections:
+                pool.release(conn)
+        return len(connections)
+
     def close_connection(self):
-        """Close database connection"""
+        """Close database connection and pool"""
         if self.connection:
             self.connection.close()
             self.connection = None
             logger.info("Database connection closed")
-    
-    def execute_query(self, query, params=None):
-        """Execute a SELECT query"""
+        if self.pool is not None:
+            self.pool.close(force=True)
+            self.pool = None
+            logger.info("Database pool closed")
+        self.shutdown_executor()
+
+    @instrumented(rows_returned)
+    def execute_query(self, query, params=None, model=None):
+        """Execute a SELECT query (rows are built as `model` instances, unvalidated, when given)"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or {})
-            result = cursor.fetchall()
-            cursor.close()
-            return result
+            with self.connection_scope() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params or {})
+                if model is not None:
+                    cursor.rowfactory = model_rowfactory(cursor, model)
+                result = cursor.fetchall()
+                cursor.close()
+                return result
         except Exception as e:
             logger.error(f"Query execution error: {e}")
             raise e
-    
+
+    @instrumented_stream
+    def stream_query(self, query, params=None, arraysize=1000, model=None):
+        """Execute a SELECT query and yield the rows in batches of arraysize"""
+        try:
+            with self.connection_scope() as conn:
+                cursor = conn.cursor()
+                cursor.arraysize = arraysize
+                cursor.prefetchrows = arraysize
+                try:
+                    cursor.execute(query, params or {})
+                    if model is not None:
+                        cursor.rowfactory = model_rowfactory(cursor, model)
+                    while True:
+                        rows = cursor.fetchmany()
+                        if not rows:
+                            break
+                        yield rows
+                finally:
+                    cursor.close()
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            logger.error(f"Stream query error: {e}")
+            raise e
+
+    @instrumented(rows_affected)
     def execute_insert(self, query, params=None):
         """Execute an INSERT query"""
-        conn = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or {})
-            conn.commit()
-            cursor.close()
-            return cursor.rowcount
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(query, params or {})
+                    rowcount = cursor.rowcount
+                    conn.commit()
+                    cursor.close()
+                    return rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
         except Exception as e:
             logger.error(f"Insert execution error: {e}")
-            if conn:
-                conn.rollback()
             raise e
-    
+
+    @instrumented(rows_affected)
     def execute_update(self, query, params=None):
         """Execute an UPDATE query"""
-        conn = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or {})
-            conn.commit()
-            cursor.close()
-            return cursor.rowcount
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(query, params or {})
+                    rowcount = cursor.rowcount
+                    conn.commit()
+                    cursor.close()
+                    return rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
         except Exception as e:
             logger.error(f"Update execution error: {e}")
-            if conn:
-                conn.rollback()
             raise e
-    
+
+    @instrumented(rows_affected)
     def execute_delete(self, query, params=None):
         """Execute a DELETE query"""
-        conn = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or {})
-            conn.commit()
-            cursor.close()
-            return cursor.rowcount
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(query, params or {})
+                    rowcount = cursor.rowcount
+                    conn.commit()
+                    cursor.close()
+                    return rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
         except Exception as e:
             logger.error(f"Delete execution error: {e}")
-            if conn:
-                conn.rollback()
             raise e
 
+    @instrumented(rows_returning)
+    def execute_returning(self, query, params=None, returning=None):
+        """Execute a DML statement or PL/SQL block with OUT binds, commit and return their values
+
+        returning maps each OUT bind name to its Python type (e.g. {"out_id": int}).
+        """
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    out_vars = {name: cursor.var(typ) for name, typ in (returning or {}).items()}
+                    cursor.execute(query, {**(params or {}), **out_vars})
+                    values = {}
+                    for name, var in out_vars.items():
+                        value = var.getvalue()
+                        # RETURNING INTO em DML devolve uma lista (uma posição por linha afetada)
+                        if isinstance(value, list):
+                            value = value[0] if value else None
+                        values[name] = value
+                    conn.commit()
+                    cursor.close()
+                    return values
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Returning execution error: {e}")
+            raise e
+
+    def is_unique_violation(self, error):
+        """True if the error is a unique constraint violation (ORA-00001)"""
+        if isinstance(error, oracledb.IntegrityError) and error.args:
+            return getattr(error.args[0], "code", None) == 1
+        return False
+
+    @instrumented(rows_affected)
+    def execute_many(self, query, params_list):
+        """Execute a DML statement for many rows in one round trip (array DML)"""
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    cursor.executemany(query, params_list)
+                    rowcount = cursor.rowcount
+                    conn.commit()
+                    cursor.close()
+                    return rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Batch execution error: {e}")
+            raise e
+
+    @instrumented(rows_batched)
+    def execute_batch(self, query, params_list):
+        """Execute a DML statement or PL/SQL block for many rows, committing the rows that succeed
+
+        Uses batch errors so a failing row (e.g. a duplicate key) does not abort
+        the others. Returns a list of BatchError for the rows that failed.
+        """
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    if _is_plsql(query):
+                        errors = self._execute_plsql_batch(cursor, query, params_list)
+                    else:
+                        cursor.executemany(query, params_list, batcherrors=True)
+                        errors = [
+                            BatchError(error.offset, error.message, error.code == 1)
+                            for error in cursor.getbatcherrors()
+                        ]
+                    conn.commit()
+                    cursor.close()
+                    return errors
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Batch execution error: {e}")
+            raise e
+
+    def _execute_plsql_batch(self, cursor, query, params_list):
+        # batcherrors só vale para DML; em PL/SQL o executemany para na primeira linha com erro e
+        # error.offset diz qual foi: registra a linha e continua do seguinte. Erros que não são
+        # de dados (conexão, timeout...) sobem e desfazem o lote inteiro
+        errors = []
+        start = 0
+        while start < len(params_list):
+            try:
+                cursor.executemany(query, params_list[start:])
+                break
+            except (oracledb.IntegrityError, oracledb.DataError) as e:
+                error = e.args[0]
+                if not 0 <= error.offset < len(params_list) - start:
+                    raise
+                errors.append(BatchError(start + error.offset, error.message, error.code == 1))
+                start += error.offset + 1
+        return errors
+
+def _is_plsql(query: str) -> bool:
+    return query.lstrip().upper().startswith(("BEGIN", "DECLARE"))
+
+def create_database() -> DatabaseBackend:
+    """Build the backend selected by DB_BACKEND ("oracle" or "sqlite")"""
+    if DB_BACKEND == "sqlite":
+        from app.sqlite_database import SQLiteDatabase
+        return SQLiteDatabase(SQLITE_PATH)
+    if DB_BACKEND != "oracle":
+        raise ValueError(f"Unknown DB_BACKEND: {DB_BACKEND}")
+    return OracleDatabase()
+
 # Global database instance
-db = Database()
+db = create_database()
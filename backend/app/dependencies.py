@@ -0,0 +1,28 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Optional
+
+from app.models.auth import SessionUser
+from app.services.token_service import token_service, InvalidToken
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> SessionUser:
+    """Session user from the `Authorization: Bearer <token>` header (no database or bcrypt work)"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        claims = token_service.verify(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'}
+        )
+    return SessionUser(id_usuario=int(claims["sub"]), nome_usuario=claims.get("name"), expires_at=claims["exp"])
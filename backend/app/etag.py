@@ -0,0 +1,43 @@
+from typing import Optional
+import hashlib
+
+from fastapi import Response
+
+# ETags fortes para GETs condicionais: o cliente reenvia o valor em If-None-Match
+# e recebe 304 sem corpo enquanto o recurso não mudar
+
+def make_etag(*parts) -> str:
+    """Strong ETag from a resource version (any values with a stable repr)"""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def model_version(models) -> tuple:
+    """Field values of pydantic models, in order: changes whenever any field of any row changes"""
+    # Na ordem de declaração dos campos: o __dict__ de um modelo do row builder segue a ordem
+    # das colunas do SELECT, e o mesmo usuário não pode ter dois ETags
+    return tuple(tuple(getattr(model, name) for name in type(model).model_fields) for model in models)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    # Pode guardar, mas tem que revalidar sempre (o 304 é barato)
+    response.headers["Cache-Control"] = "no-cache"
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Empty 304 response carrying the current ETag"""
+    response = Response(status_code=304, headers=headers)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+
+from app.database import db
+from app.services.login_service import login_service
+from app.services.password_hasher import password_hasher
+from config import STARTUP_WARMUP, WARMUP_RETRY_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class Lifecycle:
+    """Startup warm-up, readiness and graceful shutdown of the API process"""
+
+    def __init__(self):
+        self.ready = False
+        self.warmed_at = None
+        self.last_error = None
+        self._retry_task = None
+
+    async def warm_up(self):
+        """Open and check the database connections and start the hashing workers"""
+        started = time.perf_counter()
+        connections = await db.run(db.warm_up)
+        workers = await password_hasher.warm_up()
+        self.warmed_at = time.time()
+        logger.info(
+            f"Warm-up finished in {time.perf_counter() - started:.2f}s "
+            f"({connections} {db.name} connections, {workers} hashing workers)"
+        )
+
+    async def _retry_warm_up(self):
+        delay = 1.0
+        while not self.ready:
+            await asyncio.sleep(delay)
+            try:
+                await self.warm_up()
+                self.ready = True
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Warm-up failed, retrying in {delay:.0f}s: {e}")
+                delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    async def startup(self):
+        """Warm up before serving; if the database is down, keep retrying in the background (not ready)"""
+        if not STARTUP_WARMUP:
+            self.ready = True
+            return
+        try:
+            await self.warm_up()
+            self.ready = True
+        except Exception as e:
+            # O processo sobe mesmo assim: /health responde e /ready fica 503 até aquecer
+            self.last_error = str(e)
+            logger.error(f"Warm-up failed, serving as not ready: {e}")
+            self._retry_task = asyncio.create_task(self._retry_warm_up())
+
+    async def shutdown(self):
+        """Flush the audit backlog, then release workers and connections
+
+        Runs after uvicorn has stopped accepting connections and waited (up to
+        --timeout-graceful-shutdown) for the requests in flight.
+        """
+        self.ready = False
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+
+        try:
+            # Grava o que ainda está no buffer da auditoria antes de fechar o banco
+            await db.run(login_service.close)
+        except Exception as e:
+            logger.error(f"Audit flush on shutdown failed: {e}")
+        password_hasher.shutdown()
+        db.close_connection()
+        logger.info("Shutdown complete")
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "warmed_at": self.warmed_at,
+            "last_error": self.last_error,
+        }
+
+# Global lifecycle instance (used by the lifespan handler in main.py)
+lifecycle = Lifecycle()
@@ -0,0 +1,64 @@
+from typing import Callable, List, Type
+
+from pydantic import BaseModel
+
+# Mapeamento de linhas do banco para modelos sem validação.
+# Os dados vêm do nosso próprio schema, então a validação do pydantic é custo puro aqui.
+
+# Slots internos do BaseModel preenchidos pelo builder rápido
+_MODEL_SLOTS = ("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")
+
+def column_names(description) -> List[str]:
+    """Lower-cased column names from a DB-API cursor description"""
+    return [column[0].lower() for column in description]
+
+def model_row_builder(model: Type[BaseModel], names: List[str]) -> Callable:
+    """Return a function building `model` instances from row tuples, skipping validation
+
+    Columns are matched to fields by name, so SELECT lists just need to use the
+    field names (case-insensitive). Fields without a column get their defaults,
+    built again for every row.
+    """
+    fields = model.model_fields
+    defaults = [
+        (name, field)
+        for name, field in fields.items()
+        if name not in names and not field.is_required()
+    ]
+    unknown = [name for name in names if name not in fields]
+    slots = BaseModel.__dict__
+    required_missing = any(name not in names and field.is_required() for name, field in fields.items())
+    if unknown or required_missing or not all(slot in slots for slot in _MODEL_SLOTS):
+        # Colunas que não batem com o modelo (ou pydantic sem esses slots): caminho público
+        construct = model.model_construct
+        return lambda row: construct(**dict(zip(names, row)))
+
+    fields_set = set(names)
+    new = object.__new__
+    # Escreve direto nos slots do BaseModel, o mesmo estado que model_construct() deixa,
+    # mas ~2x mais rápido que ele no pydantic 2.4 (model_construct chega a ser mais lento
+    # que a validação completa). Depende dos internos do pydantic: versão fixada em
+    # requirements.txt e coberta por tests/test_mapping.py
+    set_dict = slots["__dict__"].__set__
+    set_fields_set = slots["__pydantic_fields_set__"].__set__
+    set_extra = slots["__pydantic_extra__"].__set__
+    set_private = slots["__pydantic_private__"].__set__
+
+    def build(row):
+        instance = new(model)
+        values = dict(zip(names, row))
+        for name, field in defaults:
+            # Um default novo por linha: default_factory é chamada e defaults mutáveis são copiados
+            values[name] = field.get_default(call_default_factory=True)
+        set_dict(instance, values)
+        set_fields_set(instance, fields_set)
+        set_extra(instance, None)
+        set_private(instance, None)
+        return instance
+
+    return build
+
+def model_rowfactory(cursor, model: Type[BaseModel]) -> Callable:
+    """oracledb rowfactory (called with the row values as arguments) producing `model` instances"""
+    build = model_row_builder(model, column_names(cursor.description))
+    return lambda *row: build(row)
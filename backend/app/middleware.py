@@ -0,0 +1,102 @@
+from fastapi.routing import APIRoute
+import asyncio
+import functools
+import time
+
+from app.metrics import registry, current_timing, start_request_timing, end_request_timing
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+REQUEST_PHASE = registry.histogram(
+    "http_request_phase_seconds",
+    "Time spent per request in each phase (db, hash, hash_queue, serialize, other)",
+    ("route", "phase")
+)
+IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being processed")
+
+def _timed_endpoint(call):
+    """Wrap an async endpoint so the time spent inside it is known to TimedRoute"""
+    if not asyncio.iscoroutinefunction(call):
+        return call
+
+    @functools.wraps(call)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            timing = current_timing()
+            if timing is not None:
+                timing.endpoint += time.perf_counter() - started
+
+    return timed
+
+class TimedRoute(APIRoute):
+    """APIRoute that labels the request with its path template and measures serialization
+
+    Serialization is the handler time outside the endpoint: request parsing plus
+    response validation, encoding and rendering.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # O handler lê dependant.call a cada requisição, então basta trocar aqui
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def timed_handler(request):
+            timing = current_timing()
+            if timing is None:
+                return await handler(request)
+            timing.route = route
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                timing.add("serialize", max(time.perf_counter() - started - timing.endpoint, 0.0))
+
+        return timed_handler
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and phase breakdown of every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        timing, token = start_request_timing()
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            end_request_timing(token)
+
+            # Rotas não encontradas ficam agrupadas para não explodir a cardinalidade
+            route = timing.route or "unmatched"
+            REQUESTS.inc(scope["method"], route, status_code)
+            REQUEST_DURATION.observe(elapsed, scope["method"], route)
+            for phase, seconds in timing.phases.items():
+                REQUEST_PHASE.observe(seconds, route, phase)
+            REQUEST_PHASE.observe(max(elapsed - sum(timing.phases.values()), 0.0), route, "other")
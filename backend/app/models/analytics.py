@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class LoginRollupResponse(BaseModel):
+    dimensao: str
+    chave: str
+    total_logins: int
+    primeiro_login: Optional[datetime] = None
+    ultimo_login: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
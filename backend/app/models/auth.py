@@ -10,3 +10,12 @@ class LoginResponse(BaseModel):
     message: str
     user_id: Optional[int] = None
     user_name: Optional[str] = None
+    access_token: Optional[str] = None
+    token_type: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class SessionUser(BaseModel):
+    """Identity carried by a session token (read from the token, not from the database)"""
+    id_usuario: int
+    nome_usuario: Optional[str] = None
+    expires_at: int
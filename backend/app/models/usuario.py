@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UsuarioBase(BaseModel):
@@ -41,3 +41,15 @@ class UsuarioResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class BulkImportRowResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+class BulkImportResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BulkImportRowResult]
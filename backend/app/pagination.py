@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import datetime
+
+# Cursores opacos para paginação keyset: lista de valores (datas em ISO) em base64 url-safe
+
+def encode_cursor(values: list) -> str:
+    """Encode the keyset values of the last row of a page into an opaque cursor"""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor; raises ValueError if it is invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, list) or len(payload) != size:
+        raise ValueError("Invalid cursor")
+    try:
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,164 @@
+from typing import Optional
+import functools
+import logging
+import re
+import threading
+import time
+
+from config import SLOW_QUERY_MS, QUERY_STATS_MAX_STATEMENTS
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """Normalize a statement: single spaces, literals replaced by ? (binds keep their names)"""
+    normalized = " ".join(query.split())
+    normalized = _STRING_RE.sub("?", normalized)
+    return _NUMBER_RE.sub("?", normalized)
+
+def bind_names(params) -> list:
+    """Bind names of a params dict (or of the first row of a params list); values are never kept"""
+    if isinstance(params, (list, tuple)):
+        params = params[0] if params else None
+    return sorted(params) if isinstance(params, dict) else []
+
+class QueryStats:
+    """Per-fingerprint call count, timing and row counts of every statement run through `db`"""
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, max_statements=QUERY_STATS_MAX_STATEMENTS):
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.started_at = time.time()
+
+    def record(self, query: str, params, elapsed: float, rows: int, error: bool = False):
+        key = fingerprint(query)
+        elapsed_ms = elapsed * 1000
+        slow = self.slow_query_ms > 0 and elapsed_ms >= self.slow_query_ms
+
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= self.max_statements:
+                    self.dropped += 1
+                else:
+                    entry = self._stats[key] = {
+                        "calls": 0, "errors": 0, "slow_calls": 0, "rows": 0,
+                        "total_ms": 0.0, "max_ms": 0.0, "bind_names": bind_names(params),
+                    }
+            if entry is not None:
+                entry["calls"] += 1
+                entry["rows"] += rows
+                entry["total_ms"] += elapsed_ms
+                if elapsed_ms > entry["max_ms"]:
+                    entry["max_ms"] = elapsed_ms
+                if error:
+                    entry["errors"] += 1
+                if slow:
+                    entry["slow_calls"] += 1
+
+        if slow:
+            # Só os nomes dos binds: os valores podem ter e-mails e hashes de senha
+            logger.warning(
+                f"Slow query ({elapsed_ms:.1f} ms, {rows} rows{', failed' if error else ''}): "
+                f"{key} binds={bind_names(params)}"
+            )
+
+    def snapshot(self, sort: str = "total_ms", limit: Optional[int] = None) -> list:
+        """Statements ordered by sort (total_ms, avg_ms, max_ms, calls, rows, errors or slow_calls), largest first"""
+        with self._lock:
+            items = [(key, dict(entry)) for key, entry in self._stats.items()]
+
+        result = []
+        for key, entry in items:
+            entry["statement"] = key
+            entry["avg_ms"] = round(entry["total_ms"] / entry["calls"], 3) if entry["calls"] else 0.0
+            entry["rows_per_call"] = round(entry["rows"] / entry["calls"], 2) if entry["calls"] else 0.0
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+            result.append(entry)
+        result.sort(key=lambda entry: entry[sort], reverse=True)
+        return result[:limit] if limit else result
+
+    def summary(self):
+        with self._lock:
+            return {
+                "statements": len(self._stats),
+                "max_statements": self.max_statements,
+                "dropped_calls": self.dropped,
+                "slow_query_ms": self.slow_query_ms,
+                "since": self.started_at,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.dropped = 0
+            self.started_at = time.time()
+
+# Global query statistics instance (shared by every database backend)
+query_stats = QueryStats()
+
+def instrumented(count_rows):
+    """Decorator for Database.execute_* methods: times the call and records it in query_stats
+
+    count_rows(result, params) returns the rows returned or affected.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, query, params=None, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = method(self, query, params, *args, **kwargs)
+            except Exception:
+                query_stats.record(query, params, time.perf_counter() - started, 0, error=True)
+                raise
+            query_stats.record(query, params, time.perf_counter() - started, count_rows(result, params))
+            return result
+        return wrapper
+    return decorator
+
+def instrumented_stream(method):
+    """Decorator for stream_query: only the time spent fetching counts, not the consumer's"""
+    @functools.wraps(method)
+    def wrapper(self, query, params=None, *args, **kwargs):
+        batches = method(self, query, params, *args, **kwargs)
+        elapsed = 0.0
+        rows = 0
+        error = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    batch = next(batches)
+                except StopIteration:
+                    break
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                rows += len(batch)
+                yield batch
+        finally:
+            batches.close()
+            query_stats.record(query, params, elapsed, rows, error=error)
+    return wrapper
+
+def rows_returned(result, params):
+    return len(result)
+
+def rows_affected(result, params):
+    # rowcount é -1 quando o driver não sabe (ex.: blocos PL/SQL)
+    return result if isinstance(result, int) and result > 0 else 0
+
+def rows_returning(result, params):
+    return 1
+
+def rows_batched(result, params):
+    return len(params) - len(result)
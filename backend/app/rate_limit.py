@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from itertools import islice
+import threading
+import time
+
+# Quantas chaves (a partir da menos recente) são examinadas atrás de um bucket já cheio
+_EVICTION_SCAN = 16
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets per key, with bounded memory
+
+    Each key holds up to `burst` tokens refilled at `rate` tokens per second; an attempt
+    costs one token. A bucket that has refilled completely is the same as a missing one,
+    so idle keys are dropped (oldest first) and at most `maxsize` keys are kept. When the
+    table is full, a new key replaces a bucket that has already refilled; only if none has
+    (a flood of distinct keys) the least recently used bucket goes, which may reset its
+    limit but never locks new clients out.
+    """
+
+    def __init__(self, rate: float, burst: int, maxsize: int):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = max(1, maxsize)
+        # Tempo ocioso após o qual o bucket está cheio de novo e pode ser descartado
+        self.idle_ttl = burst / rate if rate > 0 else float("inf")
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.forced_evictions = 0
+
+    def acquire(self, key) -> float:
+        """Take a token for key; returns 0 when allowed, otherwise the seconds until the next token"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._buckets.pop(key, None)
+            if entry is None and len(self._buckets) >= self.maxsize and not self._evict_refilled(now):
+                # Tabela cheia de chaves ativas (flood de chaves distintas): recusar a chave nova
+                # deixaria todo cliente novo de fora, então sai o bucket menos recente
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+                self.forced_evictions += 1
+            if entry is None:
+                tokens = float(self.burst)
+            else:
+                tokens, updated_at = entry
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+                retry_after = 0.0
+            else:
+                self.rejected += 1
+                retry_after = (1 - tokens) / self.rate if self.rate > 0 else self.idle_ttl
+
+            self._buckets[key] = (tokens, now)
+            return retry_after
+
+    def _refilled(self, entry, now: float) -> bool:
+        tokens, updated_at = entry
+        return tokens + (now - updated_at) * self.rate >= self.burst
+
+    def _evict_refilled(self, now: float) -> bool:
+        # Só buckets cheios de novo podem sair sem afrouxar o limite de ninguém
+        for key, entry in islice(self._buckets.items(), _EVICTION_SCAN):
+            if self._refilled(entry, now):
+                del self._buckets[key]
+                self.evictions += 1
+                return True
+        return False
+
+    def _expire(self, now: float):
+        # As entradas estão em ordem de último uso: basta olhar o começo
+        while self._buckets:
+            key, (tokens, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_ttl:
+                break
+            del self._buckets[key]
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self):
+        """Tracked keys and allowed/rejected counters"""
+        return {
+            "keys": len(self._buckets),
+            "maxsize": self.maxsize,
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "forced_evictions": self.forced_evictions,
+        }
@@ -0,0 +1,36 @@
+from typing import Any
+import time
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.metrics import record_phase
+
+def _default(value):
+    # Modelos dos services já saem prontos do banco/cache (sem aliases nem serializers):
+    # os valores dos campos vão direto para o orjson
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps_models(content: Any) -> bytes:
+    """JSON bytes of models / lists of models, without pydantic's validation or jsonable_encoder"""
+    return orjson.dumps(content, default=_default)
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response serialized with orjson straight from trusted pydantic models
+
+    Endpoints return it directly, so FastAPI skips response_model validation and
+    jsonable_encoder; response_model stays on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return dumps_models(content)
+        finally:
+            # Roda dentro do endpoint: registra a fase explicitamente
+            record_phase("serialize", time.perf_counter() - started)
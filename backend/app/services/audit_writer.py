@@ -0,0 +1,167 @@
+from collections import deque
+import logging
+import threading
+import time
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+# Espera entre tentativas quando o flush falha (dobra a cada falha seguida)
+_RETRY_DELAY_MIN = 0.5
+_RETRY_DELAY_MAX = 30.0
+
+class AuditWriter:
+    """Write-behind buffer that flushes audit rows in batches with executemany
+
+    A failed flush puts the batch back at the front of the buffer and is retried with
+    backoff; only rows the database rejects on their own are dropped (and counted).
+    """
+
+    def __init__(self, query, batch_size, flush_interval_ms, max_backlog):
+        self.query = query
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_backlog = max_backlog
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._retry_delay = 0.0
+        # Métricas
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.retries = 0
+        self.last_flush_size = 0
+        self.max_flush_size = 0
+        self.flush_time_total = 0.0
+        self.flush_time_max = 0.0
+
+    def start(self):
+        """Start the background flush thread"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+        logger.info(
+            f"Audit write-behind started (batch={self.batch_size}, "
+            f"interval={int(self.flush_interval * 1000)}ms, backlog={self.max_backlog})"
+        )
+
+    def enqueue(self, row: dict) -> bool:
+        """Buffer a row; returns False if the backlog is full and the row was dropped"""
+        if self._thread is None:
+            self.start()
+        with self._cond:
+            if len(self._buffer) >= self.max_backlog:
+                self.dropped += 1
+                return False
+            self._buffer.append(row)
+            self.enqueued += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take_batch(self):
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            batch.append(self._buffer.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                if self._retry_delay:
+                    # Último flush falhou: espera o backoff antes de tentar de novo
+                    deadline = time.monotonic() + self._retry_delay
+                    while not self._stopping and time.monotonic() < deadline:
+                        self._cond.wait(deadline - time.monotonic())
+                while not self._stopping and len(self._buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+                batch = self._take_batch()
+            if batch:
+                self._flush_batch(batch)
+
+    def _flush_batch(self, batch) -> bool:
+        started = time.perf_counter()
+        try:
+            errors = db.execute_batch(self.query, batch)
+        except Exception as e:
+            self._requeue(batch)
+            self.retries += 1
+            self._retry_delay = min(max(self._retry_delay * 2, _RETRY_DELAY_MIN), _RETRY_DELAY_MAX)
+            logger.error(f"Audit flush error ({len(batch)} rows requeued, retrying in {self._retry_delay:.1f}s): {e}")
+            return False
+        self._retry_delay = 0.0
+        if errors:
+            # Linhas rejeitadas pelo banco (ex.: usuário apagado): as demais já foram gravadas
+            self.failed_rows += len(errors)
+            logger.error(f"Audit flush: {len(errors)} of {len(batch)} rows rejected: {errors[0].message}")
+        elapsed = time.perf_counter() - started
+        self.flushes += 1
+        self.flushed_rows += len(batch) - len(errors)
+        self.last_flush_size = len(batch)
+        self.max_flush_size = max(self.max_flush_size, len(batch))
+        self.flush_time_total += elapsed
+        self.flush_time_max = max(self.flush_time_max, elapsed)
+        return True
+
+    def _requeue(self, batch):
+        with self._cond:
+            self._buffer.extendleft(reversed(batch))
+            # Mantém o limite do backlog: o excesso sai pelos registros mais antigos
+            while len(self._buffer) > self.max_backlog:
+                self._buffer.popleft()
+                self.dropped += 1
+
+    def flush(self):
+        """Synchronously flush everything currently buffered (stops at the first failed batch)"""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch or not self._flush_batch(batch):
+                return
+
+    def stop(self, timeout=10.0):
+        """Stop the flush thread and write out the remaining backlog"""
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+        self.flush()
+        if self._buffer:
+            logger.error(f"Audit write-behind stopped with {len(self._buffer)} rows not written")
+        else:
+            logger.info("Audit write-behind stopped")
+
+    def stats(self):
+        """Buffer and flush metrics"""
+        return {
+            "pending": len(self._buffer),
+            "max_backlog": self.max_backlog,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "retries": self.retries,
+            "last_flush_size": self.last_flush_size,
+            "max_flush_size": self.max_flush_size,
+            "avg_flush_size": round(self.flushed_rows / self.flushes, 2) if self.flushes else 0.0,
+            "flush_time_avg_ms": round(self.flush_time_total * 1000 / self.flushes, 3) if self.flushes else 0.0,
+            "flush_time_max_ms": round(self.flush_time_max * 1000, 3),
+        }
@@ -1,26 +1,39 @@
-from passlib.context import CryptContext
 from datetime import datetime
 from typing import Optional
 import logging
 from app.database import db
 from app.models.usuario import UsuarioLogin, UsuarioResponse
+from app.services.password_hasher import (
+    pwd_context,
+    password_hasher,
+    truncate_password,
+    PasswordHasherBusy,
+)
+from app.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class AuthService:
     def __init__(self):
         self.pwd_context = pwd_context
+        # Hashes regravados com o custo atual (exposto em /metrics)
+        self.rehashed = 0
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash - handles long passwords"""
         try:
             # Trunca a senha para verificação também
-            if plain_password and len(plain_password.encode('utf-8')) > 72:
-                plain_password = plain_password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-            return self.pwd_context.verify(plain_password, hashed_password)
+            return self.pwd_context.verify(truncate_password(plain_password), hashed_password)
+        except Exception as e:
+            logger.error(f"Erro ao verificar senha: {e}")
+            return False
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the hashing process pool"""
+        try:
+            return await password_hasher.verify(plain_password, hashed_password)
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
             logger.error(f"Erro ao verificar senha: {e}")
             return False
@@ -29,58 +42,120 @@ class AuthService:
         """Hash a password safely - truncate to 72 bytes to avoid bcrypt error"""
         try:
             # Garante que a senha não passe de 72 bytes (limite do bcrypt)
-            if password and len(password.encode('utf-8')) > 72:
-                password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-            return self.pwd_context.hash(password)
+            return self.pwd_context.hash(truncate_password(password))
+        except Exception as e:
+            # Sem fallback: nenhuma credencial é gravada se o hash falhar
+            logger.error(f"Erro ao gerar hash: {e}")
+            raise
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Hash a password in the hashing process pool"""
+        try:
+            return await password_hasher.hash(password)
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
+            # Sem fallback: a criação / troca de senha falha com 500 em vez de gravar uma senha conhecida
             logger.error(f"Erro ao gerar hash: {e}")
-            # Fallback: usa uma senha padrão se der erro
-            return self.pwd_context.hash("123456")
+            raise
     
+    def get_user_credentials(self, email: str) -> Optional[tuple]:
+        """Fetch the user row (including the password hash) by email"""
+        # A ordem das colunas aqui é importante e deve ser consistente
+        query = """
+            SELECT ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, 
+                   APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL
+            FROM CP01_2S_USUARIO 
+            WHERE EMAIL = :email
+        """
+        result = db.execute_query(query, {"email": email})
+        return result[0] if result else None
+
+    def _user_from_credentials(self, user_data: tuple) -> UsuarioResponse:
+        # Mapeamento de índices:
+        # 0: ID_USUARIO, 1: NOME_USUARIO, 2: EMAIL, 3: SENHA_USUARIO
+        # 4: APELIDO_STEAM, 5: DATA_CRIACAO, 6: ULTIMO_LOGIN, 7: ID_PERFIL
+        return UsuarioResponse(
+            id_usuario=user_data[0],
+            nome_usuario=user_data[1],
+            email=user_data[2],
+            apelido_steam=user_data[4],
+            data_criacao=user_data[5],
+            ultimo_login=user_data[6],
+            id_perfil=user_data[7]
+        )
+
     def authenticate_user(self, email: str, password: str) -> Optional[UsuarioResponse]:
         """Authenticate user with email and password"""
         try:
-            # Get user from database
-            # A ordem das colunas aqui é importante e deve ser consistente
-            query = """
-                SELECT ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, 
-                       APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL
-                FROM CP01_2S_USUARIO 
-                WHERE EMAIL = :email
-            """
-            result = db.execute_query(query, {"email": email})
-            
-            if not result:
+            user_data = self.get_user_credentials(email)
+            if not user_data:
                 return None
             
-            user_data = result[0]
-            # Mapeamento de índices:
-            # 0: ID_USUARIO, 1: NOME_USUARIO, 2: EMAIL, 3: SENHA_USUARIO
-            # 4: APELIDO_STEAM, 5: DATA_CRIACAO, 6: ULTIMO_LOGIN, 7: ID_PERFIL
-            
-            stored_password = user_data[3]
-            
-            # Verify password
-            if not self.verify_password(password, stored_password):
+            # Verify password (and rehash it if the stored cost differs from BCRYPT_ROUNDS)
+            try:
+                valid, new_hash = self.pwd_context.verify_and_update(truncate_password(password), user_data[3])
+            except Exception as e:
+                logger.error(f"Erro ao verificar senha: {e}")
                 return None
+            if not valid:
+                return None
+            if new_hash:
+                self.update_password_hash(user_data[0], user_data[3], new_hash)
             
             # Return user without password
-            user = UsuarioResponse(
-                id_usuario=user_data[0],
-                nome_usuario=user_data[1],
-                email=user_data[2],
-                apelido_steam=user_data[4],
-                data_criacao=user_data[5],
-                ultimo_login=user_data[6],
-                id_perfil=user_data[7]
-            )
-            
-            return user
+            return self._user_from_credentials(user_data)
             
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return None
+
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[UsuarioResponse]:
+        """Authenticate user: database lookup on the db executor, bcrypt in the hashing pool"""
+        try:
+            user_data = await db.run(self.get_user_credentials, email)
+            if not user_data:
+                return None
+
+            try:
+                valid, new_hash = await password_hasher.verify_and_update(password, user_data[3])
+            except PasswordHasherBusy:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao verificar senha: {e}")
+                return None
+            if not valid:
+                return None
+            if new_hash:
+                await db.run(self.update_password_hash, user_data[0], user_data[3], new_hash)
+
+            return self._user_from_credentials(user_data)
+
+        except PasswordHasherBusy:
+            raise
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return None
     
+    def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Persist a rehashed password, unless the password was changed meanwhile"""
+        try:
+            # Compara com o hash antigo para não sobrescrever uma troca de senha concorrente
+            query = """
+                UPDATE CP01_2S_USUARIO 
+                SET SENHA_USUARIO = :new_hash 
+                WHERE ID_USUARIO = :id_usuario AND SENHA_USUARIO = :old_hash
+            """
+            updated = db.execute_update(query, {"new_hash": new_hash, "id_usuario": user_id, "old_hash": old_hash})
+            if updated:
+                self.rehashed += 1
+                logger.info(f"Password hash of user {user_id} upgraded to the current bcrypt cost")
+            return bool(updated)
+        except Exception as e:
+            # O login continua valendo; o rehash é tentado de novo no próximo login
+            logger.error(f"Update password hash error: {e}")
+            return False
+
     def update_last_login(self, user_id: int) -> bool:
         """Update user's last login timestamp"""
         try:
@@ -94,10 +169,16 @@ class AuthService:
                 "id_usuario": user_id
             }
             db.execute_update(query, params)
+            # ULTIMO_LOGIN mudou: a entrada em cache ficou desatualizada
+            user_cache.invalidate(user_id)
             return True
         except Exception as e:
             logger.error(f"Update last login error: {e}")
             return False
 
+    async def update_last_login_async(self, user_id: int) -> bool:
+        """Async counterpart of update_last_login"""
+        return await db.run(self.update_last_login, user_id)
+
 # Global auth service instance
 auth_service = AuthService()
\ No newline at end of file
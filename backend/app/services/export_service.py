@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Iterator, Optional
+import csv
+import io
+import json
+import logging
+
+from app.database import db
+from config import EXPORT_FETCH_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional (pip install pyarrow)
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ["id_login", "ip_login", "user_agent", "data_login", "id_usuario"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that keeps what was written until drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ExportService:
+    """Streams the login audit trail in constant memory, one fetch batch at a time"""
+
+    def supports(self, fmt: str) -> bool:
+        if fmt == "parquet":
+            return pa is not None
+        return fmt in EXPORT_MEDIA_TYPES
+
+    def iter_batches(self, id_usuario: Optional[int] = None, data_inicio: Optional[datetime] = None,
+                     data_fim: Optional[datetime] = None, fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[list]:
+        """Yield raw audit rows (tuples in EXPORT_COLUMNS order) in batches of fetch_size"""
+        conditions = []
+        params = {}
+
+        if id_usuario is not None:
+            conditions.append("ID_USUARIO = :id_usuario")
+            params["id_usuario"] = id_usuario
+
+        if data_inicio is not None:
+            conditions.append("DATA_LOGIN >= :data_inicio")
+            params["data_inicio"] = data_inicio
+
+        if data_fim is not None:
+            conditions.append("DATA_LOGIN <= :data_fim")
+            params["data_fim"] = data_fim
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO
+            FROM CP01_2S_LOGIN
+            {where}
+            ORDER BY ID_LOGIN
+        """
+        yield from db.stream_query(query, params, arraysize=fetch_size)
+
+    def export(self, fmt: str, id_usuario: Optional[int] = None, data_inicio: Optional[datetime] = None,
+               data_fim: Optional[datetime] = None, fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[bytes]:
+        """Yield the encoded export, one chunk per fetched batch"""
+        if not self.supports(fmt):
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        batches = self.iter_batches(id_usuario, data_inicio, data_fim, fetch_size)
+        if fmt == "ndjson":
+            return self._export_ndjson(batches)
+        if fmt == "csv":
+            return self._export_csv(batches)
+        return self._export_parquet(batches)
+
+    def _export_ndjson(self, batches) -> Iterator[bytes]:
+        for rows in batches:
+            lines = []
+            for row in rows:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                record["data_login"] = record["data_login"].isoformat()
+                lines.append(json.dumps(record, ensure_ascii=False))
+            lines.append("")
+            yield "\n".join(lines).encode("utf-8")
+
+    def _export_csv(self, batches) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        remaining = buffer.getvalue()
+        if remaining:
+            yield remaining.encode("utf-8")
+
+    def _export_parquet(self, batches) -> Iterator[bytes]:
+        schema = pa.schema([
+            ("id_login", pa.int64()),
+            ("ip_login", pa.string()),
+            ("user_agent", pa.string()),
+            ("data_login", pa.timestamp("us")),
+            ("id_usuario", pa.int64()),
+        ])
+        sink = _ChunkSink()
+        # Cada lote buscado vira um row group, então a memória fica limitada ao tamanho do lote
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            for rows in batches:
+                columns = list(zip(*rows))
+                writer.write_batch(pa.record_batch(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
+
+# Global export service instance
+export_service = ExportService()
@@ -0,0 +1,49 @@
+from typing import Optional
+import logging
+
+from app.rate_limit import TokenBucketLimiter
+from config import (
+    LOGIN_RATE_LIMIT_ENABLED,
+    LOGIN_RATE_LIMIT_MAX_KEYS,
+    LOGIN_IP_BURST,
+    LOGIN_IP_PER_MINUTE,
+    LOGIN_EMAIL_BURST,
+    LOGIN_EMAIL_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+
+class LoginRateLimiter:
+    """Per-IP and per-email limits for credential checks, applied before any database or bcrypt work"""
+
+    def __init__(self, enabled=LOGIN_RATE_LIMIT_ENABLED, max_keys=LOGIN_RATE_LIMIT_MAX_KEYS):
+        self.enabled = enabled
+        self.by_ip = TokenBucketLimiter(LOGIN_IP_PER_MINUTE / 60, LOGIN_IP_BURST, max_keys)
+        self.by_email = TokenBucketLimiter(LOGIN_EMAIL_PER_MINUTE / 60, LOGIN_EMAIL_BURST, max_keys)
+
+    def check(self, ip: Optional[str], email: str) -> float:
+        """Consume one attempt for the IP and the email; returns 0 or the seconds to wait"""
+        if not self.enabled:
+            return 0.0
+
+        # IP primeiro: uma rajada de um mesmo IP não gasta as tentativas das contas que ele testa
+        retry_after = self.by_ip.acquire(ip or "unknown")
+        if retry_after:
+            # debug: numa rajada isto seria uma linha por tentativa
+            logger.debug(f"Login rate limit hit for IP {ip}")
+            return retry_after
+
+        retry_after = self.by_email.acquire(email.strip().lower())
+        if retry_after:
+            logger.debug("Login rate limit hit for an account")
+        return retry_after
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "by_ip": self.by_ip.stats(),
+            "by_email": self.by_email.stats(),
+        }
+
+# Global login rate limiter instance (shared by /auth/login and /auth/verify)
+login_rate_limiter = LoginRateLimiter()
@@ -1,32 +1,142 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime
 import logging
 from app.database import db
 from app.models.login import Login, LoginCreate, LoginResponse
+from app.pagination import encode_cursor, decode_cursor
+from app.services.audit_writer import AuditWriter
+from app.services.user_cache import user_cache
+from app.singleflight import SingleFlight
+from config import (
+    AUDIT_WRITE_BEHIND,
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_MS,
+    AUDIT_MAX_BACKLOG,
+    LOGIN_ROLLUPS_ENABLED,
+)
 
 logger = logging.getLogger(__name__)
 
+INSERT_LOGIN_SQL = """
+    INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+    VALUES (:ip_login, :user_agent, :data_login, :id_usuario)
+"""
+
+# Contadores de analytics (ver sql/login_rollups.sql), atualizados na mesma transação da auditoria
+ROLLUP_PLSQL = "PRC_LOGIN_ROLLUP(:id_usuario, :ip_login, :data_login);" if LOGIN_ROLLUPS_ENABLED else ""
+
+CREATE_LOGIN_PLSQL = f"""
+    BEGIN
+        INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+        VALUES (:ip_login, :user_agent, :data_login, :id_usuario)
+        RETURNING ID_LOGIN, DATA_LOGIN INTO :out_id_login, :out_data_login;
+
+        {ROLLUP_PLSQL}
+    END;
+"""
+
+# Colunas com o mesmo nome dos campos de LoginResponse (mapeadas por nome, ver app.mapping)
+LOGIN_COLUMNS = "ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO"
+
+# Login bem-sucedido: auditoria + ULTIMO_LOGIN em um único bloco PL/SQL (uma ida ao banco, um commit)
+RECORD_LOGIN_PLSQL = f"""
+    BEGIN
+        INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+        VALUES (:ip_login, :user_agent, :data_login, :id_usuario)
+        RETURNING ID_LOGIN INTO :out_id_login;
+
+        UPDATE CP01_2S_USUARIO
+        SET ULTIMO_LOGIN = :data_login
+        WHERE ID_USUARIO = :id_usuario;
+
+        {ROLLUP_PLSQL}
+    END;
+"""
+
+# Mesmo bloco sem OUT bind, para executemany no write-behind
+RECORD_LOGIN_BATCH_PLSQL = f"""
+    BEGIN
+        INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+        VALUES (:ip_login, :user_agent, :data_login, :id_usuario);
+
+        UPDATE CP01_2S_USUARIO
+        SET ULTIMO_LOGIN = :data_login
+        WHERE ID_USUARIO = :id_usuario;
+
+        {ROLLUP_PLSQL}
+    END;
+"""
+
 class LoginService:
     def __init__(self):
-        pass
+        # Leituras concorrentes dos logins de um mesmo usuário compartilham uma única consulta
+        self.user_lookups = SingleFlight("logins_by_user")
+        self.audit_writer = None
+        if AUDIT_WRITE_BEHIND:
+            self.audit_writer = AuditWriter(
+                RECORD_LOGIN_BATCH_PLSQL,
+                batch_size=AUDIT_BATCH_SIZE,
+                flush_interval_ms=AUDIT_FLUSH_INTERVAL_MS,
+                max_backlog=AUDIT_MAX_BACKLOG
+            )
     
+    def _login_params(self, login: LoginCreate) -> dict:
+        return {
+            "ip_login": login.ip_login,
+            "user_agent": login.user_agent,
+            "data_login": datetime.now(),
+            "id_usuario": login.id_usuario
+        }
+
+    def record_login(self, login: LoginCreate) -> Optional[LoginResponse]:
+        """Record a successful login: audit row and ULTIMO_LOGIN written in one transaction"""
+        try:
+            params = self._login_params(login)
+            if self.audit_writer is not None:
+                self.audit_writer.enqueue(params)
+                # O ULTIMO_LOGIN só chega ao banco no flush do lote: descarta a entrada em vez
+                # de servir um valor que ainda não foi gravado
+                user_cache.invalidate(login.id_usuario)
+                return None
+
+            values = db.execute_returning(RECORD_LOGIN_PLSQL, params, {"out_id_login": int})
+            # Gravado: o cache passa a refletir o novo ULTIMO_LOGIN
+            user_cache.set_last_login(login.id_usuario, params["data_login"])
+            return LoginResponse(
+                id_login=values["out_id_login"],
+                ip_login=login.ip_login,
+                user_agent=login.user_agent,
+                data_login=params["data_login"],
+                id_usuario=login.id_usuario
+            )
+
+        except Exception as e:
+            logger.error(f"Record login error: {e}")
+            user_cache.invalidate(login.id_usuario)
+            return None
+
     def create_login_record(self, login: LoginCreate) -> Optional[LoginResponse]:
-        """Create a new login record for audit"""
+        """Create a new login record for audit (buffered when write-behind is enabled)"""
         try:
-            query = """
-                INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
-                VALUES (:ip_login, :user_agent, :data_login, :id_usuario)
-            """
-            params = {
-                "ip_login": login.ip_login,
-                "user_agent": login.user_agent,
-                "data_login": login.data_login,
-                "id_usuario": login.id_usuario
-            }
-            
-            db.execute_insert(query, params)
+            params = self._login_params(login)
+            if self.audit_writer is not None:
+                # Write-behind: o registro é gravado em lote pelo AuditWriter
+                self.audit_writer.enqueue(params)
+                return None
             
-            # Get the created login record
-            return self.get_latest_login_by_user(login.id_usuario)
+            # Uma ida ao banco: ID_LOGIN e DATA_LOGIN voltam via RETURNING INTO
+            values = db.execute_returning(
+                CREATE_LOGIN_PLSQL,
+                params,
+                {"out_id_login": int, "out_data_login": datetime}
+            )
+            return LoginResponse(
+                id_login=values["out_id_login"],
+                ip_login=login.ip_login,
+                user_agent=login.user_agent,
+                data_login=values["out_data_login"],
+                id_usuario=login.id_usuario
+            )
             
         except Exception as e:
             logger.error(f"Create login record error: {e}")
@@ -35,79 +145,80 @@ class LoginService:
     def get_login_by_id(self, login_id: int) -> Optional[LoginResponse]:
         """Get login record by ID"""
         try:
-            query = """
-                SELECT ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO
+            query = f"""
+                SELECT {LOGIN_COLUMNS}
                 FROM CP01_2S_LOGIN 
                 WHERE ID_LOGIN = :id_login
             """
-            result = db.execute_query(query, {"id_login": login_id})
+            result = db.execute_query(query, {"id_login": login_id}, model=LoginResponse)
             
             if not result:
                 return None
             
-            login_data = result[0]
-            return LoginResponse(
-                id_login=login_data[0],
-                ip_login=login_data[1],
-                user_agent=login_data[2],
-                data_login=login_data[3],
-                id_usuario=login_data[4]
-            )
+            return result[0]
             
         except Exception as e:
             logger.error(f"Get login by ID error: {e}")
             return None
     
+    def query_logins_by_user(self, user_id: int) -> List[LoginResponse]:
+        """Get all login records for a specific user (database errors propagate)"""
+        query = f"""
+            SELECT {LOGIN_COLUMNS}
+            FROM CP01_2S_LOGIN 
+            WHERE ID_USUARIO = :id_usuario
+            ORDER BY DATA_LOGIN DESC
+        """
+        return db.execute_query(query, {"id_usuario": user_id}, model=LoginResponse)
+
     def get_logins_by_user(self, user_id: int) -> List[LoginResponse]:
         """Get all login records for a specific user"""
+        try:
+            return self.query_logins_by_user(user_id)
+            
+        except Exception as e:
+            logger.error(f"Get logins by user error: {e}")
+            return []
+
+    @staticmethod
+    def logins_version(logins: List[LoginResponse]) -> tuple:
+        """(count, highest ID_LOGIN) of a list of logins, same shape as get_logins_version_by_user"""
+        return (len(logins), max((login.id_login for login in logins), default=None))
+    
+    def get_logins_version_by_user(self, user_id: int) -> Optional[tuple]:
+        """(count, highest ID_LOGIN) of a user's logins: changes whenever a login is added or removed"""
         try:
             query = """
-                SELECT ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO
+                SELECT COUNT(*), MAX(ID_LOGIN)
                 FROM CP01_2S_LOGIN 
                 WHERE ID_USUARIO = :id_usuario
-                ORDER BY DATA_LOGIN DESC
             """
             result = db.execute_query(query, {"id_usuario": user_id})
-            
-            logins = []
-            for login_data in result:
-                logins.append(LoginResponse(
-                    id_login=login_data[0],
-                    ip_login=login_data[1],
-                    user_agent=login_data[2],
-                    data_login=login_data[3],
-                    id_usuario=login_data[4]
-                ))
-            
-            return logins
-            
+            if not result:
+                return None
+            count, max_id = result[0]
+            return (int(count), int(max_id) if max_id is not None else None)
+
         except Exception as e:
-            logger.error(f"Get logins by user error: {e}")
-            return []
-    
+            logger.error(f"Get logins version error: {e}")
+            return None
+
     def get_latest_login_by_user(self, user_id: int) -> Optional[LoginResponse]:
         """Get the latest login record for a specific user"""
         try:
-            query = """
-                SELECT ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO
+            query = f"""
+                SELECT {LOGIN_COLUMNS}
                 FROM CP01_2S_LOGIN 
                 WHERE ID_USUARIO = :id_usuario
                 ORDER BY DATA_LOGIN DESC
                 FETCH FIRST 1 ROWS ONLY
             """
-            result = db.execute_query(query, {"id_usuario": user_id})
+            result = db.execute_query(query, {"id_usuario": user_id}, model=LoginResponse)
             
             if not result:
                 return None
             
-            login_data = result[0]
-            return LoginResponse(
-                id_login=login_data[0],
-                ip_login=login_data[1],
-                user_agent=login_data[2],
-                data_login=login_data[3],
-                id_usuario=login_data[4]
-            )
+            return result[0]
             
         except Exception as e:
             logger.error(f"Get latest login by user error: {e}")
@@ -116,28 +227,152 @@ class LoginService:
     def get_all_logins(self) -> List[LoginResponse]:
         """Get all login records"""
         try:
-            query = """
-                SELECT ID_LOGIN, IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO
+            query = f"""
+                SELECT {LOGIN_COLUMNS}
                 FROM CP01_2S_LOGIN
                 ORDER BY DATA_LOGIN DESC
             """
-            result = db.execute_query(query)
+            result = db.execute_query(query, model=LoginResponse)
             
-            logins = []
-            for login_data in result:
-                logins.append(LoginResponse(
-                    id_login=login_data[0],
-                    ip_login=login_data[1],
-                    user_agent=login_data[2],
-                    data_login=login_data[3],
-                    id_usuario=login_data[4]
-                ))
-            
-            return logins
+            return result
             
         except Exception as e:
             logger.error(f"Get all logins error: {e}")
             return []
 
+    def _build_login_filters(self, id_usuario: Optional[int] = None, ip_login: Optional[str] = None,
+                             data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
+                             after: Optional[str] = None) -> Tuple[str, dict]:
+        """Build the WHERE clause (filters + keyset position) for audit listings"""
+        conditions = []
+        params = {}
+
+        if id_usuario is not None:
+            conditions.append("ID_USUARIO = :id_usuario")
+            params["id_usuario"] = id_usuario
+
+        if ip_login is not None:
+            conditions.append("IP_LOGIN = :ip_login")
+            params["ip_login"] = ip_login
+
+        if data_inicio is not None:
+            conditions.append("DATA_LOGIN >= :data_inicio")
+            params["data_inicio"] = data_inicio
+
+        if data_fim is not None:
+            conditions.append("DATA_LOGIN <= :data_fim")
+            params["data_fim"] = data_fim
+
+        if after is not None:
+            # Keyset na ordenação (DATA_LOGIN DESC, ID_LOGIN DESC)
+            after_data, after_id = decode_cursor(after, 2)
+            conditions.append(
+                "(DATA_LOGIN < :after_data OR (DATA_LOGIN = :after_data AND ID_LOGIN < :after_id))"
+            )
+            params["after_data"] = after_data
+            params["after_id"] = after_id
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def get_logins_page(self, limit: int, after: Optional[str] = None, id_usuario: Optional[int] = None,
+                        ip_login: Optional[str] = None, data_inicio: Optional[datetime] = None,
+                        data_fim: Optional[datetime] = None) -> Tuple[List[LoginResponse], Optional[str]]:
+        """Get one page of login records (newest first) and the cursor of the next page (raises on database errors)"""
+        where, params = self._build_login_filters(id_usuario, ip_login, data_inicio, data_fim, after)
+        try:
+            query = f"""
+                SELECT {LOGIN_COLUMNS}
+                FROM CP01_2S_LOGIN
+                {where}
+                ORDER BY DATA_LOGIN DESC, ID_LOGIN DESC
+                FETCH FIRST :page_limit ROWS ONLY
+            """
+            # Busca uma linha a mais para saber se existe próxima página
+            params["page_limit"] = limit + 1
+            result = db.execute_query(query, params, model=LoginResponse)
+            logins = result[:limit]
+
+            next_cursor = None
+            if len(result) > limit:
+                last = logins[-1]
+                next_cursor = encode_cursor([last.data_login, last.id_login])
+
+            return logins, next_cursor
+
+        except Exception as e:
+            # Propaga: uma página vazia por erro de banco viraria um 200 "sem logins"
+            logger.error(f"Get logins page error: {e}")
+            raise
+
+    def iter_logins(self, after: Optional[str] = None, id_usuario: Optional[int] = None,
+                    ip_login: Optional[str] = None, data_inicio: Optional[datetime] = None,
+                    data_fim: Optional[datetime] = None, batch_size: int = 1000) -> Iterator[List[LoginResponse]]:
+        """Yield login records (newest first) in batches as they are fetched"""
+        where, params = self._build_login_filters(id_usuario, ip_login, data_inicio, data_fim, after)
+        query = f"""
+            SELECT {LOGIN_COLUMNS}
+            FROM CP01_2S_LOGIN
+            {where}
+            ORDER BY DATA_LOGIN DESC, ID_LOGIN DESC
+        """
+        yield from db.stream_query(query, params, arraysize=batch_size, model=LoginResponse)
+
+    async def get_logins_page_async(self, limit: int, after: Optional[str] = None, id_usuario: Optional[int] = None,
+                                    ip_login: Optional[str] = None, data_inicio: Optional[datetime] = None,
+                                    data_fim: Optional[datetime] = None) -> Tuple[List[LoginResponse], Optional[str]]:
+        """Async counterpart of get_logins_page"""
+        return await db.run(self.get_logins_page, limit, after, id_usuario, ip_login, data_inicio, data_fim)
+
+    async def record_login_async(self, login: LoginCreate) -> Optional[LoginResponse]:
+        """Async counterpart of record_login"""
+        if self.audit_writer is not None:
+            # Só enfileira, não faz I/O: não precisa sair do event loop
+            return self.record_login(login)
+        try:
+            return await db.run(self.record_login, login)
+        finally:
+            self.user_lookups.forget(login.id_usuario)
+
+    async def create_login_record_async(self, login: LoginCreate) -> Optional[LoginResponse]:
+        """Async counterpart of create_login_record"""
+        if self.audit_writer is not None:
+            # Só enfileira, não faz I/O: não precisa sair do event loop
+            return self.create_login_record(login)
+        try:
+            return await db.run(self.create_login_record, login)
+        finally:
+            self.user_lookups.forget(login.id_usuario)
+
+    async def get_login_by_id_async(self, login_id: int) -> Optional[LoginResponse]:
+        """Async counterpart of get_login_by_id"""
+        return await db.run(self.get_login_by_id, login_id)
+
+    async def get_logins_by_user_async(self, user_id: int, raise_errors: bool = False) -> List[LoginResponse]:
+        """Async counterpart of get_logins_by_user; concurrent calls for the same user share one query
+
+        With raise_errors the database error propagates instead of becoming an empty list.
+        """
+        try:
+            return await self.user_lookups.do(user_id, db.run, self.query_logins_by_user, user_id)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Get logins by user error: {e}")
+            return []
+
+    async def get_logins_version_by_user_async(self, user_id: int) -> Optional[tuple]:
+        """Async counterpart of get_logins_version_by_user"""
+        return await db.run(self.get_logins_version_by_user, user_id)
+
+    async def get_all_logins_async(self) -> List[LoginResponse]:
+        """Async counterpart of get_all_logins"""
+        return await db.run(self.get_all_logins)
+
+    def close(self):
+        """Flush buffered audit rows and stop the write-behind thread"""
+        if self.audit_writer is not None:
+            self.audit_writer.stop()
+
 # Global login service instance
 login_service = LoginService()
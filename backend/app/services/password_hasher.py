@@ -0,0 +1,225 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+
+from app.metrics import record_phase
+from config import (
+    BCRYPT_ROUNDS,
+    HASH_POOL_WORKERS,
+    HASH_QUEUE_MAX,
+    HASH_QUEUE_TIMEOUT_SECONDS,
+    HASH_BULK_CHUNK_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Password hashing: custo fixo em BCRYPT_ROUNDS; hashes com qualquer outro custo
+# são marcados por needs_update e regravados no próximo login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+def truncate_password(password: str) -> str:
+    """Truncate a password to 72 bytes (bcrypt limit)"""
+    if password and len(password.encode('utf-8')) > 72:
+        password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
+    return password
+
+# Hash de custo mínimo usado só para carregar o backend do bcrypt (o passlib o carrega no primeiro uso)
+_WARM_UP_HASH = "$2b$04$WpjkzOnlixcNW9u74Np/XeJbI8tvv2r7ubvz9qRjznbQzR0oqUkkO"
+
+def load_backend():
+    """Load passlib's bcrypt backend (initializer of each worker process)"""
+    pwd_context.verify("warm-up", _WARM_UP_HASH)
+
+def worker_pid(hold: float = 0.0) -> int:
+    """PID of the worker running the job, after holding it for `hold` seconds"""
+    time.sleep(hold)
+    return os.getpid()
+
+def hash_password(password: str) -> str:
+    """Hash a password (runs inside the worker processes)"""
+    return pwd_context.hash(truncate_password(password))
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (runs inside the worker processes)"""
+    return pwd_context.verify(truncate_password(plain_password), hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple:
+    """Verify a password and rehash it when the stored cost is outdated (runs inside the worker processes)
+
+    Returns (valid, new_hash); new_hash is None when the stored hash is current.
+    """
+    return pwd_context.verify_and_update(truncate_password(plain_password), hashed_password)
+
+def hash_passwords(passwords: list) -> list:
+    """Hash a chunk of passwords (runs inside the worker processes)"""
+    return [hash_password(password) for password in passwords]
+
+class PasswordHasherBusy(Exception):
+    """Raised when a hashing job is rejected by the bounded queue"""
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with a bounded admission queue"""
+
+    def __init__(self, workers=HASH_POOL_WORKERS, max_queue=HASH_QUEUE_MAX,
+                 queue_timeout=HASH_QUEUE_TIMEOUT_SECONDS):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.executor = None
+        self._slots = None
+        # Contadores (alterados apenas no event loop, não precisam de lock)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def get_executor(self):
+        """Get (creating on first use) the worker pool"""
+        if self.executor is None:
+            try:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=load_backend
+                )
+                logger.info(f"Password hashing pool started with {self.workers} processes")
+            except (OSError, NotImplementedError) as e:
+                # Ambientes sem suporte a multiprocessing (ex.: serverless)
+                logger.warning(f"Process pool unavailable ({e}), hashing in threads instead")
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="hash"
+                )
+        return self.executor
+
+    async def _submit(self, func, *args):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        if not self._slots.locked():
+            await self._slots.acquire()
+        else:
+            self.queued += 1
+            waited_from = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                self.timed_out += 1
+                raise PasswordHasherBusy("Timed out waiting for a password hashing worker")
+            finally:
+                self.queued -= 1
+                record_phase("hash_queue", time.perf_counter() - waited_from)
+
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.get_executor(), func, *args)
+        except BrokenProcessPool:
+            # Um worker morreu: descarta o pool para que o próximo job crie outro
+            logger.error("Password hashing pool is broken, restarting it")
+            self.executor = None
+            raise
+        finally:
+            record_phase("hash", time.perf_counter() - started)
+            self.running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def warm_up(self) -> int:
+        """Start every worker process (each loads the bcrypt backend); returns how many answered
+
+        Jobs are submitted together so the pool spawns all its processes now instead of
+        on the first logins. Bypasses the admission queue: nothing else is running yet.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        if isinstance(executor, ThreadPoolExecutor):
+            await loop.run_in_executor(executor, load_backend)
+            return self.workers
+        # Cada job segura o worker um pouco, então os processos que ainda estão subindo pegam os
+        # seguintes; repete até todos responderem (ou até o prazo)
+        seen = set()
+        deadline = time.monotonic() + 30
+        while len(seen) < self.workers and time.monotonic() < deadline:
+            pids = await asyncio.gather(
+                *(loop.run_in_executor(executor, worker_pid, 0.05) for _ in range(self.workers))
+            )
+            seen.update(pids)
+        return len(seen)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password in the worker pool"""
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the worker pool"""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple:
+        """Verify a password in the worker pool, rehashing it in the same job if needed"""
+        return await self._submit(verify_and_update_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: list, chunk_size: int = HASH_BULK_CHUNK_SIZE) -> list:
+        """Hash many passwords in parallel across the pool, keeping their order
+
+        Work is sent in small chunks through the same admission queue as logins,
+        so a large import never holds every worker for long.
+        """
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        results = [None] * len(chunks)
+        pending = iter(range(len(chunks)))
+
+        async def drain():
+            for index in pending:
+                results[index] = await self._submit(hash_passwords, chunks[index])
+
+        drains = [asyncio.ensure_future(drain()) for _ in range(min(self.workers, len(chunks)))]
+        try:
+            await asyncio.gather(*drains)
+        except BaseException:
+            # Uma falha (ex.: PasswordHasherBusy) encerra a importação: os outros drains param
+            # em vez de continuar hashando o resto em segundo plano
+            for task in drains:
+                task.cancel()
+            await asyncio.gather(*drains, return_exceptions=True)
+            raise
+        return [hashed for chunk in results for hashed in chunk]
+
+    def stats(self):
+        """Queue and worker counters"""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,98 @@
+from typing import List, Optional
+from datetime import date
+import logging
+from app.database import db
+from app.models.analytics import LoginRollupResponse
+
+logger = logging.getLogger(__name__)
+
+# Colunas com o mesmo nome dos campos de LoginRollupResponse (mapeadas por nome, ver app.mapping)
+ROLLUP_COLUMNS = "DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN"
+
+BACKFILL_PLSQL = "BEGIN PRC_LOGIN_ROLLUP_BACKFILL; END;"
+
+class RollupService:
+    """Reads the login counters kept in CP01_2S_LOGIN_ROLLUP (never scans CP01_2S_LOGIN)"""
+
+    def get_rollup(self, dimensao: str, chave: str) -> Optional[LoginRollupResponse]:
+        """Get one counter by its primary key"""
+        try:
+            query = f"""
+                SELECT {ROLLUP_COLUMNS}
+                FROM CP01_2S_LOGIN_ROLLUP
+                WHERE DIMENSAO = :dimensao AND CHAVE = :chave
+            """
+            result = db.execute_query(query, {"dimensao": dimensao, "chave": chave}, model=LoginRollupResponse)
+            
+            if not result:
+                return None
+            
+            return result[0]
+            
+        except Exception as e:
+            logger.error(f"Get rollup error: {e}")
+            return None
+
+    def get_daily(self, data_inicio: date, data_fim: date) -> List[LoginRollupResponse]:
+        """Get the per-day counters of a date range (a range scan of at most one row per day)"""
+        try:
+            query = f"""
+                SELECT {ROLLUP_COLUMNS}
+                FROM CP01_2S_LOGIN_ROLLUP
+                WHERE DIMENSAO = 'DIA'
+                  AND CHAVE BETWEEN :data_inicio AND :data_fim
+                ORDER BY CHAVE
+            """
+            params = {"data_inicio": data_inicio.isoformat(), "data_fim": data_fim.isoformat()}
+            return db.execute_query(query, params, model=LoginRollupResponse)
+            
+        except Exception as e:
+            logger.error(f"Get daily rollups error: {e}")
+            return []
+
+    def get_user(self, user_id: int) -> Optional[LoginRollupResponse]:
+        """Get the login counter of a user"""
+        return self.get_rollup("USUARIO", str(user_id))
+
+    def get_ip(self, ip_login: str) -> Optional[LoginRollupResponse]:
+        """Get the login counter of an IP address"""
+        return self.get_rollup("IP", ip_login)
+
+    def get_top(self, dimensao: str, limit: int) -> List[LoginRollupResponse]:
+        """Get the counters of a dimension with the most logins"""
+        try:
+            query = f"""
+                SELECT {ROLLUP_COLUMNS}
+                FROM CP01_2S_LOGIN_ROLLUP
+                WHERE DIMENSAO = :dimensao
+                ORDER BY TOTAL_LOGINS DESC, CHAVE
+                FETCH FIRST :top_limit ROWS ONLY
+            """
+            return db.execute_query(query, {"dimensao": dimensao, "top_limit": limit}, model=LoginRollupResponse)
+            
+        except Exception as e:
+            logger.error(f"Get top rollups error: {e}")
+            return []
+
+    def backfill(self):
+        """Rebuild every counter from CP01_2S_LOGIN (without blocking new logins)"""
+        db.execute_returning(BACKFILL_PLSQL)
+
+    async def get_daily_async(self, data_inicio: date, data_fim: date) -> List[LoginRollupResponse]:
+        """Async counterpart of get_daily"""
+        return await db.run(self.get_daily, data_inicio, data_fim)
+
+    async def get_user_async(self, user_id: int) -> Optional[LoginRollupResponse]:
+        """Async counterpart of get_user"""
+        return await db.run(self.get_user, user_id)
+
+    async def get_ip_async(self, ip_login: str) -> Optional[LoginRollupResponse]:
+        """Async counterpart of get_ip"""
+        return await db.run(self.get_ip, ip_login)
+
+    async def get_top_async(self, dimensao: str, limit: int) -> List[LoginRollupResponse]:
+        """Async counterpart of get_top"""
+        return await db.run(self.get_top, dimensao, limit)
+
+# Global rollup service instance
+rollup_service = RollupService()
@@ -0,0 +1,79 @@
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+
+from config import SESSION_SECRET, SESSION_SECRET_EPHEMERAL, SESSION_TIMEOUT_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Token no formato JWT (HS256) assinado só com a stdlib: validar custa um HMAC,
+# sem banco nem bcrypt
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+class InvalidToken(Exception):
+    """Token malformed, wrongly signed or expired"""
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+class TokenService:
+    def __init__(self, secret: str = SESSION_SECRET, timeout_minutes: int = SESSION_TIMEOUT_MINUTES,
+                 allow_ephemeral: bool = SESSION_SECRET_EPHEMERAL):
+        if not secret:
+            # Um segredo por processo invalida os tokens entre workers e a cada restart: só em dev/teste
+            if not allow_ephemeral:
+                raise RuntimeError(
+                    "SESSION_SECRET is not set (set SESSION_SECRET_EPHEMERAL=true for a per-process dev secret)"
+                )
+            logger.warning("SESSION_SECRET is not set: using a random per-process secret")
+            secret = secrets.token_urlsafe(32)
+        self._key = secret.encode("utf-8")
+        self.expires_in = timeout_minutes * 60
+        self._signing_input_header = _b64encode(json.dumps(_HEADER, separators=(",", ":")).encode())
+
+    def _sign(self, signing_input: bytes) -> str:
+        return _b64encode(hmac.new(self._key, signing_input, hashlib.sha256).digest())
+
+    def issue(self, user_id: int, user_name: Optional[str] = None) -> str:
+        """Signed token for the user, valid for SESSION_TIMEOUT_MINUTES"""
+        now = int(time.time())
+        claims = {"sub": str(user_id), "name": user_name, "iat": now, "exp": now + self.expires_in}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = f"{self._signing_input_header}.{payload}"
+        return f"{signing_input}.{self._sign(signing_input.encode('ascii'))}"
+
+    def verify(self, token: str) -> dict:
+        """Claims of a valid token; raises InvalidToken otherwise"""
+        # Tokens válidos são só ASCII (base64 url-safe); qualquer outra coisa é malformada
+        try:
+            header, payload, signature = token.encode("ascii").split(b".")
+        except (UnicodeError, AttributeError, ValueError):
+            raise InvalidToken("Malformed token")
+
+        # Só aceita o cabeçalho emitido aqui (evita troca de algoritmo, ex.: "none")
+        if header != self._signing_input_header.encode("ascii"):
+            raise InvalidToken("Unsupported token header")
+        expected = self._sign(header + b"." + payload).encode("ascii")
+        if not hmac.compare_digest(signature, expected):
+            raise InvalidToken("Invalid signature")
+
+        try:
+            claims = json.loads(_b64decode(payload))
+            expires_at = int(claims["exp"])
+            int(claims["sub"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidToken("Malformed token")
+        if expires_at <= time.time():
+            raise InvalidToken("Token expired")
+        return claims
+
+# Global token service instance
+token_service = TokenService()
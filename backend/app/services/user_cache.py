@@ -0,0 +1,76 @@
+from typing import Optional
+import threading
+
+from app.cache import TTLCache
+from app.models.usuario import UsuarioResponse
+from config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+
+# Faixas de ids com o contador da última invalidação (memória fixa, sem um contador por usuário)
+_INVALIDATION_STRIPES = 4096
+
+class UserCache:
+    """Users cached by id, with an email -> id index pointing into the same entries"""
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS):
+        self.by_id = TTLCache(maxsize, ttl)
+        self.email_index = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+        self._invalidations = 0
+        self._invalidated_at = [0] * _INVALIDATION_STRIPES
+        self.stale_puts = 0
+
+    def get_by_id(self, user_id: int) -> Optional[UsuarioResponse]:
+        return self.by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> Optional[UsuarioResponse]:
+        user_id = self.email_index.get(email)
+        if user_id is None:
+            return None
+        usuario = self.by_id.get(user_id)
+        # O índice pode estar desatualizado se o e-mail mudou: confere antes de usar
+        if usuario is None or usuario.email != email:
+            return None
+        return usuario
+
+    def read_token(self) -> int:
+        """Token to take before reading a user from the database and pass to put()"""
+        return self._invalidations
+
+    def put(self, usuario: UsuarioResponse, token: Optional[int] = None):
+        """Cache a user; with a read token, refuses values read before a later invalidation"""
+        with self._lock:
+            stripe = usuario.id_usuario % _INVALIDATION_STRIPES
+            if token is not None and self._invalidated_at[stripe] > token:
+                # Leitura feita antes de um UPDATE/DELETE já invalidado: não repõe o valor antigo
+                self.stale_puts += 1
+                return
+            self.by_id.set(usuario.id_usuario, usuario)
+            self.email_index.set(usuario.email, usuario.id_usuario)
+
+    def set_last_login(self, user_id: int, ultimo_login):
+        """Update ULTIMO_LOGIN of a cached user in place (no-op when not cached)"""
+        # Mantém a expiração original: logins frequentes não podem renovar a entrada para sempre
+        self.by_id.update(
+            user_id, lambda usuario: usuario.model_copy(update={"ultimo_login": ultimo_login})
+        )
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._invalidations += 1
+            self._invalidated_at[user_id % _INVALIDATION_STRIPES] = self._invalidations
+            usuario = self.by_id.pop(user_id)
+            if usuario is not None:
+                self.email_index.pop(usuario.email)
+
+    def clear(self):
+        self.by_id.clear()
+        self.email_index.clear()
+
+    def stats(self):
+        return {
+            "by_id": self.by_id.stats(),
+            "by_email": self.email_index.stats(),
+        }
+
+# Global user cache instance (shared by UsuarioService and AuthService)
+user_cache = UserCache()
@@ -1,51 +1,88 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
 from datetime import datetime
 from fastapi import HTTPException, status
 from app.database import db
+from app.pagination import encode_cursor, decode_cursor
 from app.models.usuario import UsuarioCreate, UsuarioUpdate, UsuarioResponse
 from app.services.auth_service import auth_service
+from app.services.password_hasher import password_hasher
+from app.services.user_cache import user_cache
+from app.singleflight import SingleFlight
+from config import BULK_INSERT_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Colunas com o mesmo nome dos campos de UsuarioResponse (mapeadas por nome, ver app.mapping)
+USUARIO_COLUMNS = "ID_USUARIO, NOME_USUARIO, EMAIL, APELIDO_STEAM, DATA_CRIACAO, ID_PERFIL, ULTIMO_LOGIN"
+
+# Chaves de ordenação aceitas na listagem -> coluna
+USUARIO_SORT_COLUMNS = {
+    "data_criacao": "DATA_CRIACAO",
+    "id_usuario": "ID_USUARIO",
+    "nome_usuario": "NOME_USUARIO",
+    "email": "EMAIL",
+}
+
 class UsuarioService:
     def __init__(self):
         self.auth_service = auth_service
+        self.cache = user_cache
+        # Leituras concorrentes do mesmo id compartilham uma única consulta
+        self.lookups = SingleFlight("usuario_by_id")
     
-    def create_usuario(self, usuario: UsuarioCreate) -> Optional[UsuarioResponse]:
-        """Create a new user"""
+    def create_usuario(self, usuario: UsuarioCreate, hashed_password: Optional[str] = None) -> Optional[UsuarioResponse]:
+        """Create a new user in a single round trip (hashed_password skips hashing when already computed)"""
         try:
-            # Verifica se o e-mail já existe antes de tentar inserir
-            existing_user = self.get_usuario_by_email(usuario.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Este e-mail já está em uso."
-                )
-
             # Hash password
-            hashed_password = self.auth_service.get_password_hash(usuario.senha_usuario)
+            if hashed_password is None:
+                hashed_password = self.auth_service.get_password_hash(usuario.senha_usuario)
             
-            # Insert user
+            # Insert user: o e-mail duplicado é detectado pela constraint UNIQUE (ORA-00001),
+            # sem consulta prévia, e os valores gerados voltam via RETURNING INTO
             query = """
                 INSERT INTO CP01_2S_USUARIO 
                 (ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL)
                 VALUES (SEQ_USUARIO.NEXTVAL, :nome_usuario, :email, :senha_usuario, :apelido_steam, :data_criacao, :ultimo_login, :id_perfil)
+                RETURNING ID_USUARIO, DATA_CRIACAO, ULTIMO_LOGIN INTO :out_id_usuario, :out_data_criacao, :out_ultimo_login
             """
+            now = datetime.now()
             params = {
                 "nome_usuario": usuario.nome_usuario,
                 "email": usuario.email,
                 "senha_usuario": hashed_password,
                 "apelido_steam": usuario.apelido_steam,
-                "data_criacao": datetime.now(),
+                "data_criacao": now,
                 "id_perfil": usuario.id_perfil,
-                "ultimo_login": datetime.now()
+                "ultimo_login": now
+            }
+            returning = {
+                "out_id_usuario": int,
+                "out_data_criacao": datetime,
+                "out_ultimo_login": datetime
             }
             
-            db.execute_insert(query, params)
+            try:
+                values = db.execute_returning(query, params, returning)
+            except Exception as e:
+                if db.is_unique_violation(e):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Este e-mail já está em uso."
+                    )
+                raise
             
-            # Get created user
-            return self.get_usuario_by_email(usuario.email)
+            new_usuario = UsuarioResponse(
+                id_usuario=values["out_id_usuario"],
+                nome_usuario=usuario.nome_usuario,
+                email=usuario.email,
+                apelido_steam=usuario.apelido_steam,
+                data_criacao=values["out_data_criacao"],
+                id_perfil=usuario.id_perfil,
+                ultimo_login=values["out_ultimo_login"]
+            )
+            self.cache.put(new_usuario)
+            return new_usuario
             
         except HTTPException as http_exc:
             raise http_exc # Re-lança a exceção para o FastAPI tratar
@@ -57,61 +94,90 @@ class UsuarioService:
                 detail="Ocorreu um erro interno ao criar o usuário."
             )
     
+    def bulk_create_usuarios(self, usuarios: List[UsuarioCreate], hashed_passwords: List[str]) -> List[Optional[str]]:
+        """Insert many users with array DML; returns one error message (or None) per user"""
+        query = """
+            INSERT INTO CP01_2S_USUARIO 
+            (ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL)
+            VALUES (SEQ_USUARIO.NEXTVAL, :nome_usuario, :email, :senha_usuario, :apelido_steam, :data_criacao, :ultimo_login, :id_perfil)
+        """
+        now = datetime.now()
+        errors = [None] * len(usuarios)
+
+        for start in range(0, len(usuarios), BULK_INSERT_BATCH_SIZE):
+            batch = usuarios[start:start + BULK_INSERT_BATCH_SIZE]
+            params_list = [
+                {
+                    "nome_usuario": usuario.nome_usuario,
+                    "email": usuario.email,
+                    "senha_usuario": hashed_passwords[start + offset],
+                    "apelido_steam": usuario.apelido_steam,
+                    "data_criacao": now,
+                    "id_perfil": usuario.id_perfil,
+                    "ultimo_login": now
+                }
+                for offset, usuario in enumerate(batch)
+            ]
+            try:
+                for error in db.execute_batch(query, params_list):
+                    errors[start + error.offset] = (
+                        "Este e-mail já está em uso." if error.unique_violation else error.message
+                    )
+            except Exception as e:
+                logger.error(f"Bulk create users error: {e}")
+                for offset in range(len(batch)):
+                    errors[start + offset] = "Erro interno ao inserir o lote."
+
+        return errors
+
     def get_usuario_by_id(self, user_id: int) -> Optional[UsuarioResponse]:
-        """Get user by ID"""
+        """Get user by ID (read-through cache)"""
+        cached = self.cache.get_by_id(user_id)
+        if cached is not None:
+            return cached
+
+        # Tomado antes da leitura: se o usuário for alterado no meio dela, o put é recusado
+        token = self.cache.read_token()
         try:
-            query = """
-                SELECT ID_USUARIO, NOME_USUARIO, EMAIL, APELIDO_STEAM, 
-                       DATA_CRIACAO, ID_PERFIL, ULTIMO_LOGIN
+            query = f"""
+                SELECT {USUARIO_COLUMNS}
                 FROM CP01_2S_USUARIO 
                 WHERE ID_USUARIO = :id_usuario
             """
-            result = db.execute_query(query, {"id_usuario": user_id})
+            result = db.execute_query(query, {"id_usuario": user_id}, model=UsuarioResponse)
             
             if not result:
                 return None
             
-            user_data = result[0]
-            # ORDEM CORRETA: 0, 1, 2, 3, 4 (DATA_CRIACAO), 5 (ID_PERFIL), 6 (ULTIMO_LOGIN)
-            return UsuarioResponse(
-                id_usuario=user_data[0],
-                nome_usuario=user_data[1],
-                email=user_data[2],
-                apelido_steam=user_data[3],
-                data_criacao=user_data[4],
-                id_perfil=user_data[5],      # <-- CORRIGIDO
-                ultimo_login=user_data[6]    # <-- CORRIGIDO
-            )
+            usuario = result[0]
+            self.cache.put(usuario, token)
+            return usuario
             
         except Exception as e:
             logger.error(f"Get user by ID error: {e}")
             return None
     
     def get_usuario_by_email(self, email: str) -> Optional[UsuarioResponse]:
-        """Get user by email"""
+        """Get user by email (read-through cache)"""
+        cached = self.cache.get_by_email(email)
+        if cached is not None:
+            return cached
+
+        token = self.cache.read_token()
         try:
-            query = """
-                SELECT ID_USUARIO, NOME_USUARIO, EMAIL, APELIDO_STEAM, 
-                       DATA_CRIACAO, ID_PERFIL, ULTIMO_LOGIN
+            query = f"""
+                SELECT {USUARIO_COLUMNS}
                 FROM CP01_2S_USUARIO 
                 WHERE EMAIL = :email
             """
-            result = db.execute_query(query, {"email": email})
+            result = db.execute_query(query, {"email": email}, model=UsuarioResponse)
             
             if not result:
                 return None
             
-            user_data = result[0]
-            # ORDEM CORRETA: 0, 1, 2, 3, 4 (DATA_CRIACAO), 5 (ID_PERFIL), 6 (ULTIMO_LOGIN)
-            return UsuarioResponse(
-                id_usuario=user_data[0],
-                nome_usuario=user_data[1],
-                email=user_data[2],
-                apelido_steam=user_data[3],
-                data_criacao=user_data[4],
-                id_perfil=user_data[5],      # <-- CORRIGIDO
-                ultimo_login=user_data[6]    # <-- CORRIGIDO
-            )
+            usuario = result[0]
+            self.cache.put(usuario, token)
+            return usuario
             
         except Exception as e:
             logger.error(f"Get user by email error: {e}")
@@ -120,35 +186,100 @@ class UsuarioService:
     def get_all_usuarios(self) -> List[UsuarioResponse]:
         """Get all users"""
         try:
-            query = """
-                SELECT ID_USUARIO, NOME_USUARIO, EMAIL, APELIDO_STEAM, 
-                       DATA_CRIACAO, ID_PERFIL, ULTIMO_LOGIN
+            query = f"""
+                SELECT {USUARIO_COLUMNS}
                 FROM CP01_2S_USUARIO
                 ORDER BY DATA_CRIACAO DESC
             """
-            result = db.execute_query(query)
-            
-            usuarios = []
-            for user_data in result:
-                # ORDEM CORRETA: 0, 1, 2, 3, 4 (DATA_CRIACAO), 5 (ID_PERFIL), 6 (ULTIMO_LOGIN)
-                usuarios.append(UsuarioResponse(
-                    id_usuario=user_data[0],
-                    nome_usuario=user_data[1],
-                    email=user_data[2],
-                    apelido_steam=user_data[3],
-                    data_criacao=user_data[4],
-                    id_perfil=user_data[5],      # <-- CORRIGIDO
-                    ultimo_login=user_data[6]    # <-- CORRIGIDO
-                ))
-            
-            return usuarios
+            result = db.execute_query(query, model=UsuarioResponse)
+            
+            return result
             
         except Exception as e:
             logger.error(f"Get all users error: {e}")
             return []
     
-    def update_usuario(self, user_id: int, usuario_update: UsuarioUpdate) -> Optional[UsuarioResponse]:
-        """Update user"""
+    def get_usuarios_page(self, limit: int, after: Optional[str] = None, sort: str = "data_criacao",
+                          order: str = "desc", id_perfil: Optional[int] = None,
+                          data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
+                          include_total: bool = False) -> Tuple[List[UsuarioResponse], Optional[str], Optional[int]]:
+        """Get one page of users, the cursor of the next page and optionally the total count (raises on database errors)"""
+        sort_column = USUARIO_SORT_COLUMNS.get(sort)
+        if sort_column is None or order not in ("asc", "desc"):
+            raise ValueError("Invalid sort")
+
+        conditions = []
+        params = {}
+
+        if id_perfil is not None:
+            conditions.append("ID_PERFIL = :id_perfil")
+            params["id_perfil"] = id_perfil
+
+        if data_inicio is not None:
+            conditions.append("DATA_CRIACAO >= :data_inicio")
+            params["data_inicio"] = data_inicio
+
+        if data_fim is not None:
+            conditions.append("DATA_CRIACAO <= :data_fim")
+            params["data_fim"] = data_fim
+
+        filter_conditions = list(conditions)
+        filter_params = dict(params)
+
+        if after is not None:
+            # O cursor guarda a ordenação usada para não misturar páginas de ordenações diferentes
+            cursor_sort, cursor_order, after_value, after_id = decode_cursor(after, 4)
+            if cursor_sort != sort or cursor_order != order:
+                raise ValueError("Cursor does not match the requested sort")
+            op = "<" if order == "desc" else ">"
+            if sort_column == "ID_USUARIO":
+                conditions.append(f"ID_USUARIO {op} :after_id")
+            else:
+                conditions.append(
+                    f"({sort_column} {op} :after_value OR ({sort_column} = :after_value AND ID_USUARIO {op} :after_id))"
+                )
+                params["after_value"] = after_value
+            params["after_id"] = after_id
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = order.upper()
+        order_by = f"{sort_column} {direction}"
+        if sort_column != "ID_USUARIO":
+            order_by += f", ID_USUARIO {direction}"
+
+        try:
+            query = f"""
+                SELECT {USUARIO_COLUMNS}
+                FROM CP01_2S_USUARIO
+                {where}
+                ORDER BY {order_by}
+                FETCH FIRST :page_limit ROWS ONLY
+            """
+            # Busca uma linha a mais para saber se existe próxima página
+            params["page_limit"] = limit + 1
+            result = db.execute_query(query, params, model=UsuarioResponse)
+            usuarios = result[:limit]
+
+            next_cursor = None
+            if len(result) > limit:
+                last = usuarios[-1]
+                next_cursor = encode_cursor([sort, order, getattr(last, sort), last.id_usuario])
+
+            total = None
+            if include_total:
+                filter_where = f"WHERE {' AND '.join(filter_conditions)}" if filter_conditions else ""
+                count_query = f"SELECT COUNT(*) FROM CP01_2S_USUARIO {filter_where}"
+                total = db.execute_query(count_query, filter_params)[0][0]
+
+            return usuarios, next_cursor, total
+
+        except Exception as e:
+            # Propaga: uma página vazia por erro de banco viraria um 200 com ETag válido
+            logger.error(f"Get users page error: {e}")
+            raise
+
+    def update_usuario(self, user_id: int, usuario_update: UsuarioUpdate, hashed_password: Optional[str] = None) -> Optional[UsuarioResponse]:
+        """Update user (hashed_password skips hashing when already computed)"""
         try:
             update_fields = []
             params = {"id_usuario": user_id}
@@ -162,7 +293,8 @@ class UsuarioService:
                 params["email"] = usuario_update.email
             
             if usuario_update.senha_usuario is not None:
-                hashed_password = self.auth_service.get_password_hash(usuario_update.senha_usuario)
+                if hashed_password is None:
+                    hashed_password = self.auth_service.get_password_hash(usuario_update.senha_usuario)
                 update_fields.append("SENHA_USUARIO = :senha_usuario")
                 params["senha_usuario"] = hashed_password
             
@@ -184,6 +316,8 @@ class UsuarioService:
             """
             
             db.execute_update(query, params)
+            # Invalida e recarrega: a nova leitura repõe a entrada no cache
+            self.cache.invalidate(user_id)
             return self.get_usuario_by_id(user_id)
             
         except Exception as e:
@@ -195,11 +329,64 @@ class UsuarioService:
         try:
             query = "DELETE FROM CP01_2S_USUARIO WHERE ID_USUARIO = :id_usuario"
             result = db.execute_delete(query, {"id_usuario": user_id})
+            self.cache.invalidate(user_id)
             return result > 0
             
         except Exception as e:
             logger.error(f"Delete user error: {e}")
             return False
 
+    async def create_usuario_async(self, usuario: UsuarioCreate) -> Optional[UsuarioResponse]:
+        """Async counterpart of create_usuario (bcrypt runs in the hashing pool)"""
+        hashed_password = await self.auth_service.get_password_hash_async(usuario.senha_usuario)
+        return await db.run(self.create_usuario, usuario, hashed_password)
+
+    async def bulk_create_usuarios_async(self, usuarios: List[UsuarioCreate]) -> List[Optional[str]]:
+        """Hash all passwords in parallel in the hashing pool, then insert with array DML"""
+        hashed_passwords = await password_hasher.hash_many([usuario.senha_usuario for usuario in usuarios])
+        return await db.run(self.bulk_create_usuarios, usuarios, hashed_passwords)
+
+    async def get_usuario_by_id_async(self, user_id: int) -> Optional[UsuarioResponse]:
+        """Async counterpart of get_usuario_by_id; concurrent calls for the same id share one lookup"""
+        cached = self.cache.get_by_id(user_id)
+        if cached is not None:
+            return cached
+        return await self.lookups.do(user_id, db.run, self.get_usuario_by_id, user_id)
+
+    async def get_usuario_by_email_async(self, email: str) -> Optional[UsuarioResponse]:
+        """Async counterpart of get_usuario_by_email"""
+        return await db.run(self.get_usuario_by_email, email)
+
+    async def get_all_usuarios_async(self) -> List[UsuarioResponse]:
+        """Async counterpart of get_all_usuarios"""
+        return await db.run(self.get_all_usuarios)
+
+    async def get_usuarios_page_async(self, limit: int, after: Optional[str] = None, sort: str = "data_criacao",
+                                      order: str = "desc", id_perfil: Optional[int] = None,
+                                      data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
+                                      include_total: bool = False) -> Tuple[List[UsuarioResponse], Optional[str], Optional[int]]:
+        """Async counterpart of get_usuarios_page"""
+        return await db.run(
+            self.get_usuarios_page, limit, after, sort, order, id_perfil, data_inicio, data_fim, include_total
+        )
+
+    async def update_usuario_async(self, user_id: int, usuario_update: UsuarioUpdate) -> Optional[UsuarioResponse]:
+        """Async counterpart of update_usuario (bcrypt runs in the hashing pool)"""
+        hashed_password = None
+        if usuario_update.senha_usuario is not None:
+            hashed_password = await self.auth_service.get_password_hash_async(usuario_update.senha_usuario)
+        try:
+            return await db.run(self.update_usuario, user_id, usuario_update, hashed_password)
+        finally:
+            # Uma leitura iniciada antes da escrita não deve ser compartilhada com quem chega depois
+            self.lookups.forget(user_id)
+
+    async def delete_usuario_async(self, user_id: int) -> bool:
+        """Async counterpart of delete_usuario"""
+        try:
+            return await db.run(self.delete_usuario, user_id)
+        finally:
+            self.lookups.forget(user_id)
+
 # Global usuario service instance
 usuario_service = UsuarioService()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import asyncio
+
+class SingleFlight:
+    """Coalesces concurrent identical lookups: one call per key runs, later callers share its result
+
+    Only calls that overlap in time are merged; nothing is kept once the call finishes.
+    The shared result object is handed to every waiter, so callers must not mutate it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+        # Contadores (alterados apenas no event loop, não precisam de lock)
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, func, *args):
+        """Await func(*args), or the identical call already in flight for key"""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            # Task própria: se o primeiro chamador for cancelado os outros continuam esperando
+            task = asyncio.ensure_future(func(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marca a exceção como lida mesmo se nenhum chamador sobrou para recebê-la
+            task.exception()
+
+    def forget(self, key):
+        """Detach the call in flight for key, so callers arriving after a write start a fresh one"""
+        self._inflight.pop(key, None)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,387 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+import functools
+import logging
+import re
+import sqlite3
+import threading
+
+from app.database import DatabaseBackend, BatchError
+from app.mapping import column_names, model_row_builder
+from app.query_stats import (
+    instrumented,
+    instrumented_stream,
+    rows_returned,
+    rows_affected,
+    rows_returning,
+    rows_batched,
+)
+from config import DB_POOL_WAIT_TIMEOUT_MS
+
+logger = logging.getLogger(__name__)
+
+# Backend SQLite em processo, para testes de carga e profiling sem o servidor Oracle.
+# Cria as mesmas tabelas que a aplicação usa e traduz o SQL Oracle dos services
+# (sequences, FETCH FIRST, RETURNING INTO, blocos PL/SQL e procedures conhecidas).
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS CP01_2S_USUARIO (
+    -- AUTOINCREMENT nunca reaproveita ids, como SEQ_USUARIO
+    ID_USUARIO     INTEGER PRIMARY KEY AUTOINCREMENT,
+    NOME_USUARIO   TEXT NOT NULL,
+    EMAIL          TEXT NOT NULL UNIQUE,
+    SENHA_USUARIO  TEXT NOT NULL,
+    APELIDO_STEAM  TEXT,
+    DATA_CRIACAO   TIMESTAMP NOT NULL,
+    ULTIMO_LOGIN   TIMESTAMP,
+    ID_PERFIL      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_USUARIO_DATA_CRIACAO ON CP01_2S_USUARIO (DATA_CRIACAO, ID_USUARIO);
+
+CREATE TABLE IF NOT EXISTS CP01_2S_LOGIN (
+    ID_LOGIN    INTEGER PRIMARY KEY AUTOINCREMENT,
+    IP_LOGIN    TEXT NOT NULL,
+    USER_AGENT  TEXT NOT NULL,
+    DATA_LOGIN  TIMESTAMP NOT NULL,
+    ID_USUARIO  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_LOGIN_DATA ON CP01_2S_LOGIN (DATA_LOGIN, ID_LOGIN);
+CREATE INDEX IF NOT EXISTS IX_LOGIN_USUARIO ON CP01_2S_LOGIN (ID_USUARIO, DATA_LOGIN);
+
+CREATE TABLE IF NOT EXISTS CP01_2S_LOGIN_ROLLUP (
+    DIMENSAO        TEXT NOT NULL,
+    CHAVE           TEXT NOT NULL,
+    TOTAL_LOGINS    INTEGER NOT NULL,
+    PRIMEIRO_LOGIN  TIMESTAMP,
+    ULTIMO_LOGIN    TIMESTAMP,
+    PRIMARY KEY (DIMENSAO, CHAVE)
+) WITHOUT ROWID;
+"""
+
+# Equivalentes das procedures de sql/login_rollups.sql
+ROLLUP_UPSERT_SQL = """
+    INSERT INTO CP01_2S_LOGIN_ROLLUP (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+    VALUES (:dimensao, :chave, 1, :data_login, :data_login)
+    ON CONFLICT (DIMENSAO, CHAVE) DO UPDATE SET
+        TOTAL_LOGINS = TOTAL_LOGINS + 1,
+        PRIMEIRO_LOGIN = MIN(PRIMEIRO_LOGIN, excluded.PRIMEIRO_LOGIN),
+        ULTIMO_LOGIN = MAX(ULTIMO_LOGIN, excluded.ULTIMO_LOGIN)
+"""
+
+# No SQLite o backfill roda numa transação só e o banco tem um único escritor: os logins esperam
+# o commit, então DELETE + INSERT basta (o Oracle usa snapshot AS OF SCN, ver PRC_LOGIN_ROLLUP_REBUILD)
+ROLLUP_BACKFILL_SQL = [
+    "DELETE FROM CP01_2S_LOGIN_ROLLUP",
+    """
+    INSERT INTO CP01_2S_LOGIN_ROLLUP (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+    SELECT 'DIA', SUBSTR(DATA_LOGIN, 1, 10), COUNT(*), MIN(DATA_LOGIN), MAX(DATA_LOGIN)
+    FROM CP01_2S_LOGIN GROUP BY SUBSTR(DATA_LOGIN, 1, 10)
+    """,
+    """
+    INSERT INTO CP01_2S_LOGIN_ROLLUP (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+    SELECT 'USUARIO', CAST(ID_USUARIO AS TEXT), COUNT(*), MIN(DATA_LOGIN), MAX(DATA_LOGIN)
+    FROM CP01_2S_LOGIN GROUP BY ID_USUARIO
+    """,
+    """
+    INSERT INTO CP01_2S_LOGIN_ROLLUP (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+    SELECT 'IP', IP_LOGIN, COUNT(*), MIN(DATA_LOGIN), MAX(DATA_LOGIN)
+    FROM CP01_2S_LOGIN GROUP BY IP_LOGIN
+    """,
+]
+
+def _prc_login_rollup(cursor, id_usuario, ip_login, data_login):
+    for dimensao, chave in (("DIA", data_login.date().isoformat()), ("USUARIO", str(id_usuario)), ("IP", ip_login)):
+        cursor.execute(ROLLUP_UPSERT_SQL, {"dimensao": dimensao, "chave": chave, "data_login": data_login})
+
+def _prc_login_rollup_backfill(cursor):
+    for statement in ROLLUP_BACKFILL_SQL:
+        cursor.execute(statement)
+
+PROCEDURES = {
+    "PRC_LOGIN_ROLLUP": _prc_login_rollup,
+    "PRC_LOGIN_ROLLUP_BACKFILL": _prc_login_rollup_backfill,
+}
+
+# Datas gravadas como texto ISO de largura fixa, então comparar texto = comparar datas
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", "microseconds"))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+# Uma instrução já traduzida: SQL (ou procedure + nomes dos binds) e OUT binds do RETURNING INTO
+Statement = namedtuple("Statement", ["sql", "out_names", "procedure", "arg_names"])
+
+_BLOCK_RE = re.compile(r"^\s*BEGIN\b(.*)\bEND\s*;\s*$", re.S | re.I)
+_CALL_RE = re.compile(r"^(\w+)\s*(?:\((.*)\))?$", re.S)
+_RETURNING_RE = re.compile(r"\bRETURNING\s+(.+?)\s+INTO\s+(.+?)\s*$", re.S | re.I)
+_NEXTVAL_RE = re.compile(r"\b\w+\.NEXTVAL\b", re.I)
+_FETCH_FIRST_RE = re.compile(r"\bFETCH\s+FIRST\s+(\S+)\s+ROWS?\s+ONLY\b", re.I)
+
+def _translate_statement(sql: str) -> Statement:
+    sql = sql.strip()
+    call = _CALL_RE.match(sql)
+    if call and call.group(1).upper() in PROCEDURES:
+        args = [arg.strip().lstrip(":") for arg in (call.group(2) or "").split(",") if arg.strip()]
+        return Statement(None, (), call.group(1).upper(), args)
+
+    out_names = ()
+    returning = _RETURNING_RE.search(sql)
+    if returning:
+        out_names = tuple(name.strip().lstrip(":") for name in returning.group(2).split(","))
+        sql = sql[:returning.start()] + f"RETURNING {returning.group(1)}"
+
+    # O id vem do AUTOINCREMENT da tabela
+    sql = _NEXTVAL_RE.sub("NULL", sql)
+    sql = _FETCH_FIRST_RE.sub(r"LIMIT \1", sql)
+    return Statement(sql, out_names, None, ())
+
+@functools.lru_cache(maxsize=256)
+def translate(query: str) -> tuple:
+    """Translate an Oracle statement or PL/SQL block into SQLite statements"""
+    block = _BLOCK_RE.match(query)
+    if not block:
+        return (_translate_statement(query),)
+    return tuple(
+        _translate_statement(statement)
+        for statement in block.group(1).split(";")
+        if statement.strip()
+    )
+
+class SQLiteDatabase(DatabaseBackend):
+    """SQLite backend with one connection per thread (WAL), or a single locked one for :memory:"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.in_memory = path == ":memory:"
+        self.connection = None
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.RLock()
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=DB_POOL_WAIT_TIMEOUT_MS / 1000,
+            check_same_thread=False
+        )
+        if not self.in_memory:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA_SQL)
+                self._schema_ready = True
+                logger.info(f"SQLite database ready at {self.path}")
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def connection_scope(self):
+        """Use this thread's connection (or the shared in-memory one, holding its lock)"""
+        if self.in_memory:
+            with self._lock:
+                if self.connection is None:
+                    self.connection = self._connect()
+                yield self.connection
+            return
+
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._local.connection = self._connect()
+        yield conn
+
+    def pool_stats(self):
+        """Open connections (one per thread that touched the database)"""
+        return {"mode": "sqlite", "path": self.path, "open": len(self._connections)}
+
+    def warm_up(self) -> int:
+        """Open the connection (creating the schema) and run a trivial query on it"""
+        with self.connection_scope() as conn:
+            conn.execute("SELECT 1").fetchone()
+        return 1
+
+    def close_connection(self):
+        """Close every connection"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self.connection = None
+            self._local = threading.local()
+        self.shutdown_executor()
+
+    def _execute(self, cursor, statements, params):
+        """Run translated statements, returning the OUT bind values and the last rowcount"""
+        values = {}
+        rowcount = 0
+        for statement in statements:
+            if statement.procedure:
+                PROCEDURES[statement.procedure](cursor, *(params[name] for name in statement.arg_names))
+                continue
+            cursor.execute(statement.sql, params)
+            if statement.out_names:
+                rows = cursor.fetchall()
+                values.update(zip(statement.out_names, rows[0] if rows else [None] * len(statement.out_names)))
+            rowcount = cursor.rowcount
+        return values, rowcount
+
+    def _execute_write(self, query, params, label):
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    values, rowcount = self._execute(cursor, translate(query), params or {})
+                    conn.commit()
+                    cursor.close()
+                    return values, rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"{label} execution error: {e}")
+            raise e
+
+    @instrumented(rows_returned)
+    def execute_query(self, query, params=None, model=None):
+        """Execute a SELECT query (rows are built as `model` instances, unvalidated, when given)"""
+        return self._fetch_all(query, params, model)
+
+    def _fetch_all(self, query, params=None, model=None):
+        try:
+            with self.connection_scope() as conn:
+                cursor = conn.cursor()
+                cursor.execute(translate(query)[0].sql, params or {})
+                result = cursor.fetchall()
+                if model is not None:
+                    build = model_row_builder(model, column_names(cursor.description))
+                    result = [build(row) for row in result]
+                cursor.close()
+                return result
+        except Exception as e:
+            logger.error(f"Query execution error: {e}")
+            raise e
+
+    @instrumented_stream
+    def stream_query(self, query, params=None, arraysize=1000, model=None):
+        """Execute a SELECT query and yield the rows in batches of arraysize"""
+        if self.in_memory:
+            # A conexão compartilhada não pode ficar presa entre os yields
+            rows = self._fetch_all(query, params, model)
+            for start in range(0, len(rows), arraysize):
+                yield rows[start:start + arraysize]
+            return
+
+        # Conexão própria: o gerador pode ser consumido por várias threads (StreamingResponse)
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = arraysize
+            cursor.execute(translate(query)[0].sql, params or {})
+            build = model_row_builder(model, column_names(cursor.description)) if model is not None else None
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield [build(row) for row in rows] if build else rows
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            logger.error(f"Stream query error: {e}")
+            raise e
+        finally:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    @instrumented(rows_affected)
+    def execute_insert(self, query, params=None):
+        """Execute an INSERT query"""
+        return self._execute_write(query, params, "Insert")[1]
+
+    @instrumented(rows_affected)
+    def execute_update(self, query, params=None):
+        """Execute an UPDATE query"""
+        return self._execute_write(query, params, "Update")[1]
+
+    @instrumented(rows_affected)
+    def execute_delete(self, query, params=None):
+        """Execute a DELETE query"""
+        return self._execute_write(query, params, "Delete")[1]
+
+    @instrumented(rows_returning)
+    def execute_returning(self, query, params=None, returning=None):
+        """Execute a statement or PL/SQL block with OUT binds (RETURNING INTO), commit and return their values"""
+        values = self._execute_write(query, params, "Returning")[0]
+        for name, typ in (returning or {}).items():
+            value = values.get(name)
+            # Colunas do RETURNING não passam pelos conversores de tipo declarado
+            if typ is datetime and isinstance(value, str):
+                values[name] = datetime.fromisoformat(value)
+        return values
+
+    def is_unique_violation(self, error):
+        """True if the error is a UNIQUE constraint violation"""
+        return isinstance(error, sqlite3.IntegrityError) and "UNIQUE" in str(error)
+
+    @instrumented(rows_affected)
+    def execute_many(self, query, params_list):
+        """Execute a statement (or PL/SQL block) for many rows in one transaction"""
+        statements = translate(query)
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    if len(statements) == 1 and statements[0].sql and not statements[0].out_names:
+                        cursor.executemany(statements[0].sql, params_list)
+                        rowcount = cursor.rowcount
+                    else:
+                        for params in params_list:
+                            self._execute(cursor, statements, params)
+                        rowcount = len(params_list)
+                    conn.commit()
+                    cursor.close()
+                    return rowcount
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Batch execution error: {e}")
+            raise e
+
+    @instrumented(rows_batched)
+    def execute_batch(self, query, params_list):
+        """Execute a statement for many rows, committing the rows that succeed
+
+        Each row runs inside a savepoint, so a failing row (e.g. a duplicate key)
+        is rolled back alone. Returns a list of BatchError for the rows that failed.
+        """
+        statements = translate(query)
+        try:
+            with self.connection_scope() as conn:
+                try:
+                    cursor = conn.cursor()
+                    errors = []
+                    for offset, params in enumerate(params_list):
+                        cursor.execute("SAVEPOINT batch_row")
+                        try:
+                            self._execute(cursor, statements, params)
+                        except (sqlite3.IntegrityError, sqlite3.DataError) as e:
+                            # Só erros da própria linha; falhas do banco sobem e desfazem o lote
+                            cursor.execute("ROLLBACK TO batch_row")
+                            errors.append(BatchError(offset, str(e), self.is_unique_violation(e)))
+                        cursor.execute("RELEASE batch_row")
+                    conn.commit()
+                    cursor.close()
+                    return errors
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Batch execution error: {e}")
+            raise e
@@ -0,0 +1,29 @@
+"""Rebuild the login analytics rollups (CP01_2S_LOGIN_ROLLUP) from the audit trail.
+
+    python backfill_rollups.py
+
+Run once after installing sql/login_rollups.sql, or whenever the counters need to be
+recomputed. Logins keep being recorded meanwhile: each dimension is rebuilt from a
+snapshot (AS OF SCN) plus the increments made after it, without locking CP01_2S_LOGIN.
+"""
+import logging
+import sys
+import time
+
+from app.database import db
+from app.services.rollup_service import rollup_service
+
+logger = logging.getLogger(__name__)
+
+def main():
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        rollup_service.backfill()
+    finally:
+        db.close_connection()
+    logger.info(f"Rollup backfill finished in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""End-to-end benchmark: drives the API over HTTP at a fixed concurrency and reports latency per endpoint.
+
+By default a fresh SQLite database is seeded and the API is started with uvicorn in a
+subprocess (DB_BACKEND=sqlite), so no Oracle server is needed:
+
+    python -m benchmarks.bench_api --concurrency 16 --duration 10
+    python -m benchmarks.bench_api --url http://localhost:8000 --scenarios usuarios_get,logins_list
+
+Seeded users share the password given by --senha. When benchmarking with --url, start the API with
+LOGIN_RATE_LIMIT_ENABLED=false, otherwise the auth scenarios are throttled to a single IP's budget. Needs httpx (pip install -r benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import summarize, save_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Context:
+    """Data the scenarios draw from: seeded users and the ids created during the run"""
+
+    def __init__(self, usuarios, senha, rng):
+        self.usuarios = usuarios
+        self.senha = senha
+        self.rng = rng
+        self.created_ids = []
+        self.tokens = {}
+        self.counter = itertools.count()
+
+    def random_usuario(self):
+        return self.rng.choice(self.usuarios)
+
+def ok_login(response):
+    return response.status_code == 200 and response.json().get("success") is True
+
+def ok_status(response):
+    return response.status_code < 400
+
+async def auth_login(client, ctx):
+    usuario = ctx.random_usuario()
+    return await client.post("/auth/login", json={"email": usuario["email"], "password": ctx.senha}), ok_login
+
+async def auth_verify(client, ctx):
+    usuario = ctx.random_usuario()
+    return await client.post("/auth/verify", json={"email": usuario["email"], "password": ctx.senha}), ok_login
+
+async def auth_me(client, ctx):
+    usuario = ctx.random_usuario()
+    token = ctx.tokens.get(usuario["id_usuario"])
+    if token is None:
+        login = await client.post("/auth/login", json={"email": usuario["email"], "password": ctx.senha})
+        token = ctx.tokens[usuario["id_usuario"]] = login.json()["access_token"]
+    return await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}), ok_status
+
+async def usuarios_create(client, ctx):
+    n = next(ctx.counter)
+    response = await client.post("/usuarios/", json={
+        "nome_usuario": f"Bench {n}",
+        "email": f"bench-{uuid.uuid4().hex}@example.com",
+        "apelido_steam": f"bench{n}",
+        "id_perfil": 1,
+        "senha_usuario": ctx.senha,
+    })
+    if response.status_code == 201:
+        ctx.created_ids.append(response.json()["id_usuario"])
+    return response, ok_status
+
+async def usuarios_get(client, ctx):
+    return await client.get(f"/usuarios/{ctx.random_usuario()['id_usuario']}"), ok_status
+
+async def usuarios_list(client, ctx):
+    return await client.get("/usuarios/", params={"limit": 100}), ok_status
+
+async def usuarios_update(client, ctx):
+    user_id = ctx.rng.choice(ctx.created_ids or [u["id_usuario"] for u in ctx.usuarios])
+    return await client.put(f"/usuarios/{user_id}", json={"apelido_steam": f"upd{next(ctx.counter)}"}), ok_status
+
+async def usuarios_delete(client, ctx):
+    if not ctx.created_ids:
+        return None, None
+    return await client.delete(f"/usuarios/{ctx.created_ids.pop()}"), ok_status
+
+async def logins_list(client, ctx):
+    return await client.get("/logins/", params={"limit": 100}), ok_status
+
+async def logins_user(client, ctx):
+    return await client.get(f"/logins/user/{ctx.random_usuario()['id_usuario']}"), ok_status
+
+# Ordem importa: update/delete usam os usuários criados em usuarios_create
+SCENARIOS = {
+    "auth_login": auth_login,
+    "auth_verify": auth_verify,
+    "auth_me": auth_me,
+    "usuarios_create": usuarios_create,
+    "usuarios_get": usuarios_get,
+    "usuarios_list": usuarios_list,
+    "usuarios_update": usuarios_update,
+    "usuarios_delete": usuarios_delete,
+    "logins_list": logins_list,
+    "logins_user": logins_user,
+}
+
+# Cenários que consomem um estoque finito (os usuários criados): sem warmup para não gastá-lo
+FINITE_SCENARIOS = {"usuarios_delete"}
+
+async def run_scenario(client, ctx, scenario, concurrency, duration, warmup):
+    """Closed loop: `concurrency` workers issue requests back to back for `duration` seconds"""
+    latencies = []
+    errors = 0
+    stop_at = None
+    record_from = time.perf_counter() + warmup
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            response, check = await scenario(client, ctx)
+            if response is None:
+                return
+            finished = time.perf_counter()
+            if started < record_from:
+                continue
+            latencies.append(finished - started)
+            if not check(response):
+                errors += 1
+
+    stop_at = record_from + duration
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = max(min(time.perf_counter(), stop_at) - record_from, 0.0)
+    return summarize(latencies, errors, elapsed)
+
+async def load_usuarios(client, limit):
+    response = await client.get("/usuarios/", params={"limit": limit})
+    response.raise_for_status()
+    return response.json()
+
+async def run(url, scenarios, concurrency, duration, warmup, senha, seed):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        usuarios = await load_usuarios(client, 1000)
+        if not usuarios:
+            raise SystemExit("No users found: seed the database first")
+        ctx = Context(usuarios, senha, random.Random(seed))
+        results = {}
+        for name in scenarios:
+            print(f"{name}: {concurrency} clients, {duration}s", file=sys.stderr)
+            scenario_warmup = 0.0 if name in FINITE_SCENARIOS else warmup
+            results[name] = await run_scenario(client, ctx, SCENARIOS[name], concurrency, duration, scenario_warmup)
+        return results
+
+def seed_database(env, usuarios, logins, senha):
+    subprocess.run(
+        [sys.executable, "seed_database.py", "--usuarios", str(usuarios), "--logins", str(logins),
+         "--senha", senha, "--seed", "42"],
+        cwd=BACKEND_DIR, env=env, check=True
+    )
+
+def start_server(env, port):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("API server exited during startup")
+        try:
+            # /ready só responde 200 depois do warm-up (conexões e workers de hash prontos)
+            if httpx.get(f"{url}/ready", timeout=1).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("API server did not become ready in 30s")
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API benchmark")
+    parser.add_argument("--url", help="benchmark an already running API instead of starting one")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated, in run order")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds discarded at the start of each scenario")
+    parser.add_argument("--usuarios", type=int, default=2000, help="users seeded in the local database")
+    parser.add_argument("--logins", type=int, default=200000, help="logins seeded in the local database")
+    parser.add_argument("--senha", default="senha123")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", "-o", help="results file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    server = None
+    workdir = None
+    url = args.url
+    if url is None:
+        workdir = tempfile.TemporaryDirectory(prefix="bench-api-")
+        # Todos os clientes saem do mesmo IP: sem o limite de tentativas de login
+        env = {**os.environ, "DB_BACKEND": "sqlite", "SQLITE_PATH": os.path.join(workdir.name, "bench.db"),
+               "LOGIN_RATE_LIMIT_ENABLED": "false", "SESSION_SECRET": os.environ.get("SESSION_SECRET", "bench-secret")}
+        seed_database(env, args.usuarios, args.logins, args.senha)
+        server, url = start_server(env, args.port)
+
+    try:
+        results = asyncio.run(run(url, scenarios, args.concurrency, args.duration, args.warmup, args.senha, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if workdir is not None:
+            workdir.cleanup()
+
+    config = {
+        "url": args.url or "local sqlite",
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "seeded_usuarios": None if args.url else args.usuarios,
+        "seeded_logins": None if args.url else args.logins,
+    }
+    save_results("api", {"config": config, "endpoints": results}, args.output)
+
+    print(f"\n{'scenario':<18}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['throughput_rps']:>9}{result['p50_ms'] or 0:>10}"
+              f"{result['p95_ms'] or 0:>10}{result['p99_ms'] or 0:>10}{result['errors']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Micro-benchmarks of the per-request hot spots: bcrypt verify, row mapping and JSON serialization.
+
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --only json --items 1000,10000,100000
+
+Results are saved as JSON next to the API benchmark results (benchmarks/results/).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.mapping import model_row_builder
+from app.models.login import LoginResponse
+from app.responses import ModelJSONResponse
+from app.services.auth_service import AuthService
+from benchmarks import bench_row_mapping
+from benchmarks.common import save_results
+
+def bench_verify_password(iterations):
+    """AuthService.verify_password on the default cost, one call at a time"""
+    auth = AuthService()
+    hashed = auth.get_password_hash("senha123")
+    auth.verify_password("senha123", hashed)  # carrega o backend do bcrypt
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        auth.verify_password("senha123", hashed)
+        timings.append(time.perf_counter() - started)
+    return {
+        "iterations": iterations,
+        "rounds": int(hashed.split("$")[2]),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+        "verifies_per_second_per_core": round(1 / statistics.mean(timings), 1),
+    }
+
+def make_logins(count):
+    build = model_row_builder(LoginResponse, bench_row_mapping.LOGIN_NAMES)
+    return [build(row) for row in bench_row_mapping.make_login_rows(count)]
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def bench_json(item_counts, repeat):
+    """Bytes of a List[LoginResponse] body: FastAPI's default path vs direct serialization strategies"""
+    field = create_response_field(name="response", type_=List[LoginResponse], mode="serialization")
+    adapter = TypeAdapter(List[LoginResponse])
+
+    def fastapi_default(logins):
+        # O que o FastAPI faz com response_model: dump, revalida, converte e json.dumps
+        content = asyncio.run(serialize_response(field=field, response_content=logins))
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    strategies = {
+        "fastapi_response_model": fastapi_default,
+        "model_dump_json_join": lambda logins: b"[" + b",".join(l.model_dump_json().encode() for l in logins) + b"]",
+        "type_adapter_dump_json": adapter.dump_json,
+        # Caminho usado pelos endpoints de lista (GET /usuarios/, GET /logins/)
+        "model_json_response": lambda logins: ModelJSONResponse(logins).body,
+    }
+
+    results = {}
+    for count in item_counts:
+        logins = make_logins(count)
+        per_count = {}
+        for name, fn in strategies.items():
+            elapsed = best_of(lambda: fn(logins), repeat)
+            per_count[name] = {
+                "total_ms": round(elapsed * 1000, 2),
+                "per_item_us": round(elapsed * 1_000_000 / count, 3),
+            }
+        baseline = per_count["fastapi_response_model"]["total_ms"]
+        for result in per_count.values():
+            result["speedup"] = round(baseline / result["total_ms"], 2) if result["total_ms"] else None
+        results[str(count)] = per_count
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks (bcrypt, row mapping, JSON)")
+    parser.add_argument("--only", choices=["verify", "mapping", "json"], action="append",
+                        help="run only these benchmarks (repeatable)")
+    parser.add_argument("--verify-iterations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows for the mapping benchmark")
+    parser.add_argument("--items", default="10000,100000", help="list sizes for the JSON benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", "-o", help="results file (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    selected = args.only or ["verify", "mapping", "json"]
+    results = {}
+    if "verify" in selected:
+        results["verify_password"] = bench_verify_password(args.verify_iterations)
+    if "mapping" in selected:
+        results["row_mapping"] = bench_row_mapping.run(args.rows, args.repeat)
+    if "json" in selected:
+        item_counts = [int(count) for count in args.items.split(",")]
+        results["json_serialization"] = bench_json(item_counts, args.repeat)
+
+    save_results("micro", {"benchmarks": results}, args.output)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Micro-benchmark: cost per row of turning database tuples into response models.
+
+Compares the old hand-written, fully validated mapping (`LoginResponse(id_login=row[0], ...)`)
+with `model_construct` and with the rowfactory builder in app.mapping.
+
+    python -m benchmarks.bench_row_mapping --rows 100000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.mapping import model_row_builder
+from app.models.login import LoginResponse
+from app.models.usuario import UsuarioResponse
+
+LOGIN_NAMES = ["id_login", "ip_login", "user_agent", "data_login", "id_usuario"]
+USUARIO_NAMES = ["id_usuario", "nome_usuario", "email", "apelido_steam", "data_criacao", "id_perfil", "ultimo_login"]
+
+def make_login_rows(count):
+    base = datetime(2024, 1, 1)
+    return [
+        (i, f"10.0.{i % 256}.{i % 200}", "Mozilla/5.0 (X11; Linux x86_64)", base + timedelta(seconds=i), i % 5000)
+        for i in range(count)
+    ]
+
+def make_usuario_rows(count):
+    base = datetime(2024, 1, 1)
+    return [
+        (i, f"Usuario {i}", f"user{i}@example.com", f"player{i}", base + timedelta(minutes=i), 1 + i % 3,
+         base + timedelta(days=1, minutes=i))
+        for i in range(count)
+    ]
+
+def validated_login(row):
+    return LoginResponse(
+        id_login=row[0],
+        ip_login=row[1],
+        user_agent=row[2],
+        data_login=row[3],
+        id_usuario=row[4]
+    )
+
+def validated_usuario(row):
+    return UsuarioResponse(
+        id_usuario=row[0],
+        nome_usuario=row[1],
+        email=row[2],
+        apelido_steam=row[3],
+        data_criacao=row[4],
+        id_perfil=row[5],
+        ultimo_login=row[6]
+    )
+
+def timeit(fn, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for row in rows:
+            fn(row)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def bench(model, names, rows, validated, repeat):
+    construct = model.model_construct
+    strategies = {
+        "validated": validated,
+        "model_construct": lambda row: construct(**dict(zip(names, row))),
+        "rowfactory": model_row_builder(model, names),
+    }
+    results = {}
+    for name, fn in strategies.items():
+        elapsed = timeit(fn, rows, repeat)
+        results[name] = {
+            "total_ms": round(elapsed * 1000, 2),
+            "per_row_us": round(elapsed * 1_000_000 / len(rows), 3),
+        }
+    baseline = results["validated"]["total_ms"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["total_ms"], 2) if result["total_ms"] else None
+    return results
+
+def run(rows=100_000, repeat=3):
+    return {
+        "rows": rows,
+        "LoginResponse": bench(LoginResponse, LOGIN_NAMES, make_login_rows(rows), validated_login, repeat),
+        "UsuarioResponse": bench(UsuarioResponse, USUARIO_NAMES, make_usuario_rows(rows), validated_usuario, repeat),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.rows} rows (best of {args.repeat})")
+    for model in ("LoginResponse", "UsuarioResponse"):
+        print(f"\n{model}")
+        for name, result in results[model].items():
+            print(f"  {name:<16} {result['total_ms']:>9.2f} ms  {result['per_row_us']:>7.3f} us/row  x{result['speedup']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Helpers shared by the benchmarks: latency summaries and machine-readable result files."""
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import subprocess
+import sys
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def summarize(latencies_s, errors, elapsed_s):
+    """Count, throughput and latency percentiles (ms) of one scenario"""
+    values = sorted(latencies_s)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed_s, 1) if elapsed_s else 0.0,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment():
+    """Where the numbers came from (stored with every result file)"""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def save_results(kind, results, output=None):
+    """Write results (plus environment metadata) as JSON and return the path"""
+    document = {"kind": kind, "environment": environment(), **results}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = document["environment"]["commit"] or "nocommit"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{kind}-{stamp}-{commit}.json")
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    return output
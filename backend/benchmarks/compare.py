@@ -0,0 +1,80 @@
+"""Compare two benchmark result files (e.g. main vs a branch) and flag regressions.
+
+    python -m benchmarks.compare benchmarks/results/api-old.json benchmarks/results/api-new.json
+    python -m benchmarks.compare old.json new.json --threshold 5
+
+Every numeric metric present in both files is compared. Latency/time metrics (*_ms, *_us)
+regress when they grow; throughput metrics (*_rps, *per_second*) regress when they shrink.
+Relative figures such as speedup are skipped, since they move with their own baseline.
+The exit status is 1 when any metric regressed by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_ms", "_us")
+HIGHER_IS_BETTER = ("_rps", "per_second")
+
+def flatten(document, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1}, numeric leaves only"""
+    values = {}
+    for key, value in document.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+def direction(metric):
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    if any(marker in name for marker in HIGHER_IS_BETTER):
+        return 1
+    return 0
+
+def compare(old, new, threshold):
+    """Rows of (metric, old, new, change %, regressed) for the comparable metrics"""
+    old_values = flatten({k: v for k, v in old.items() if k != "environment"})
+    new_values = flatten({k: v for k, v in new.items() if k != "environment"})
+    rows = []
+    for metric in sorted(old_values.keys() & new_values.keys()):
+        sign = direction(metric)
+        before, after = old_values[metric], new_values[metric]
+        if sign == 0 or not before:
+            continue
+        change = (after - before) / before * 100
+        regressed = change * sign < -threshold
+        rows.append((metric, before, after, change, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if old.get("kind") != new.get("kind"):
+        parser.error(f"cannot compare '{old.get('kind')}' results with '{new.get('kind')}' results")
+
+    print(f"old: {old['environment'].get('commit')} ({old['environment'].get('timestamp')})")
+    print(f"new: {new['environment'].get('commit')} ({new['environment'].get('timestamp')})\n")
+
+    rows = compare(old, new, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:<{width}}  {before:>12.3f}  {after:>12.3f}  {change:>+8.1f}%{flag}")
+
+    regressions = sum(1 for row in rows if row[4])
+    print(f"\n{regressions} regression(s) beyond {args.threshold}%")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
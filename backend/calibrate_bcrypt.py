@@ -0,0 +1,63 @@
+"""Measure bcrypt verify time on this machine and recommend BCRYPT_ROUNDS for a latency budget.
+
+    python calibrate_bcrypt.py --target-ms 250
+    python calibrate_bcrypt.py --target-ms 100 --min-rounds 8 --max-rounds 14 --samples 10
+
+Each cost doubles the work of the previous one. Run it on the hardware that serves logins:
+a login pays one verify, plus one hash the first time a stored hash is upgraded.
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+
+from passlib.hash import bcrypt
+
+from config import BCRYPT_ROUNDS
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = "calibration-password"
+
+def measure(rounds: int, samples: int) -> float:
+    """Median verify time in milliseconds for a hash with the given cost"""
+    hashed = bcrypt.using(rounds=rounds).hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend a bcrypt cost for a verify latency budget")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="verify time budget per login")
+    parser.add_argument("--min-rounds", type=int, default=bcrypt.min_rounds)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5, help="verifies measured per cost")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if not bcrypt.min_rounds <= args.min_rounds <= args.max_rounds <= bcrypt.max_rounds:
+        parser.error(f"rounds must satisfy {bcrypt.min_rounds} <= min <= max <= {bcrypt.max_rounds}")
+
+    recommended = None
+    print(f"{'rounds':>6}{'verify ms':>12}{'logins/s/core':>15}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        elapsed_ms = measure(rounds, args.samples)
+        marker = "  (current)" if rounds == BCRYPT_ROUNDS else ""
+        print(f"{rounds:>6}{elapsed_ms:>12.1f}{1000 / elapsed_ms:>15.1f}{marker}")
+        if elapsed_ms <= args.target_ms:
+            recommended = rounds
+        elif elapsed_ms > args.target_ms * 2:
+            # O próximo custo levaria o dobro: não vale medir
+            break
+
+    if recommended is None:
+        logger.warning(f"Even {args.min_rounds} rounds exceed {args.target_ms} ms on this machine")
+        sys.exit(1)
+    print(f"\nRecommended: BCRYPT_ROUNDS={recommended} (target {args.target_ms:g} ms, current {BCRYPT_ROUNDS})")
+
+if __name__ == "__main__":
+    main()
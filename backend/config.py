@@ -11,8 +11,80 @@ DB_PORT = os.getenv("DB_PORT", "1521")
 DB_SID = os.getenv("DB_SID", "ord")
 
 SESSION_TIMEOUT_MINUTES = int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
+# HMAC key of the session tokens issued by /auth/login (must be the same on every worker)
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+# Dev/test only: without SESSION_SECRET, sign with a random per-process secret instead of refusing to start
+SESSION_SECRET_EPHEMERAL = os.getenv("SESSION_SECRET_EPHEMERAL", "false").lower() == "true"
 
 DATABASE_URL_SID = f"{DB_USER}/{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_SID}"
 DATABASE_URL_SERVICE = f"{DB_USER}/{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/orcl"
 DATABASE_URL_FULL = f"{DB_USER}/{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/orcl.fiap.com.br"
 DATABASE_URL = DATABASE_URL_SERVICE
+
+# Connection pool (oracledb.create_pool)
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() == "true"
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_INCREMENT = int(os.getenv("DB_POOL_INCREMENT", "1"))
+DB_POOL_WAIT_TIMEOUT_MS = int(os.getenv("DB_POOL_WAIT_TIMEOUT_MS", "5000"))
+
+# Threads used to run blocking database calls off the event loop
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX)))
+
+# bcrypt cost factor (see calibrate_bcrypt.py); stored hashes with another cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Login attempt limits (/auth/login and /auth/verify), checked before the database lookup and bcrypt
+LOGIN_RATE_LIMIT_ENABLED = os.getenv("LOGIN_RATE_LIMIT_ENABLED", "true").lower() == "true"
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "60"))
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "10"))
+LOGIN_EMAIL_BURST = int(os.getenv("LOGIN_EMAIL_BURST", "5"))
+LOGIN_RATE_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Password hashing process pool
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE_MAX = int(os.getenv("HASH_QUEUE_MAX", "64"))
+HASH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("HASH_QUEUE_TIMEOUT_SECONDS", "5"))
+
+# Login audit write-behind (buffered batch inserts)
+AUDIT_WRITE_BEHIND = os.getenv("AUDIT_WRITE_BEHIND", "false").lower() == "true"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "500"))
+AUDIT_MAX_BACKLOG = int(os.getenv("AUDIT_MAX_BACKLOG", "10000"))
+
+# Pagination / streaming of list endpoints
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "1000"))
+
+# In-process user cache (UsuarioService)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+# Bulk user import (POST /usuarios/bulk)
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "50000"))
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+HASH_BULK_CHUNK_SIZE = int(os.getenv("HASH_BULK_CHUNK_SIZE", "8"))
+
+# Audit trail export (GET /logins/export, export_logins.py)
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "10000"))
+
+# Login analytics rollups (sql/login_rollups.sql must be installed first)
+LOGIN_ROLLUPS_ENABLED = os.getenv("LOGIN_ROLLUPS_ENABLED", "false").lower() == "true"
+
+# Storage backend: "oracle" (production) or "sqlite" (local load tests / profiling, no Oracle needed)
+DB_BACKEND = os.getenv("DB_BACKEND", "oracle").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "humanexe.db")
+
+# Per-statement query statistics (GET /admin/queries)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_STATS_MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", "1000"))
+# Token required in X-Admin-Token by the /admin endpoints (empty = /admin disabled)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Process lifecycle: warm-up before serving (/ready) and graceful shutdown
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "30"))
+# Passed to uvicorn as timeout_graceful_shutdown (python main.py); with the uvicorn CLI use --timeout-graceful-shutdown
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT_SECONDS", "20"))
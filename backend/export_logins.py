@@ -0,0 +1,47 @@
+"""Export the login audit trail (CP01_2S_LOGIN) to NDJSON, CSV or Parquet.
+
+    python export_logins.py --format csv --output logins.csv
+    python export_logins.py --format ndjson --id-usuario 42 --data-inicio 2024-01-01 > logins.ndjson
+"""
+from datetime import datetime
+import argparse
+import logging
+import sys
+
+from app.database import db
+from app.services.export_service import export_service, EXPORT_MEDIA_TYPES
+from config import EXPORT_FETCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the login audit trail")
+    parser.add_argument("--format", choices=sorted(EXPORT_MEDIA_TYPES), default="ndjson")
+    parser.add_argument("--output", "-o", help="output file (default: stdout)")
+    parser.add_argument("--id-usuario", type=int)
+    parser.add_argument("--data-inicio", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    parser.add_argument("--data-fim", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+    parser.add_argument("--fetch-size", type=int, default=EXPORT_FETCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if not export_service.supports(args.format):
+        parser.error(f"format '{args.format}' needs pyarrow installed")
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in export_service.export(
+            args.format, args.id_usuario, args.data_inicio, args.data_fim, args.fetch_size
+        ):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+        db.close_connection()
+    logger.info(f"Export finished: {written} bytes")
+
+if __name__ == "__main__":
+    main()
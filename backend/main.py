@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
@@ -7,19 +8,38 @@ import uvicorn
 from app.controllers.auth_controller import router as auth_router
 from app.controllers.usuario_controller import router as usuario_router
 from app.controllers.login_controller import router as login_router
+from app.controllers.analytics_controller import router as analytics_router
+from app.controllers.metrics_controller import router as metrics_router
+from app.controllers.admin_controller import router as admin_router
+from app.database import db
+from app.lifecycle import lifecycle
+from app.middleware import MetricsMiddleware, TimedRoute
+from app.services.login_service import login_service
+from app.services.user_cache import user_cache
+from config import SHUTDOWN_DRAIN_TIMEOUT_SECONDS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up connections and hashing workers before serving; flush and release them on shutdown"""
+    await lifecycle.startup()
+    yield
+    await lifecycle.shutdown()
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Game Starter API",
     description="API para sistema de login com auditoria",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc"
 )
+# Rotas declaradas aqui também entram nas métricas por rota
+app.router.route_class = TimedRoute
 
 origins = [
     "http://localhost:5173",
@@ -35,12 +55,17 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(usuario_router)
 app.include_router(login_router)
+app.include_router(analytics_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 @app.get("/")
 async def root():
@@ -54,13 +79,22 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    health = {"status": "healthy", "database": db.pool_stats(), "user_cache": user_cache.stats()}
+    if login_service.audit_writer is not None:
+        health["audit"] = login_service.audit_writer.stats()
+    return health
 
 @app.get("/test")
 async def test_endpoint():
     """Test endpoint"""
     return {"message": "API funcionando!", "cors": "OK"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once connections and hashing workers are warm, 503 before that"""
+    status = lifecycle.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -80,5 +114,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # O uvicorn para de aceitar conexões e espera as requisições em andamento antes do lifespan shutdown
+        timeout_graceful_shutdown=SHUTDOWN_DRAIN_TIMEOUT_SECONDS
     )
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""Fill the database with synthetic users and login audit rows for load tests and profiling.
+
+    DB_BACKEND=sqlite python seed_database.py --usuarios 10000 --logins 1000000
+
+Every seeded user gets the same password (--senha), hashed once. Refuses to run against
+Oracle unless --allow-oracle is given.
+"""
+from datetime import datetime, timedelta
+import argparse
+import logging
+import random
+import sys
+import time
+
+from app.database import db
+from app.services.auth_service import auth_service
+from app.services.login_service import INSERT_LOGIN_SQL
+from app.services.rollup_service import rollup_service
+from config import DB_BACKEND, LOGIN_ROLLUPS_ENABLED
+
+logger = logging.getLogger(__name__)
+
+INSERT_USUARIO_SQL = """
+    INSERT INTO CP01_2S_USUARIO
+    (ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL)
+    VALUES (SEQ_USUARIO.NEXTVAL, :nome_usuario, :email, :senha_usuario, :apelido_steam, :data_criacao, :ultimo_login, :id_perfil)
+"""
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+]
+
+def seed_usuarios(count, senha, days, batch_size):
+    hashed = auth_service.get_password_hash(senha)
+    now = datetime.now()
+    run_id = int(time.time())
+    failed = 0
+    for start in range(0, count, batch_size):
+        params_list = []
+        for n in range(start, min(start + batch_size, count)):
+            created = now - timedelta(seconds=random.randint(0, days * 86400))
+            params_list.append({
+                "nome_usuario": f"Usuário {n}",
+                "email": f"seed{run_id}_{n}@example.com",
+                "senha_usuario": hashed,
+                "apelido_steam": f"player{n}",
+                "data_criacao": created,
+                "ultimo_login": None,
+                "id_perfil": random.choice((1, 1, 1, 2)),
+            })
+        failed += len(db.execute_batch(INSERT_USUARIO_SQL, params_list))
+    return count - failed
+
+def seed_logins(count, days, batch_size):
+    user_ids = [row[0] for row in db.execute_query("SELECT ID_USUARIO FROM CP01_2S_USUARIO")]
+    if not user_ids:
+        raise SystemExit("No users to attach logins to (seed users first)")
+    # Poucos IPs "populares" e uma cauda longa, como em tráfego real
+    ips = [f"10.0.{i // 256}.{i % 256}" for i in range(2000)]
+    now = datetime.now()
+    for start in range(0, count, batch_size):
+        params_list = [
+            {
+                "ip_login": random.choice(ips[:50]) if random.random() < 0.5 else random.choice(ips),
+                "user_agent": random.choice(USER_AGENTS),
+                "data_login": now - timedelta(seconds=random.randint(0, days * 86400)),
+                "id_usuario": random.choice(user_ids),
+            }
+            for _ in range(start, min(start + batch_size, count))
+        ]
+        db.execute_many(INSERT_LOGIN_SQL, params_list)
+        logger.info(f"{start + len(params_list)}/{count} logins")
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic users and logins")
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=100000)
+    parser.add_argument("--senha", default="senha123", help="password of every seeded user")
+    parser.add_argument("--days", type=int, default=365, help="spread dates over the last N days")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, help="random seed (reproducible data)")
+    parser.add_argument("--allow-oracle", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    if DB_BACKEND == "oracle" and not args.allow_oracle:
+        parser.error("refusing to seed Oracle without --allow-oracle (use DB_BACKEND=sqlite)")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    started = time.perf_counter()
+    try:
+        created = seed_usuarios(args.usuarios, args.senha, args.days, args.batch_size)
+        logger.info(f"{created} users created")
+        if args.logins:
+            seed_logins(args.logins, args.days, args.batch_size)
+        if LOGIN_ROLLUPS_ENABLED:
+            rollup_service.backfill()
+    finally:
+        db.close_connection()
+    logger.info(f"Seed finished in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+-- Rollups de login (contadores por dia, por usuário e por IP)
+-- Rodar uma vez no schema da aplicação e depois habilitar LOGIN_ROLLUPS_ENABLED=true.
+-- Para popular com o histórico existente: python backfill_rollups.py
+
+CREATE TABLE CP01_2S_LOGIN_ROLLUP (
+    DIMENSAO        VARCHAR2(10)  NOT NULL,  -- 'DIA' | 'USUARIO' | 'IP'
+    CHAVE           VARCHAR2(100) NOT NULL,  -- YYYY-MM-DD | ID_USUARIO | IP_LOGIN
+    TOTAL_LOGINS    NUMBER        NOT NULL,
+    PRIMEIRO_LOGIN  TIMESTAMP,
+    ULTIMO_LOGIN    TIMESTAMP,
+    CONSTRAINT PK_LOGIN_ROLLUP PRIMARY KEY (DIMENSAO, CHAVE)
+) ORGANIZATION INDEX;
+
+-- Incrementa um contador (upsert seguro para logins concorrentes)
+CREATE OR REPLACE PROCEDURE PRC_LOGIN_ROLLUP_INC (
+    p_dimensao IN VARCHAR2,
+    p_chave    IN VARCHAR2,
+    p_data     IN TIMESTAMP
+) AS
+BEGIN
+    UPDATE CP01_2S_LOGIN_ROLLUP
+       SET TOTAL_LOGINS   = TOTAL_LOGINS + 1,
+           PRIMEIRO_LOGIN = LEAST(NVL(PRIMEIRO_LOGIN, p_data), p_data),
+           ULTIMO_LOGIN   = GREATEST(NVL(ULTIMO_LOGIN, p_data), p_data)
+     WHERE DIMENSAO = p_dimensao
+       AND CHAVE = p_chave;
+
+    IF SQL%ROWCOUNT = 0 THEN
+        BEGIN
+            INSERT INTO CP01_2S_LOGIN_ROLLUP (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+            VALUES (p_dimensao, p_chave, 1, p_data, p_data);
+        EXCEPTION
+            WHEN DUP_VAL_ON_INDEX THEN
+                -- Outra sessão criou a linha entre o UPDATE e o INSERT
+                UPDATE CP01_2S_LOGIN_ROLLUP
+                   SET TOTAL_LOGINS   = TOTAL_LOGINS + 1,
+                       PRIMEIRO_LOGIN = LEAST(NVL(PRIMEIRO_LOGIN, p_data), p_data),
+                       ULTIMO_LOGIN   = GREATEST(NVL(ULTIMO_LOGIN, p_data), p_data)
+                 WHERE DIMENSAO = p_dimensao
+                   AND CHAVE = p_chave;
+        END;
+    END IF;
+END;
+/
+
+-- Chamado na mesma transação que grava a linha em CP01_2S_LOGIN
+CREATE OR REPLACE PROCEDURE PRC_LOGIN_ROLLUP (
+    p_id_usuario IN NUMBER,
+    p_ip         IN VARCHAR2,
+    p_data       IN TIMESTAMP
+) AS
+BEGIN
+    PRC_LOGIN_ROLLUP_INC('DIA', TO_CHAR(p_data, 'YYYY-MM-DD'), p_data);
+    PRC_LOGIN_ROLLUP_INC('USUARIO', TO_CHAR(p_id_usuario), p_data);
+    PRC_LOGIN_ROLLUP_INC('IP', p_ip, p_data);
+END;
+/
+
+-- Recalcula os rollups de uma dimensão sem bloquear novos logins.
+-- Base: CP01_2S_LOGIN lida AS OF SCN p_scn (snapshot consistente). Os logins gravados depois
+-- do SCN já incrementaram a linha viva, e como o incremento é commitado junto com a auditoria,
+-- TOTAL_LOGINS(agora) - TOTAL_LOGINS(AS OF p_scn) conta exatamente esses logins. A correção
+-- aplicada é um delta fixo somado à linha atual (sob lock de linha), então não conta nada duas
+-- vezes nem perde os incrementos concorrentes.
+CREATE OR REPLACE PROCEDURE PRC_LOGIN_ROLLUP_REBUILD (
+    p_dimensao IN VARCHAR2,
+    p_scn      IN NUMBER
+) AS
+BEGIN
+    FOR tentativa IN 1 .. 5 LOOP
+        BEGIN
+            MERGE INTO CP01_2S_LOGIN_ROLLUP r
+            USING (
+                SELECT NVL(a.CHAVE, s.CHAVE)   AS CHAVE,
+                       NVL(a.TOTAL_LOGINS, 0)  AS TOTAL_SNAPSHOT,
+                       NVL(s.TOTAL_LOGINS, 0)  AS TOTAL_ROLLUP_SNAPSHOT,
+                       a.PRIMEIRO_LOGIN,
+                       a.ULTIMO_LOGIN
+                  FROM (SELECT CASE p_dimensao
+                                   WHEN 'DIA' THEN TO_CHAR(DATA_LOGIN, 'YYYY-MM-DD')
+                                   WHEN 'USUARIO' THEN TO_CHAR(ID_USUARIO)
+                                   ELSE IP_LOGIN
+                               END AS CHAVE,
+                               COUNT(*) AS TOTAL_LOGINS,
+                               MIN(DATA_LOGIN) AS PRIMEIRO_LOGIN,
+                               MAX(DATA_LOGIN) AS ULTIMO_LOGIN
+                          FROM CP01_2S_LOGIN AS OF SCN p_scn
+                         GROUP BY CASE p_dimensao
+                                      WHEN 'DIA' THEN TO_CHAR(DATA_LOGIN, 'YYYY-MM-DD')
+                                      WHEN 'USUARIO' THEN TO_CHAR(ID_USUARIO)
+                                      ELSE IP_LOGIN
+                                  END) a
+                  FULL OUTER JOIN (SELECT CHAVE, TOTAL_LOGINS
+                                     FROM CP01_2S_LOGIN_ROLLUP AS OF SCN p_scn
+                                    WHERE DIMENSAO = p_dimensao) s
+                    ON s.CHAVE = a.CHAVE
+            ) d
+            ON (r.DIMENSAO = p_dimensao AND r.CHAVE = d.CHAVE)
+            WHEN MATCHED THEN UPDATE SET
+                r.TOTAL_LOGINS   = r.TOTAL_LOGINS - d.TOTAL_ROLLUP_SNAPSHOT + d.TOTAL_SNAPSHOT,
+                r.PRIMEIRO_LOGIN = NVL(d.PRIMEIRO_LOGIN, r.PRIMEIRO_LOGIN),
+                -- r.TOTAL_LOGINS > TOTAL_ROLLUP_SNAPSHOT: houve logins depois do SCN
+                r.ULTIMO_LOGIN   = CASE
+                                       WHEN r.TOTAL_LOGINS > d.TOTAL_ROLLUP_SNAPSHOT
+                                       THEN GREATEST(r.ULTIMO_LOGIN, NVL(d.ULTIMO_LOGIN, r.ULTIMO_LOGIN))
+                                       ELSE d.ULTIMO_LOGIN
+                                   END
+                DELETE WHERE r.TOTAL_LOGINS = 0
+            WHEN NOT MATCHED THEN
+                INSERT (DIMENSAO, CHAVE, TOTAL_LOGINS, PRIMEIRO_LOGIN, ULTIMO_LOGIN)
+                VALUES (p_dimensao, d.CHAVE, d.TOTAL_SNAPSHOT, d.PRIMEIRO_LOGIN, d.ULTIMO_LOGIN)
+                WHERE d.TOTAL_SNAPSHOT > 0;
+            COMMIT;
+            RETURN;
+        EXCEPTION
+            WHEN DUP_VAL_ON_INDEX THEN
+                -- Um login criou a chave durante o MERGE: repete (agora ela cai no WHEN MATCHED)
+                IF tentativa = 5 THEN
+                    RAISE;
+                END IF;
+        END;
+    END LOOP;
+END;
+/
+
+-- Recalcula todos os rollups a partir de CP01_2S_LOGIN, uma dimensão por transação e sem LOCK TABLE:
+-- os logins continuam sendo gravados durante o recálculo.
+-- Requer EXECUTE em DBMS_FLASHBACK e UNDO_RETENTION maior que a duração do backfill (senão ORA-01555).
+CREATE OR REPLACE PROCEDURE PRC_LOGIN_ROLLUP_BACKFILL AS
+    v_scn NUMBER := DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER;
+BEGIN
+    PRC_LOGIN_ROLLUP_REBUILD('DIA', v_scn);
+    PRC_LOGIN_ROLLUP_REBUILD('USUARIO', v_scn);
+    PRC_LOGIN_ROLLUP_REBUILD('IP', v_scn);
+END;
+/
@@ -0,0 +1,48 @@
+import itertools
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Testes rodam no backend SQLite em memória, sem Oracle nem warm-up
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("SQLITE_PATH", ":memory:")
+os.environ.setdefault("STARTUP_WARMUP", "false")
+os.environ.setdefault("LOGIN_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("SESSION_SECRET", "test-secret")
+os.environ.setdefault("ADMIN_TOKEN", "test-admin-token")
+# Custo mínimo do bcrypt e poucos workers: os testes hasheiam de verdade, mas rápido
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("HASH_POOL_WORKERS", "2")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_user_numbers = itertools.count(1)
+
+@pytest.fixture
+def make_user():
+    """Insert a user straight into the test database; returns (id_usuario, email)"""
+    from app.database import db
+    from app.services.password_hasher import hash_password
+
+    def make(password="senha123", id_perfil=1, data_criacao=None, password_hash=None):
+        number = next(_user_numbers)
+        email = f"user{number}@example.com"
+        values = db.execute_returning(
+            """
+            INSERT INTO CP01_2S_USUARIO
+            (ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, APELIDO_STEAM, DATA_CRIACAO, ULTIMO_LOGIN, ID_PERFIL)
+            VALUES (SEQ_USUARIO.NEXTVAL, :nome, :email, :senha, :apelido, :data_criacao, NULL, :id_perfil)
+            RETURNING ID_USUARIO INTO :out_id
+            """,
+            {
+                "nome": f"Usuario {number}", "email": email,
+                "senha": password_hash or hash_password(password), "apelido": f"player{number}",
+                "data_criacao": data_criacao or datetime(2024, 1, 1), "id_perfil": id_perfil,
+            },
+            {"out_id": int}
+        )
+        return values["out_id"], email
+
+    return make
@@ -0,0 +1,55 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+import main
+from app.controllers import admin_controller
+from app.query_stats import QueryStats, fingerprint
+
+client = TestClient(main.app)
+
+def test_admin_requires_the_token():
+    assert client.get("/admin/queries").status_code == 403
+    assert client.delete("/admin/queries").status_code == 403
+    assert client.get("/admin/queries", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/queries", headers={"X-Admin-Token": "test-admin-token"}).status_code == 200
+
+def test_admin_is_disabled_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(admin_controller, "ADMIN_TOKEN", "")
+    assert client.get("/admin/queries").status_code == 403
+    assert client.get("/admin/queries", headers={"X-Admin-Token": ""}).status_code == 403
+
+def test_statements_are_grouped_by_fingerprint():
+    assert fingerprint("SELECT *  FROM T\n WHERE A = 'x' AND B = 10 AND C = :c") == \
+        "SELECT * FROM T WHERE A = ? AND B = ? AND C = :c"
+
+    stats = QueryStats(slow_query_ms=0, max_statements=1)
+    stats.record("SELECT 1 FROM T WHERE ID = :id", {"id": 1}, 0.002, 1)
+    stats.record("SELECT  1 FROM T WHERE ID = :id", {"id": 2}, 0.004, 0, error=True)
+    stats.record("SELECT 2 FROM U", None, 0.001, 1)
+
+    (entry,) = stats.snapshot()
+    assert (entry["calls"], entry["errors"], entry["rows"]) == (2, 1, 1)
+    assert entry["avg_ms"] == 3.0
+    assert entry["bind_names"] == ["id"]
+    # Tabela cheia: a instrução nova é contada como descartada em vez de crescer sem limite
+    assert stats.summary()["dropped_calls"] == 1
+
+def test_slow_query_log_never_contains_bind_values(caplog):
+    stats = QueryStats(slow_query_ms=1)
+    with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+        stats.record("SELECT * FROM CP01_2S_USUARIO WHERE EMAIL = :email", {"email": "ana@example.com"}, 0.5, 1)
+    assert "binds=['email']" in caplog.text
+    assert "ana@example.com" not in caplog.text
+    assert stats.snapshot()[0]["slow_calls"] == 1
+
+def test_database_calls_show_up_in_the_admin_endpoint(make_user):
+    headers = {"X-Admin-Token": "test-admin-token"}
+    client.delete("/admin/queries", headers=headers)
+    user_id, _ = make_user()
+    client.get(f"/logins/user/{user_id}")
+
+    data = client.get("/admin/queries", params={"sort": "calls"}, headers=headers).json()
+    statements = [entry["statement"] for entry in data["queries"]]
+    assert any("FROM CP01_2S_LOGIN WHERE ID_USUARIO = :id_usuario" in statement for statement in statements)
+    assert any(statement.startswith("INSERT INTO CP01_2S_USUARIO") for statement in statements)
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from app.database import BatchError
+from app.services import audit_writer as audit_module
+from app.services.audit_writer import AuditWriter
+
+def make_rows(count):
+    return [{"ip_login": "10.0.0.1", "user_agent": "test", "data_login": datetime(2024, 1, 1), "id_usuario": i}
+            for i in range(count)]
+
+def test_failed_flush_is_retried_and_rows_land(monkeypatch):
+    written = []
+    calls = []
+
+    def execute_batch(query, params_list):
+        calls.append(len(params_list))
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        written.extend(params_list)
+        return []
+
+    monkeypatch.setattr(audit_module.db, "execute_batch", execute_batch)
+    writer = AuditWriter("INSERT", batch_size=10, flush_interval_ms=1000, max_backlog=100)
+    writer._buffer.extend(make_rows(3))
+
+    writer.flush()
+    # O lote volta inteiro para o buffer, na mesma ordem
+    assert written == [] and writer.stats()["pending"] == 3 and writer.retries == 1
+
+    writer.flush()
+    assert [row["id_usuario"] for row in written] == [0, 1, 2]
+    assert writer.stats()["pending"] == 0
+    assert writer.flushed_rows == 3 and writer.failed_rows == 0
+
+def test_only_rejected_rows_are_dropped(monkeypatch):
+    monkeypatch.setattr(audit_module.db, "execute_batch",
+                        lambda query, params_list: [BatchError(1, "FK violated", False)])
+    writer = AuditWriter("INSERT", batch_size=10, flush_interval_ms=1000, max_backlog=100)
+    writer._buffer.extend(make_rows(3))
+    writer.flush()
+    assert writer.flushed_rows == 2 and writer.failed_rows == 1
+
+def test_requeue_keeps_the_backlog_bound(monkeypatch):
+    def execute_batch(query, params_list):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(audit_module.db, "execute_batch", execute_batch)
+    writer = AuditWriter("INSERT", batch_size=4, flush_interval_ms=1000, max_backlog=6)
+    writer._buffer.extend(make_rows(6))
+    batch = writer._take_batch()
+    # Chegam novos registros enquanto o lote está no banco
+    writer._buffer.extend(make_rows(4))
+    writer._flush_batch(batch)
+    assert len(writer._buffer) == 6 and writer.dropped == 4
+
+def test_sqlite_batch_runs_the_audit_block():
+    from app.database import db
+    from app.services.login_service import RECORD_LOGIN_BATCH_PLSQL
+
+    db.execute_insert(
+        "INSERT INTO CP01_2S_USUARIO (ID_USUARIO, NOME_USUARIO, EMAIL, SENHA_USUARIO, APELIDO_STEAM, ID_PERFIL, DATA_CRIACAO) "
+        "VALUES (:id, 'Audit', 'audit@example.com', 'x', 'audit', 1, :data)",
+        {"id": 900001, "data": datetime(2024, 1, 1)}
+    )
+    rows = make_rows(1)
+    rows[0]["id_usuario"] = 900001
+    assert db.execute_batch(RECORD_LOGIN_BATCH_PLSQL, rows) == []
+    count = db.execute_query("SELECT COUNT(*) FROM CP01_2S_LOGIN WHERE ID_USUARIO = :id", {"id": 900001})
+    assert count[0][0] == 1
+
+def test_background_thread_flushes_and_stop_drains(make_user):
+    from app.database import db
+    from app.services.login_service import RECORD_LOGIN_BATCH_PLSQL
+
+    user_id, _ = make_user()
+    writer = AuditWriter(RECORD_LOGIN_BATCH_PLSQL, batch_size=3, flush_interval_ms=10000, max_backlog=100)
+    rows = make_rows(5)
+    for row in rows:
+        row["id_usuario"] = user_id
+        assert writer.enqueue(row)
+    # Lote cheio (3) sai pela thread; o resto só no stop()
+    writer.stop()
+
+    count = db.execute_query("SELECT COUNT(*) FROM CP01_2S_LOGIN WHERE ID_USUARIO = :id", {"id": user_id})
+    assert count[0][0] == 5
+    stats = writer.stats()
+    assert stats["flushed_rows"] == 5 and stats["pending"] == 0 and stats["dropped"] == 0
@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.services.user_cache import user_cache
+
+client = TestClient(main.app)
+
+def test_login_writes_audit_row_and_last_login_together(make_user):
+    user_id, email = make_user(password="segredo1")
+
+    response = client.post("/auth/login", json={"email": email, "password": "segredo1"})
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert response.json()["user_id"] == user_id
+
+    logins = client.get(f"/logins/user/{user_id}").json()
+    assert len(logins) == 1
+    user_cache.clear()
+    usuario = client.get(f"/usuarios/{user_id}").json()
+    # ULTIMO_LOGIN recebe o mesmo DATA_LOGIN gravado na auditoria
+    assert usuario["ultimo_login"] == logins[0]["data_login"]
+
+def test_failed_login_writes_nothing(make_user):
+    user_id, email = make_user(password="segredo1")
+
+    response = client.post("/auth/login", json={"email": email, "password": "errada"})
+    assert response.json()["success"] is False
+    assert client.get(f"/logins/user/{user_id}").json() == []
+    user_cache.clear()
+    assert client.get(f"/usuarios/{user_id}").json()["ultimo_login"] is None
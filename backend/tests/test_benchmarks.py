@@ -0,0 +1,35 @@
+import json
+
+from benchmarks import bench_micro, bench_row_mapping
+from benchmarks.common import percentile, save_results, summarize
+from benchmarks.compare import compare
+
+def test_summary_uses_nearest_rank_percentiles():
+    summary = summarize([i / 1000 for i in range(1, 101)], errors=2, elapsed_s=2.0)
+    assert summary["requests"] == 100
+    assert summary["throughput_rps"] == 50.0
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"], summary["max_ms"]) == (50.0, 95.0, 99.0, 100.0)
+    assert percentile([], 50) is None
+    assert summarize([], errors=0, elapsed_s=0)["mean_ms"] is None
+
+def test_compare_flags_regressions_in_the_right_direction():
+    old = {"kind": "api", "environment": {"commit": "a"}, "login": {"p95_ms": 10.0, "throughput_rps": 100.0, "speedup": 2.0}}
+    new = {"kind": "api", "environment": {"commit": "b"}, "login": {"p95_ms": 12.0, "throughput_rps": 120.0, "speedup": 1.0}}
+
+    rows = {metric: regressed for metric, _, _, _, regressed in compare(old, new, threshold=10)}
+    # Latência maior é regressão, vazão maior não; speedup é relativo e fica de fora
+    assert rows == {"login.p95_ms": True, "login.throughput_rps": False}
+    assert not any(row[4] for row in compare(old, new, threshold=25))
+
+def test_micro_benchmarks_run_and_save_results(tmp_path):
+    mapping = bench_row_mapping.run(rows=50, repeat=1)
+    assert set(mapping["LoginResponse"]) == {"validated", "model_construct", "rowfactory"}
+    serialization = bench_micro.bench_json([20], repeat=1)
+    assert "model_json_response" in serialization["20"]
+
+    output = save_results("micro", {"mapping": mapping}, output=str(tmp_path / "micro.json"))
+    with open(output) as f:
+        document = json.load(f)
+    assert document["kind"] == "micro"
+    assert "python" in document["environment"]
+    assert document["mapping"]["rows"] == 50
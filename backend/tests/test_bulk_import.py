@@ -0,0 +1,52 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from app.services.usuario_service import usuario_service
+
+client = TestClient(main.app)
+
+def test_csv_row_with_extra_fields_is_a_row_error(monkeypatch):
+    async def fake_bulk_create(usuarios):
+        return [None] * len(usuarios)
+
+    monkeypatch.setattr(usuario_service, "bulk_create_usuarios_async", fake_bulk_create)
+    body = (
+        "nome_usuario,email,senha_usuario,apelido_steam,id_perfil\n"
+        "A,a@x.com,secret1,a,1,EXTRA\n"
+        "B,b@x.com,secret2,b,1\n"
+    )
+    response = client.post("/usuarios/bulk", content=body, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["created"], data["failed"]) == (2, 1, 1)
+    assert data["results"][0]["status"] == "error"
+    assert data["results"][1]["status"] == "created"
+
+def test_json_lines_import_reports_each_row(make_user):
+    _, existing = make_user()
+    rows = [
+        {"nome_usuario": "Bulk 1", "email": "bulk1@example.com", "senha_usuario": "senha-bulk1",
+         "apelido_steam": "b1", "id_perfil": 1},
+        {"nome_usuario": "Bulk 2", "email": existing, "senha_usuario": "senha-bulk2",
+         "apelido_steam": "b2", "id_perfil": 1},
+        {"nome_usuario": "Bulk 3", "email": "bulk3@example.com", "apelido_steam": "b3", "id_perfil": 1},
+        {"nome_usuario": "Bulk 4", "email": "bulk4@example.com", "senha_usuario": "senha-bulk4",
+         "apelido_steam": "b4", "id_perfil": 1},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+    response = client.post("/usuarios/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["created"], data["failed"]) == (5, 2, 3)
+    assert [result["status"] for result in data["results"]] == ["created", "error", "error", "created", "error"]
+    # A linha duplicada não derruba o restante do lote
+    assert data["results"][1]["error"] == "Este e-mail já está em uso."
+    assert data["results"][4]["error"] == "Invalid JSON"
+
+    # Senhas hasheadas no pool: os usuários importados conseguem autenticar
+    login = client.post("/auth/login", json={"email": "bulk4@example.com", "password": "senha-bulk4"})
+    assert login.json()["success"] is True
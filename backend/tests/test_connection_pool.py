@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from app import database as database_module
+from app.database import OracleDatabase
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, query, params):
+        if "FAIL" in query:
+            raise RuntimeError("ORA-00942")
+        self.rowcount = 1
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ping(self):
+        pass
+
+class FakePool:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.idle = [FakeConnection() for _ in range(kwargs["min"])]
+        self.busy = 0
+        self.opened = len(self.idle)
+
+    def acquire(self):
+        self.busy += 1
+        if not self.idle:
+            self.opened += 1
+            return FakeConnection()
+        return self.idle.pop()
+
+    def release(self, conn):
+        self.busy -= 1
+        self.idle.append(conn)
+
+@pytest.fixture
+def pooled(monkeypatch):
+    created = []
+
+    def create_pool(**kwargs):
+        created.append(FakePool(**kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(database_module.oracledb, "create_pool", create_pool)
+    return OracleDatabase(use_pool=True), created
+
+def test_pool_is_created_once_with_a_bounded_wait(pooled):
+    database, created = pooled
+    threads = [threading.Thread(target=database.get_pool) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert created[0].kwargs["getmode"] == database_module.oracledb.POOL_GETMODE_TIMEDWAIT
+    assert created[0].kwargs["wait_timeout"] == database_module.DB_POOL_WAIT_TIMEOUT_MS
+
+def test_connections_go_back_to_the_pool_after_success_and_failure(pooled):
+    database, created = pooled
+    assert database.execute_update("UPDATE T SET X = 1") == 1
+    with pytest.raises(RuntimeError):
+        database.execute_update("UPDATE FAIL SET X = 1")
+
+    pool = created[0]
+    assert pool.busy == 0
+    assert sum(conn.rollbacks for conn in pool.idle) == 1
+    stats = database.pool_stats()
+    assert stats["mode"] == "pool" and stats["acquires"] == 2 and stats["busy"] == 0
+
+def test_warm_up_opens_the_minimum_connections(pooled):
+    database, created = pooled
+    assert database.warm_up() == max(database_module.DB_POOL_MIN, 1)
+    assert created[0].busy == 0
@@ -0,0 +1,112 @@
+import pytest
+
+from app.database import DatabaseBackend, OracleDatabase
+from app.sqlite_database import SQLiteDatabase, translate
+
+def test_backends_implement_the_whole_interface():
+    assert not OracleDatabase.__abstractmethods__
+    assert not SQLiteDatabase.__abstractmethods__
+    assert "warm_up" in DatabaseBackend.__abstractmethods__
+
+def test_incomplete_backend_fails_at_instantiation():
+    class Partial(DatabaseBackend):
+        def execute_query(self, query, params=None, model=None):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_single_connection_is_used_by_one_operation_at_a_time(monkeypatch):
+    import threading
+    import time
+
+    database = OracleDatabase(use_pool=False)
+    monkeypatch.setattr(database, "get_connection", lambda: object())
+    active = []
+    overlaps = []
+
+    def operation():
+        with database.connection_scope():
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+    threads = [threading.Thread(target=operation) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(overlaps) == 1
+
+def test_single_connection_stream_can_be_released_from_another_thread(monkeypatch):
+    import threading
+
+    database = OracleDatabase(use_pool=False)
+    monkeypatch.setattr(database, "get_connection", lambda: object())
+    scope = database.connection_scope()
+    scope.__enter__()
+    # O StreamingResponse consome (e fecha) o gerador em threads diferentes
+    closer = threading.Thread(target=scope.__exit__, args=(None, None, None))
+    closer.start()
+    closer.join()
+    with database.connection_scope():
+        pass
+
+def test_run_executes_off_the_event_loop_with_the_callers_context():
+    import asyncio
+    import contextvars
+    import threading
+
+    from app.database import db
+
+    request_id = contextvars.ContextVar("request_id", default=None)
+
+    async def main():
+        request_id.set("abc")
+        return await db.run(lambda: (threading.get_ident(), request_id.get()))
+
+    loop_thread = threading.get_ident()
+    worker_thread, seen = asyncio.run(main())
+    assert worker_thread != loop_thread
+    # As métricas por requisição dependem do contexto chegar à thread do banco
+    assert seen == "abc"
+
+def test_oracle_statements_are_translated_to_sqlite():
+    (insert,) = translate(
+        "INSERT INTO T (ID, NOME) VALUES (SEQ_T.NEXTVAL, :nome) RETURNING ID, NOME INTO :out_id, :out_nome"
+    )
+    assert "SEQ_T" not in insert.sql and "VALUES (NULL, :nome)" in insert.sql
+    assert insert.sql.endswith("RETURNING ID, NOME")
+    assert insert.out_names == ("out_id", "out_nome")
+
+    (select,) = translate("SELECT ID FROM T ORDER BY ID FETCH FIRST :lim ROWS ONLY")
+    assert select.sql.endswith("LIMIT :lim")
+
+def test_plsql_block_is_split_into_statements_and_procedure_calls():
+    insert, update, call = translate("""
+        BEGIN
+            INSERT INTO T (ID) VALUES (:id);
+            UPDATE U SET X = :x WHERE ID = :id;
+            PRC_LOGIN_ROLLUP(:id_usuario, :ip_login, :data_login);
+        END;
+    """)
+    assert insert.sql.startswith("INSERT") and update.sql.startswith("UPDATE")
+    assert call.procedure == "PRC_LOGIN_ROLLUP"
+    assert call.arg_names == ["id_usuario", "ip_login", "data_login"]
+
+def test_failing_block_rolls_back_its_earlier_statements():
+    database = SQLiteDatabase(":memory:")
+    block = """
+        BEGIN
+            INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+            VALUES ('10.15.0.1', 't', CURRENT_TIMESTAMP, 1);
+            INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO)
+            VALUES (NULL, 't', CURRENT_TIMESTAMP, 1);
+        END;
+    """
+    # Como no Oracle, o bloco é atômico: o primeiro INSERT não pode sobrar
+    with pytest.raises(Exception):
+        database.execute_returning(block)
+    assert database.execute_query("SELECT COUNT(*) FROM CP01_2S_LOGIN") == [(0,)]
+    database.close_connection()
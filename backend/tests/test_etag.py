@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+from app.etag import make_etag, model_version
+from app.mapping import model_row_builder
+from app.models.usuario import UsuarioResponse
+from app.services.user_cache import user_cache
+
+client = TestClient(main.app)
+
+def test_version_does_not_depend_on_column_order():
+    values = {
+        "id_usuario": 1, "nome_usuario": "Ana", "email": "ana@example.com", "apelido_steam": "ana",
+        "id_perfil": 1, "data_criacao": datetime(2024, 1, 1), "ultimo_login": None,
+    }
+    validated = UsuarioResponse(**values)
+    names = ["email", "id_usuario", "data_criacao", "nome_usuario", "apelido_steam", "id_perfil"]
+    built = model_row_builder(UsuarioResponse, names)(tuple(values[name] for name in names))
+
+    assert list(built.__dict__) != list(validated.__dict__)
+    assert make_etag("usuario", model_version([built])) == make_etag("usuario", model_version([validated]))
+
+def test_version_changes_with_any_field():
+    usuario = UsuarioResponse(
+        id_usuario=1, nome_usuario="Ana", email="ana@example.com", apelido_steam="ana",
+        id_perfil=1, data_criacao=datetime(2024, 1, 1)
+    )
+    changed = usuario.model_copy(update={"ultimo_login": datetime(2024, 2, 1)})
+    assert model_version([usuario]) != model_version([changed])
+
+def test_user_etag_is_stable_until_the_user_changes(make_user):
+    user_id, _ = make_user()
+    user_cache.clear()
+    from_database = client.get(f"/usuarios/{user_id}").headers["etag"]
+    # Segunda leitura vem do cache e precisa gerar o mesmo ETag
+    assert client.get(f"/usuarios/{user_id}").headers["etag"] == from_database
+
+    response = client.get(f"/usuarios/{user_id}", headers={"If-None-Match": from_database})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(f"/usuarios/{user_id}", json={"apelido_steam": "renamed"})
+    response = client.get(f"/usuarios/{user_id}", headers={"If-None-Match": from_database})
+    assert response.status_code == 200
+    assert response.headers["etag"] != from_database
+
+def test_page_etag_changes_when_a_row_joins_the_page(make_user):
+    params = {"id_perfil": 623}
+    make_user(id_perfil=623)
+    etag = client.get("/usuarios/", params=params).headers["etag"]
+    assert client.get("/usuarios/", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    make_user(id_perfil=623)
+    response = client.get("/usuarios/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
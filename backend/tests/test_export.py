@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.models.login import LoginCreate
+from app.services import export_service as export_module
+from app.services.export_service import export_service, EXPORT_COLUMNS
+from app.services.login_service import login_service
+
+client = TestClient(main.app)
+
+def make_logins(user_id, count):
+    return [
+        login_service.create_login_record(
+            LoginCreate(ip_login=f"10.2.0.{n}", user_agent="exporter, v1", id_usuario=user_id)
+        ).id_login
+        for n in range(count)
+    ]
+
+def test_ndjson_export_streams_every_batch(make_user):
+    user_id, _ = make_user()
+    ids = make_logins(user_id, 5)
+
+    chunks = list(export_service.export("ndjson", id_usuario=user_id, fetch_size=2))
+    # Um chunk por lote buscado: 2 + 2 + 1
+    assert len(chunks) == 3
+    records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [record["id_login"] for record in records] == ids
+    assert set(records[0]) == set(EXPORT_COLUMNS)
+
+    response = client.get("/logins/export", params={"id_usuario": user_id})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.content == b"".join(chunks)
+
+def test_csv_export_has_header_and_quoted_fields(make_user):
+    user_id, _ = make_user()
+    ids = make_logins(user_id, 3)
+
+    response = client.get("/logins/export", params={"format": "csv", "id_usuario": user_id})
+    assert response.status_code == 200
+    assert 'filename="logins.csv"' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [int(row[0]) for row in rows[1:]] == ids
+    assert rows[1][2] == "exporter, v1"
+
+def test_parquet_export_round_trips(make_user):
+    pq = pytest.importorskip("pyarrow.parquet")
+    user_id, _ = make_user()
+    ids = make_logins(user_id, 3)
+
+    response = client.get("/logins/export", params={"format": "parquet", "id_usuario": user_id})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.column("id_login").to_pylist() == ids
+
+def test_parquet_without_pyarrow_is_not_implemented(monkeypatch):
+    monkeypatch.setattr(export_module, "pa", None)
+    response = client.get("/logins/export", params={"format": "parquet"})
+    assert response.status_code == 501
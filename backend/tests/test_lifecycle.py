@@ -0,0 +1,58 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+from app import lifecycle as lifecycle_module
+from app.lifecycle import Lifecycle
+
+client = TestClient(main.app)
+
+def test_failed_warm_up_serves_as_not_ready_and_retries(monkeypatch):
+    monkeypatch.setattr(lifecycle_module, "STARTUP_WARMUP", True)
+    attempts = []
+
+    def warm_up_database():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("database unreachable")
+        return 1
+
+    async def warm_up_workers():
+        return 2
+
+    monkeypatch.setattr(lifecycle_module.db, "warm_up", warm_up_database)
+    monkeypatch.setattr(lifecycle_module.password_hasher, "warm_up", warm_up_workers)
+    lifecycle = Lifecycle()
+    monkeypatch.setattr(main, "lifecycle", lifecycle)
+
+    async def start():
+        await lifecycle.startup()
+        # O processo sobe mesmo com o banco fora: /ready fica 503 até o warm-up passar
+        not_ready = lifecycle.status()
+        await asyncio.wait_for(lifecycle._retry_task, timeout=5)
+        return not_ready
+
+    not_ready = asyncio.run(start())
+    assert not_ready["ready"] is False
+    assert "database unreachable" in not_ready["last_error"]
+    assert len(attempts) == 2
+    assert lifecycle.ready and lifecycle.last_error is None
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    lifecycle.ready = False
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").status_code == 200
+
+def test_shutdown_flushes_the_audit_backlog_before_closing(monkeypatch):
+    calls = []
+    monkeypatch.setattr(lifecycle_module.login_service, "close", lambda: calls.append("audit flush"))
+    monkeypatch.setattr(lifecycle_module.password_hasher, "shutdown", lambda: calls.append("hashing workers"))
+    monkeypatch.setattr(lifecycle_module.db, "close_connection", lambda: calls.append("database"))
+    lifecycle = Lifecycle()
+    lifecycle.ready = True
+
+    asyncio.run(lifecycle.shutdown())
+    assert calls == ["audit flush", "hashing workers", "database"]
+    assert lifecycle.ready is False
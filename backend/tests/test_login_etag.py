@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+from app.etag import make_etag
+from app.models.login import LoginResponse
+from app.services.login_service import login_service
+
+client = TestClient(main.app)
+
+def make_login(id_login, id_usuario=1):
+    return LoginResponse(
+        id_login=id_login, ip_login="10.0.0.1", user_agent="test",
+        data_login=datetime(2024, 1, 1), id_usuario=id_usuario
+    )
+
+def test_failed_lookup_is_an_error_without_etag(monkeypatch):
+    def broken(user_id):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(login_service, "query_logins_by_user", broken)
+    monkeypatch.setattr(login_service, "get_logins_version_by_user", lambda user_id: (0, None))
+
+    response = client.get("/logins/user/1")
+    assert response.status_code == 500
+    assert "etag" not in response.headers
+
+def test_etag_comes_from_the_rows_returned(monkeypatch):
+    # Corpo de uma leitura antiga (2 linhas) enquanto a versão já vê 3 logins
+    rows = [make_login(2), make_login(1)]
+    monkeypatch.setattr(login_service, "query_logins_by_user", lambda user_id: rows)
+    monkeypatch.setattr(login_service, "get_logins_version_by_user", lambda user_id: (3, 3))
+
+    response = client.get("/logins/user/1")
+    assert response.status_code == 200
+    assert response.headers["etag"] == make_etag("logins_user", 1, (2, 2))
+
+    # O ETag do corpo antigo não casa com a versão atual: o próximo poll recebe 200, não 304
+    response = client.get("/logins/user/1", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 200
+
+def test_matching_version_is_not_modified(monkeypatch):
+    rows = [make_login(5)]
+    monkeypatch.setattr(login_service, "query_logins_by_user", lambda user_id: rows)
+    monkeypatch.setattr(login_service, "get_logins_version_by_user", lambda user_id: (1, 5))
+
+    etag = client.get("/logins/user/1").headers["etag"]
+    response = client.get("/logins/user/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
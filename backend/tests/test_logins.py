@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.models.login import LoginCreate
+from app.services.login_service import login_service
+
+client = TestClient(main.app)
+
+def test_created_record_comes_back_from_returning(make_user):
+    user_id, _ = make_user()
+    login = LoginCreate(ip_login="10.1.1.1", user_agent="pytest", id_usuario=user_id)
+
+    first = login_service.create_login_record(login)
+    second = login_service.create_login_record(login)
+
+    # Cada registro volta com o próprio ID_LOGIN, não com o "último login" do usuário
+    assert first.id_login != second.id_login
+    stored = client.get(f"/logins/{first.id_login}").json()
+    assert stored["id_usuario"] == user_id
+    assert stored["ip_login"] == "10.1.1.1"
+    assert stored["data_login"] == first.data_login.isoformat()
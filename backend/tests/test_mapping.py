@@ -0,0 +1,30 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from app.mapping import model_row_builder
+from app.models.login import LoginResponse
+
+LOGIN_NAMES = ["id_login", "ip_login", "user_agent", "data_login", "id_usuario"]
+
+class Tagged(BaseModel):
+    id: int
+    tags: List[str] = Field(default_factory=list)
+    labels: List[str] = []
+
+def test_rows_build_the_same_state_as_model_construct():
+    row = (1, "10.0.0.1", "test", None, 2)
+    built = model_row_builder(LoginResponse, LOGIN_NAMES)(row)
+    constructed = LoginResponse.model_construct(**dict(zip(LOGIN_NAMES, row)))
+    # Se uma atualização do pydantic mudar os internos do BaseModel, este teste acusa
+    for attr in ("__dict__", "__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__"):
+        assert getattr(built, attr) == getattr(constructed, attr)
+    assert built == constructed
+
+def test_defaults_are_not_shared_between_rows():
+    build = model_row_builder(Tagged, ["id"])
+    first, second = build((1,)), build((2,))
+    first.tags.append("x")
+    first.labels.append("y")
+    assert second.tags == [] and second.labels == []
+    assert first.model_fields_set == {"id"}
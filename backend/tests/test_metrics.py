@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.metrics import Registry
+
+client = TestClient(main.app)
+
+def test_histogram_buckets_are_cumulative_and_labels_escaped():
+    registry = Registry()
+    histogram = registry.histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, 'a"b')
+    histogram.observe(0.5, 'a"b')
+    histogram.observe(5.0, 'a"b')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP t_seconds test", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{route="a\\"b",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="a\\"b",le="1"} 2' in lines
+    assert 't_seconds_bucket{route="a\\"b",le="+Inf"} 3' in lines
+    assert 't_seconds_count{route="a\\"b"} 3' in lines
+
+def test_login_is_broken_down_by_route_and_phase(make_user):
+    _, email = make_user(password="segredo1")
+    assert client.post("/auth/login", json={"email": email, "password": "segredo1"}).json()["success"]
+    client.get("/nao-existe")
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="POST",route="/auth/login",status="200"}' in body
+    # Requisições sem rota ficam agrupadas em "unmatched"
+    assert 'route="unmatched",status="404"' in body
+    for phase in ("db", "hash", "serialize", "other"):
+        assert f'http_request_phase_seconds_count{{route="/auth/login",phase="{phase}"}}' in body
+    for name in ("db_pool_connections_open", "password_hash_workers", "user_cache_requests_total",
+                 "singleflight_calls_total", "http_requests_in_flight"):
+        assert f"# TYPE {name} " in body
@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.pagination import encode_cursor, decode_cursor
+
+client = TestClient(main.app)
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def test_round_trip():
+    values = [datetime(2024, 1, 2, 3, 4, 5), 42]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+@pytest.mark.parametrize("payload", [[{"x": 1}, 1], [{"dt": 5}, 1], [{"dt": "not a date"}, 1]])
+def test_malformed_values_are_invalid_cursors(payload):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(raw_cursor(payload), 2)
+
+def test_malformed_cursor_is_a_bad_request():
+    response = client.get("/logins/", params={"after": raw_cursor([{"x": 1}, 1])})
+    assert response.status_code == 400
+
+def test_users_page_database_error_is_500_without_etag(monkeypatch):
+    from app.services import usuario_service as usuario_module
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(usuario_module.db, "execute_query", broken)
+    response = client.get("/usuarios/")
+    assert response.status_code == 500
+    assert "etag" not in response.headers
+
+def test_logins_page_database_error_is_500(monkeypatch):
+    from app.services import login_service as login_module
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(login_module.db, "execute_query", broken)
+    response = client.get("/logins/")
+    assert response.status_code == 500
+
+def insert_logins(user_id, dates):
+    from app.database import db
+
+    db.execute_many(
+        "INSERT INTO CP01_2S_LOGIN (IP_LOGIN, USER_AGENT, DATA_LOGIN, ID_USUARIO) "
+        "VALUES (:ip_login, :user_agent, :data_login, :id_usuario)",
+        [{"ip_login": "10.0.0.1", "user_agent": "test", "data_login": data, "id_usuario": user_id} for data in dates]
+    )
+
+def test_logins_keyset_pages_cover_every_row_once(make_user):
+    user_id, _ = make_user()
+    # Datas repetidas: o desempate por ID_LOGIN não pode pular nem repetir linhas
+    dates = [datetime(2024, 1, day) for day in (1, 2, 2, 2, 3, 4, 4)]
+    insert_logins(user_id, dates)
+
+    seen = []
+    after = None
+    while True:
+        params = {"id_usuario": user_id, "limit": 3}
+        if after:
+            params["after"] = after
+        response = client.get("/logins/", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        after = response.headers.get("x-next-cursor")
+        if not after:
+            break
+
+    assert len(seen) == len(dates)
+    assert len({login["id_login"] for login in seen}) == len(dates)
+    keys = [(login["data_login"], login["id_login"]) for login in seen]
+    assert keys == sorted(keys, reverse=True)
+
+def test_logins_stream_returns_every_matching_row(make_user):
+    user_id, _ = make_user()
+    insert_logins(user_id, [datetime(2024, 2, day) for day in range(1, 6)])
+
+    response = client.get("/logins/", params={"id_usuario": user_id, "stream": "true", "limit": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 5 and all(line["id_usuario"] == user_id for line in lines)
+
+def test_users_pages_filter_sort_and_count(make_user):
+    perfil = 606
+    for day in (5, 1, 4, 2, 3):
+        make_user(id_perfil=perfil, data_criacao=datetime(2023, 3, day))
+
+    seen = []
+    after = None
+    while True:
+        params = {"id_perfil": perfil, "limit": 2, "sort": "data_criacao", "order": "asc", "include_total": "true"}
+        if after:
+            params["after"] = after
+        response = client.get("/usuarios/", params=params)
+        assert response.status_code == 200
+        assert response.headers["x-total-count"] == "5"
+        seen.extend(response.json())
+        after = response.headers.get("x-next-cursor")
+        if not after:
+            break
+    assert [usuario["data_criacao"][:10] for usuario in seen] == [f"2023-03-0{day}" for day in range(1, 6)]
+
+    response = client.get("/usuarios/", params={"id_perfil": perfil, "data_inicio": "2023-03-04T00:00:00",
+                                                "include_total": "true"})
+    assert response.headers["x-total-count"] == "2"
+
+def test_users_cursor_from_another_sort_is_rejected(make_user):
+    perfil = 607
+    for day in (1, 2, 3):
+        make_user(id_perfil=perfil, data_criacao=datetime(2023, 4, day))
+    first = client.get("/usuarios/", params={"id_perfil": perfil, "limit": 1, "sort": "email"})
+    response = client.get("/usuarios/", params={"id_perfil": perfil, "limit": 1, "sort": "data_criacao",
+                                                "after": first.headers["x-next-cursor"]})
+    assert response.status_code == 400
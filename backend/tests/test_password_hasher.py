@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+def test_hash_many_stops_all_drains_on_first_failure():
+    hasher = PasswordHasher(workers=2)
+    submitted = []
+
+    async def fake_submit(func, chunk):
+        submitted.append(chunk)
+        await asyncio.sleep(0.01)
+        if chunk == ["1"]:
+            raise PasswordHasherBusy("Password hashing queue is full")
+        return [f"hash:{password}" for password in chunk]
+
+    hasher._submit = fake_submit
+
+    async def run():
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash_many([str(i) for i in range(100)], chunk_size=1)
+        # Dá tempo para um drain que não tivesse sido cancelado continuar consumindo a fila
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert len(submitted) <= 4
+
+def test_hash_failure_never_creates_the_user(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.services import usuario_service as usuario_module
+    from app.services.password_hasher import password_hasher
+
+    async def broken_hash(password):
+        # Falha só para a senha do usuário: um fallback para outra senha passaria
+        if password == "segredo123":
+            raise RuntimeError("hashing pool is broken")
+        return "$2b$12$fallback"
+
+    inserted = []
+    monkeypatch.setattr(password_hasher, "hash", broken_hash)
+    monkeypatch.setattr(usuario_module.db, "execute_returning", lambda *args, **kwargs: inserted.append(args))
+
+    response = TestClient(main.app).post("/usuarios/", json={
+        "nome_usuario": "Ana", "email": "ana.hash@example.com", "senha_usuario": "segredo123",
+        "apelido_steam": "ana", "id_perfil": 1
+    })
+    assert response.status_code == 500
+    assert inserted == []
+
+def test_full_queue_rejects_instead_of_waiting():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    hasher = PasswordHasher(workers=1, max_queue=1, queue_timeout=5)
+    hasher.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def run():
+        running = asyncio.ensure_future(hasher._submit(time.sleep, 0.1))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.ensure_future(hasher._submit(time.sleep, 0))
+        await asyncio.sleep(0.01)
+        # Um rodando e um na fila: o terceiro é recusado na hora
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._submit(time.sleep, 0)
+        await asyncio.gather(running, waiting)
+
+    asyncio.run(run())
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+def test_queued_job_times_out():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    hasher = PasswordHasher(workers=1, max_queue=4, queue_timeout=0.02)
+    hasher.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def run():
+        first = asyncio.ensure_future(hasher._submit(time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._submit(time.sleep, 0)
+        await first
+
+    asyncio.run(run())
+    assert hasher.stats()["timed_out"] == 1 and hasher.stats()["queued"] == 0
+    hasher.shutdown()
+
+def test_verify_runs_in_the_worker_processes():
+    from app.services.password_hasher import hash_password
+
+    hasher = PasswordHasher(workers=1)
+    stored = hash_password("segredo123")
+
+    async def run():
+        return await hasher.verify("segredo123", stored), await hasher.verify("errada", stored)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        hasher.shutdown()
+
+def test_busy_hasher_answers_503_on_login(monkeypatch, make_user):
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.services.password_hasher import password_hasher
+
+    async def busy(*args):
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    _, email = make_user()
+    monkeypatch.setattr(password_hasher, "verify_and_update", busy)
+    response = TestClient(main.app).post("/auth/login", json={"email": email, "password": "senha123"})
+    assert response.status_code == 503
+
+def test_login_rehashes_a_hash_with_another_cost(make_user):
+    from fastapi.testclient import TestClient
+    from passlib.hash import bcrypt
+
+    import main
+    from app.database import db
+    from app.services.auth_service import auth_service
+
+    old_hash = bcrypt.using(rounds=5).hash("segredo1")
+    user_id, email = make_user(password_hash=old_hash)
+    client = TestClient(main.app)
+    rehashed = auth_service.rehashed
+
+    def stored_hash():
+        return db.execute_query("SELECT SENHA_USUARIO FROM CP01_2S_USUARIO WHERE ID_USUARIO = :id", {"id": user_id})[0][0]
+
+    assert client.post("/auth/login", json={"email": email, "password": "segredo1"}).json()["success"]
+    new_hash = stored_hash()
+    # Regravado com BCRYPT_ROUNDS (4 nos testes) e ainda aceitando a mesma senha
+    assert new_hash.startswith("$2b$04$")
+    assert bcrypt.verify("segredo1", new_hash)
+    assert auth_service.rehashed == rehashed + 1
+
+    # Já no custo atual: o próximo login não regrava
+    assert client.post("/auth/login", json={"email": email, "password": "segredo1"}).json()["success"]
+    assert stored_hash() == new_hash
+    assert auth_service.rehashed == rehashed + 1
+
+def test_rehash_does_not_overwrite_a_concurrent_password_change(make_user):
+    from app.services.auth_service import auth_service
+
+    user_id, _ = make_user()
+    assert not auth_service.update_password_hash(user_id, "hash-lido-antes-da-troca", "novo-hash")
+
+def test_calibration_measures_verify_time():
+    from calibrate_bcrypt import measure
+
+    assert measure(4, samples=2) > 0
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.controllers import auth_controller
+from app.rate_limit import TokenBucketLimiter
+from app.services.login_rate_limiter import LoginRateLimiter
+
+client = TestClient(main.app)
+
+def make_clock(monkeypatch, start=1000.0):
+    now = [start]
+    monkeypatch.setattr("app.rate_limit.time.monotonic", lambda: now[0])
+    return now
+
+def test_refilled_bucket_is_evicted_before_a_depleted_one(monkeypatch):
+    now = make_clock(monkeypatch)
+    limiter = TokenBucketLimiter(rate=0.5, burst=2, maxsize=2)
+    for _ in range(3):
+        limiter.acquire("attacker")
+    now[0] += 0.1
+    limiter.acquire("quiet")
+    now[0] += 2.1
+    # "attacker" é o menos recente mas ainda está esgotado; "quiet" já encheu: sai "quiet"
+    assert limiter.acquire("new") == 0
+    assert limiter.stats()["forced_evictions"] == 0
+    # O bucket do atacante continua valendo (1,1 token): a segunda tentativa é barrada
+    assert limiter.acquire("attacker") == 0
+    assert limiter.acquire("attacker") > 0
+
+def test_fresh_key_gets_in_under_a_key_flood(monkeypatch):
+    make_clock(monkeypatch)
+    limiter = TokenBucketLimiter(rate=1 / 60, burst=1, maxsize=100)
+    for i in range(1000):
+        limiter.acquire(f"flood-{i}")
+        limiter.acquire(f"flood-{i}")
+    assert limiter.stats()["keys"] == 100
+    assert limiter.acquire("legit-client") == 0
+    assert limiter.stats()["keys"] == 100
+    assert limiter.stats()["forced_evictions"] > 0
+
+def test_limited_login_is_rejected_before_any_credential_check(monkeypatch):
+    make_clock(monkeypatch)
+    limiter = LoginRateLimiter(enabled=True)
+    limiter.by_ip = TokenBucketLimiter(rate=1.0, burst=100, maxsize=10)
+    limiter.by_email = TokenBucketLimiter(rate=0.1, burst=2, maxsize=10)
+    monkeypatch.setattr(auth_controller, "login_rate_limiter", limiter)
+    checked = []
+
+    async def authenticate(email, password):
+        checked.append(email)
+        return None
+
+    monkeypatch.setattr(auth_controller.auth_service, "authenticate_user_async", authenticate)
+    credentials = {"email": "alvo@example.com", "password": "x"}
+    assert client.post("/auth/login", json=credentials).status_code == 200
+    # Mesma conta com outra caixa: o balde é por e-mail normalizado
+    assert client.post("/auth/verify", json={**credentials, "email": " ALVO@example.com"}).status_code == 200
+
+    response = client.post("/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    # Nem banco nem bcrypt para a tentativa barrada
+    assert len(checked) == 2
@@ -0,0 +1,33 @@
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+from app.mapping import model_row_builder
+from app.models.login import LoginResponse
+from app.responses import dumps_models
+
+client = TestClient(main.app)
+
+def test_body_matches_pydantic_serialization():
+    names = ["id_login", "ip_login", "user_agent", "data_login", "id_usuario"]
+    build = model_row_builder(LoginResponse, names)
+    logins = [
+        build((1, "10.0.0.1", 'agent "quoted" ção', datetime(2024, 1, 2, 3, 4, 5, 600000), 7)),
+        LoginResponse(id_login=2, ip_login="10.0.0.2", user_agent="x", data_login=datetime(2024, 1, 2), id_usuario=8),
+    ]
+
+    # Mesmo JSON que o response_model geraria, pelos dois caminhos de construção
+    assert json.loads(dumps_models(logins)) == [json.loads(login.model_dump_json()) for login in logins]
+    assert json.loads(dumps_models(logins[0])) == json.loads(logins[0].model_dump_json())
+
+def test_list_endpoint_body_matches_the_schema(make_user):
+    make_user(id_perfil=624)
+    response = client.get("/usuarios/", params={"id_perfil": 624})
+
+    assert response.headers["content-type"] == "application/json"
+    (usuario,) = response.json()
+    assert set(usuario) == set(main.app.openapi()["components"]["schemas"]["UsuarioResponse"]["properties"])
+    assert usuario["ultimo_login"] is None
+    assert "senha_usuario" not in usuario
@@ -0,0 +1,51 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+import main
+from app.controllers import analytics_controller
+from app.database import db
+from app.models.login import LoginCreate
+from app.services import login_service as login_module
+from app.services.rollup_service import rollup_service
+
+client = TestClient(main.app)
+
+def enable_rollups(monkeypatch):
+    # Mesmo bloco que o login_service monta com LOGIN_ROLLUPS_ENABLED=true
+    monkeypatch.setattr(analytics_controller, "LOGIN_ROLLUPS_ENABLED", True)
+    monkeypatch.setattr(
+        login_module, "RECORD_LOGIN_PLSQL",
+        login_module.RECORD_LOGIN_PLSQL.replace("END;", "PRC_LOGIN_ROLLUP(:id_usuario, :ip_login, :data_login);\n    END;")
+    )
+
+def test_logins_update_the_counters_in_the_same_block(make_user, monkeypatch):
+    enable_rollups(monkeypatch)
+    user_id, _ = make_user()
+    for _ in range(3):
+        login_module.login_service.record_login(LoginCreate(ip_login="10.14.0.1", user_agent="t", id_usuario=user_id))
+
+    user = client.get(f"/analytics/logins/users/{user_id}").json()
+    assert user["total_logins"] == 3
+    assert user["primeiro_login"] <= user["ultimo_login"]
+    assert client.get("/analytics/logins/ips/10.14.0.1").json()["total_logins"] == 3
+    daily = client.get("/analytics/logins/daily").json()
+    assert daily[-1]["chave"] == date.today().isoformat()
+    assert daily[-1]["total_logins"] >= 3
+    assert client.get("/analytics/logins/ips/10.14.9.9").status_code == 404
+
+def test_backfill_rebuilds_the_counters_from_the_audit_trail(make_user, monkeypatch):
+    enable_rollups(monkeypatch)
+    user_id, _ = make_user()
+    for _ in range(2):
+        login_module.login_service.record_login(LoginCreate(ip_login="10.14.0.2", user_agent="t", id_usuario=user_id))
+    before = client.get(f"/analytics/logins/users/{user_id}").json()
+
+    # Contadores perdidos (ou criados antes da feature): o backfill recalcula a partir de CP01_2S_LOGIN
+    db.execute_delete("DELETE FROM CP01_2S_LOGIN_ROLLUP WHERE CHAVE = :chave", {"chave": str(user_id)})
+    assert client.get(f"/analytics/logins/users/{user_id}").status_code == 404
+    rollup_service.backfill()
+    assert client.get(f"/analytics/logins/users/{user_id}").json() == before
+
+def test_analytics_are_unavailable_when_disabled():
+    assert client.get("/analytics/logins/users").status_code == 503
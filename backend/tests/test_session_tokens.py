@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services.token_service import token_service, InvalidToken, TokenService
+
+client = TestClient(main.app)
+
+def test_valid_token_identifies_the_user():
+    token = token_service.issue(7, "Ana")
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["id_usuario"] == 7
+
+@pytest.mark.parametrize("mangle", [
+    lambda token: token[:-1] + "é",                       # assinatura não ASCII
+    lambda token: token.replace(".", ".ü", 1),           # payload não ASCII
+    lambda token: token[:-2],                            # assinatura errada
+    lambda token: "a.b",                                 # partes faltando
+])
+def test_bad_tokens_are_invalid(mangle):
+    with pytest.raises(InvalidToken):
+        token_service.verify(mangle(token_service.issue(7)))
+
+def test_non_ascii_token_is_unauthorized():
+    token = token_service.issue(7)[:-1] + "é"
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}".encode("utf-8")})
+    assert response.status_code == 401
+
+def test_expired_token_and_other_secret_are_rejected(monkeypatch):
+    token = token_service.issue(7)
+    with pytest.raises(InvalidToken):
+        TokenService(secret="another-secret").verify(token)
+
+    now = time.time()
+    monkeypatch.setattr("app.services.token_service.time.time", lambda: now + token_service.expires_in + 1)
+    with pytest.raises(InvalidToken, match="expired"):
+        token_service.verify(token)
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+def test_login_token_replaces_the_password_on_later_requests(make_user):
+    user_id, email = make_user(password="segredo1")
+    login = client.post("/auth/login", json={"email": email, "password": "segredo1"}).json()
+    assert login["token_type"] == "bearer"
+
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.get("/auth/me", headers=headers).json()["id_usuario"] == user_id
+    logins = client.get("/logins/me", headers=headers).json()
+    assert [entry["id_usuario"] for entry in logins] == [user_id]
+    assert client.get("/logins/me").status_code == 401
+
+def test_missing_secret_refuses_to_start():
+    with pytest.raises(RuntimeError, match="SESSION_SECRET"):
+        TokenService(secret="", allow_ephemeral=False)
+    # Só com a flag explícita de dev/teste
+    service = TokenService(secret="", allow_ephemeral=True)
+    assert service.verify(service.issue(1))["sub"] == "1"
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.singleflight import SingleFlight
+
+def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight("test")
+    runs = []
+
+    async def lookup(key):
+        runs.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def main():
+        results = await asyncio.gather(*(group.do(key, lookup, key) for key in (1, 1, 1, 2)))
+        # Depois que a chamada termina nada fica guardado: a próxima consulta vai ao banco
+        await group.do(1, lookup, 1)
+        return results
+
+    results = asyncio.run(main())
+    assert results[0] is results[1] is results[2]
+    assert results[3] == {"key": 2}
+    assert runs == [1, 2, 1]
+    assert group.stats() == {"calls": 5, "coalesced": 2, "in_flight": 0}
+
+def test_failure_and_cancellation_of_the_first_caller():
+    group = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def main():
+        errors = await asyncio.gather(group.do("a", failing), group.do("a", failing), return_exceptions=True)
+        first = asyncio.ensure_future(group.do("b", slow))
+        second = asyncio.ensure_future(group.do("b", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return errors, await second
+
+    errors, result = asyncio.run(main())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    # O cancelamento do primeiro chamador não derruba quem ainda espera
+    assert result == "ok"
+
+def test_forget_starts_a_fresh_call_after_a_write():
+    group = SingleFlight("test")
+    values = iter(["before write", "after write"])
+
+    async def read():
+        value = next(values)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        stale = asyncio.ensure_future(group.do(1, read))
+        await asyncio.sleep(0)
+        group.forget(1)
+        fresh = await group.do(1, read)
+        return await stale, fresh
+
+    assert asyncio.run(main()) == ("before write", "after write")
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+import main
+from app.cache import TTLCache
+from app.models.login import LoginCreate
+from app.models.usuario import UsuarioResponse
+from app.services import login_service as login_module
+from app.services.user_cache import UserCache, user_cache
+from app.services.usuario_service import usuario_service
+
+client = TestClient(main.app)
+
+def make_usuario(id_usuario=1, email="ana@example.com"):
+    return UsuarioResponse(
+        id_usuario=id_usuario, nome_usuario="Ana", email=email, apelido_steam="ana",
+        id_perfil=1, data_criacao=datetime(2024, 1, 1)
+    )
+
+def test_update_keeps_the_original_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("k", 1)
+
+    now[0] = 150.0
+    assert cache.update("k", lambda value: value + 1)
+    now[0] = 161.0
+    # Expira 60s depois do set, não 60s depois do update
+    assert cache.get("k") is None
+    assert not cache.update("missing", lambda value: value)
+
+def test_least_recently_used_entry_is_evicted_and_old_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # "a" foi lido por último: "b" é o menos recente e sai quando "c" entra
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 160.0
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert cache.stats()["expirations"] == 2
+
+def test_reads_are_served_from_the_cache_until_an_update(make_user, monkeypatch):
+    user_id, email = make_user()
+    user_cache.clear()
+    assert usuario_service.get_usuario_by_id(user_id).email == email
+
+    def no_database(*args, **kwargs):
+        raise AssertionError("should have been served from the cache")
+
+    monkeypatch.setattr("app.services.usuario_service.db.execute_query", no_database)
+    assert usuario_service.get_usuario_by_id(user_id).email == email
+    assert usuario_service.get_usuario_by_email(email).id_usuario == user_id
+    monkeypatch.undo()
+
+    new_email = f"changed.{email}"
+    response = client.put(f"/usuarios/{user_id}", json={"email": new_email})
+    assert response.status_code == 200
+    # O e-mail antigo não pode mais resolver para o usuário pelo índice do cache
+    assert usuario_service.get_usuario_by_email(email) is None
+    assert usuario_service.get_usuario_by_email(new_email).id_usuario == user_id
+    assert usuario_service.get_usuario_by_id(user_id).email == new_email
+
+def test_last_login_is_cached_only_after_the_write(monkeypatch):
+    cache = UserCache(maxsize=10, ttl=60)
+    cache.put(make_usuario())
+    monkeypatch.setattr(login_module, "user_cache", cache)
+    monkeypatch.setattr(login_module.login_service, "audit_writer", None)
+
+    def failing_write(*args, **kwargs):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(login_module.db, "execute_returning", failing_write)
+    login = LoginCreate(ip_login="10.0.0.1", user_agent="test", id_usuario=1)
+    assert login_module.login_service.record_login(login) is None
+    # A gravação falhou: nada de ULTIMO_LOGIN novo no cache
+    assert cache.get_by_id(1) is None
+
+    cache.put(make_usuario())
+    monkeypatch.setattr(login_module.db, "execute_returning", lambda *args, **kwargs: {"out_id_login": 7})
+    assert login_module.login_service.record_login(login).id_login == 7
+    assert cache.get_by_id(1).ultimo_login is not None
+
+def test_read_before_invalidation_is_not_cached():
+    cache = UserCache(maxsize=10, ttl=60)
+    token = cache.read_token()
+    stale = make_usuario()
+    # UPDATE concluído (e invalidado) enquanto a leitura antiga ainda estava em andamento
+    cache.invalidate(1)
+    cache.put(stale, token)
+    assert cache.get_by_id(1) is None
+    assert cache.get_by_email("ana@example.com") is None
+    assert cache.stale_puts == 1
+
+    # Leituras de outros usuários e leituras posteriores continuam sendo cacheadas
+    cache.put(make_usuario(2, "bia@example.com"), token)
+    assert cache.get_by_id(2) is not None
+    cache.put(make_usuario(), cache.read_token())
+    assert cache.get_by_id(1) is not None
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.services.user_cache import user_cache
+
+client = TestClient(main.app)
+
+def new_usuario(email):
+    return {
+        "nome_usuario": "Carla", "email": email, "senha_usuario": "senha123",
+        "apelido_steam": "carla", "id_perfil": 1,
+    }
+
+def test_create_returns_the_generated_columns():
+    response = client.post("/usuarios/", json=new_usuario("carla@example.com"))
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["id_usuario"] > 0
+    assert data["data_criacao"] is not None
+    assert "senha_usuario" not in data
+    # Os valores do RETURNING INTO são os mesmos gravados na tabela
+    user_cache.clear()
+    stored = client.get(f"/usuarios/{data['id_usuario']}").json()
+    assert stored["email"] == "carla@example.com"
+    assert stored["data_criacao"] == data["data_criacao"]
+
+def test_duplicate_email_is_rejected_by_the_unique_constraint():
+    assert client.post("/usuarios/", json=new_usuario("dup@example.com")).status_code == 201
+
+    response = client.post("/usuarios/", json=new_usuario("dup@example.com"))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Este e-mail já está em uso."